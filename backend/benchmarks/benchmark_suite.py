@@ -0,0 +1,305 @@
+"""
+Backend Benchmark Suite
+
+Measures, and writes as JSON for comparing runs:
+    - scoring: PostureChecker.check_posture per-frame cost (and score_batch
+      for comparison) on recorded landmarks (--landmarks file.npy of shape
+      (N, 33, 4)) or a synthetic landmark sequence
+    - db_log: DatabaseLogger.log throughput, direct and through the
+      background writer, against databases of each size
+    - stats_today / stats_week: /api/stats/today and /api/stats/week
+      latency through the Flask test client, cold (first call per user,
+      a response cache miss), warm (cache hit) and 304 (If-None-Match)
+
+Databases are generated with synthetic_data.py and kept in --data-dir, so
+large sizes are only built once.
+
+Usage (from the backend directory):
+    python benchmarks/benchmark_suite.py --sizes 10k,100k,1m --json results.json
+    python benchmarks/benchmark_suite.py --sizes 10k,1m,10m,50m --data-dir /tmp/bench --json run2.json --compare results.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from database import ConnectionManager, DatabaseLogger
+from inference_pool import PoseLandmarks
+from posture import PostureChecker
+from replay import summarize_ms
+from response_cache import ResponseCache
+from stats import TodayStats
+from synthetic_data import parse_size, populate, row_count, synthetic_landmarks
+
+# Metric compared by --compare for each benchmark, and whether higher is better
+COMPARE_METRICS = {
+    "check_posture": ("per_frame_us", False),
+    "score_batch": ("per_frame_us", False),
+    "db_log_direct": ("rows_per_second", True),
+    "db_log_writer": ("rows_per_second", True),
+    "stats_today_cold": ("p50", False),
+    "stats_today_warm": ("p50", False),
+    "stats_today_304": ("p50", False),
+    "stats_week_cold": ("p50", False),
+    "stats_week_warm": ("p50", False),
+    "stats_week_304": ("p50", False),
+}
+
+# Changes smaller than this are reported as noise
+NOISE = 0.05
+
+
+def bench_scoring(landmarks):
+    """Per-frame cost of check_posture on landmark objects, and of one score_batch call"""
+    frames = [PoseLandmarks(row).landmark if not np.isnan(row).all() else None for row in landmarks]
+    checker = PostureChecker()
+    with contextlib.redirect_stdout(io.StringIO()):
+        checker.calibrate(next(frame for frame in frames if frame is not None))
+
+    timings = []
+    for frame in frames:
+        start = time.perf_counter()
+        checker.check_posture(frame)
+        timings.append(time.perf_counter() - start)
+    total = sum(timings)
+
+    start = time.perf_counter()
+    checker.score_batch(landmarks)
+    batch_seconds = time.perf_counter() - start
+
+    return [
+        {
+            "benchmark": "check_posture",
+            "frames": len(frames),
+            "per_frame_us": round(total / len(frames) * 1e6, 3),
+            "frames_per_second": round(len(frames) / total),
+            "latency_ms": summarize_ms(timings)
+        },
+        {
+            "benchmark": "score_batch",
+            "frames": len(frames),
+            "per_frame_us": round(batch_seconds / len(frames) * 1e6, 3),
+            "frames_per_second": round(len(frames) / batch_seconds)
+        }
+    ]
+
+
+def bench_db_log(path, user_id, direct_rows, writer_rows):
+    """log() throughput with a commit per row, and through the batching writer"""
+    results = []
+
+    db = DatabaseLogger(path)
+    timings = []
+    started = time.perf_counter()
+    for i in range(direct_rows):
+        start = time.perf_counter()
+        db.log(user_id, 0.05, "GOOD POSTURE")
+        timings.append(time.perf_counter() - start)
+    elapsed = time.perf_counter() - started
+    db.close()
+    results.append({
+        "benchmark": "db_log_direct",
+        "rows": direct_rows,
+        "rows_per_second": round(direct_rows / elapsed),
+        "latency_ms": summarize_ms(timings)
+    })
+
+    db = DatabaseLogger(path)
+    writer = db.start_writer(flush_size=500, flush_interval=0.5, max_queue=writer_rows, on_full='block')
+    timings = []
+    started = time.perf_counter()
+    for i in range(writer_rows):
+        start = time.perf_counter()
+        db.log(user_id, 0.05, "GOOD POSTURE")
+        timings.append(time.perf_counter() - start)
+    enqueued = time.perf_counter() - started
+    db.close()  # Stops the writer after flushing everything
+    elapsed = time.perf_counter() - started
+    stats = writer.stats()
+    results.append({
+        "benchmark": "db_log_writer",
+        "rows": writer_rows,
+        "rows_per_second": round(writer_rows / elapsed),
+        "enqueue_per_second": round(writer_rows / enqueued),
+        "enqueue_latency_ms": summarize_ms(timings),
+        "flushes": stats["flushes"],
+        "avg_flush_ms": stats["avg_flush_ms"]
+    })
+    return results
+
+
+def bench_endpoints(app_module, path, users, repeat):
+    """Stats endpoint latency through the Flask test client against the database at path"""
+    # Routes read these module globals on every request. A fresh response
+    # cache, so nothing is served from the previous database's responses
+    app_module.db_manager = ConnectionManager(path)
+    app_module.db_manager.init_schema()
+    app_module.today_stats = TodayStats(app_module.db_manager)
+    app_module.stats_cache = ResponseCache()
+    client = app_module.app.test_client()
+
+    def timed_get(url, etag=None, expected=200):
+        headers = {"If-None-Match": etag} if etag else {}
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = client.get(url, headers=headers)
+        elapsed = time.perf_counter() - start
+        if response.status_code != expected:
+            raise SystemExit(f"❌ {url} returned {response.status_code}: {response.get_data(as_text=True)}")
+        return elapsed, response.headers.get("ETag")
+
+    user_ids = list(range(1, users + 1))
+    repeated = [user_ids[i % len(user_ids)] for i in range(repeat)]
+    results = []
+    for endpoint in ("today", "week"):
+        url = f"/api/stats/{endpoint}?userId={{}}"
+        cold, etags = [], {}
+        for uid in user_ids:
+            elapsed, etags[uid] = timed_get(url.format(uid))
+            cold.append(elapsed)
+        warm = [timed_get(url.format(uid))[0] for uid in repeated]
+        not_modified = [timed_get(url.format(uid), etag=etags[uid], expected=304)[0] for uid in repeated]
+        results.extend([
+            {"benchmark": f"stats_{endpoint}_cold", "requests": len(cold), **summarize_ms(cold)},
+            {"benchmark": f"stats_{endpoint}_warm", "requests": len(warm), **summarize_ms(warm)},
+            {"benchmark": f"stats_{endpoint}_304", "requests": len(not_modified), **summarize_ms(not_modified)}
+        ])
+    app_module.db_manager.close_all()
+    return results
+
+
+def import_app(workdir):
+    """Import server.py in API mode with its default database inside workdir"""
+    previous = os.getcwd()
+    os.chdir(workdir)
+    # No background model warmup competing with the measurements
+    sys.argv = ["main.py", "--user", "bench_user_1", "--no-warmup"]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            import server
+    finally:
+        os.chdir(previous)
+    return server
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """Print each comparable metric next to the same metric in a previous run"""
+    with open(baseline_path) as f:
+        baseline = {(r["benchmark"], r.get("size")): r for r in json.load(f)["results"]}
+
+    print(f"\n📊 Compared with {baseline_path}")
+    for result in results:
+        metric, higher_is_better = COMPARE_METRICS.get(result["benchmark"], (None, None))
+        previous = baseline.get((result["benchmark"], result.get("size")))
+        if metric is None or previous is None or not previous.get(metric):
+            continue
+        ratio = result[metric] / previous[metric]
+        better = ratio > 1 if higher_is_better else ratio < 1
+        verdict = "≈" if abs(ratio - 1) < NOISE else ("✅" if better else "⚠️")
+        size = f"@{result['size']:,}" if result.get("size") else ""
+        print(f"   {result['benchmark']}{size} {metric}: {previous[metric]} -> {result[metric]} ({ratio:.2f}x {verdict})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scoring, logging and stats endpoints")
+    parser.add_argument("--sizes", default="10k,100k,1m", help="posture_logs row counts, e.g. 10k,1m,50m")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--landmarks", help="Recorded (N, 33, 4) landmark array (.npy)")
+    parser.add_argument("--frames", type=int, default=10_000, help="Synthetic landmark frames without --landmarks")
+    parser.add_argument("--log-rows", type=int, default=2_000, help="Rows for the direct log() benchmark")
+    parser.add_argument("--writer-rows", type=int, default=20_000, help="Rows for the writer log() benchmark")
+    parser.add_argument("--repeat", type=int, default=200, help="Requests per endpoint benchmark")
+    parser.add_argument("--data-dir", help="Keep generated databases here and reuse them")
+    parser.add_argument("--json", dest="json_path")
+    parser.add_argument("--compare", help="Previous --json report to compare against")
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes.split(",") if size.strip()]
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="posturemon-bench-")
+    os.makedirs(data_dir, exist_ok=True)
+    results = []
+
+    if args.landmarks:
+        landmarks = np.load(args.landmarks).astype(np.float32)
+        landmark_source = args.landmarks
+    else:
+        landmarks = synthetic_landmarks(args.frames)
+        landmark_source = f"synthetic:{args.frames}"
+    print(f"🧍 Scoring {len(landmarks):,} frames from {landmark_source}...")
+    results.extend(bench_scoring(landmarks))
+
+    app_module = import_app(tempfile.mkdtemp(prefix="posturemon-app-"))
+    for size in sizes:
+        path = os.path.join(data_dir, f"posture_{size}_{args.users}u_{args.days}d.db")
+        existing = row_count(path)
+        if existing < size:
+            print(f"📦 Generating {size - existing:,} rows into {path}...")
+            populate(path, size - existing, args.users, args.days)
+        else:
+            print(f"📦 Reusing {path} ({existing:,} rows)")
+
+        print(f"⏱️ Benchmarking at {size:,} rows...")
+        size_results = bench_endpoints(app_module, path, min(args.users, 20), args.repeat)
+        size_results.extend(bench_db_log(path, 1, args.log_rows, args.writer_rows))
+        for result in size_results:
+            result["size"] = size
+        results.extend(size_results)
+
+    print("\n" + "=" * 72)
+    for result in results:
+        size = f"{result['size']:>12,}" if result.get("size") else f"{'':>12}"
+        if "per_frame_us" in result:
+            detail = f"{result['per_frame_us']:.2f} us/frame ({result['frames_per_second']:,} frames/s)"
+        elif "rows_per_second" in result:
+            detail = f"{result['rows_per_second']:,} rows/s"
+        else:
+            detail = f"p50 {result['p50']:.3f} ms | p95 {result['p95']:.3f} ms"
+        print(f"{size}  {result['benchmark']:<20} {detail}")
+    print("=" * 72)
+
+    report = {
+        "meta": {
+            "timestamp": time.time(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "users": args.users,
+            "days": args.days,
+            "landmarks": landmark_source
+        },
+        "results": results
+    }
+
+    if args.compare:
+        compare(results, args.compare)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Inference Pool Benchmark
+
+Loads frames from a recorded source into memory, then pushes them through
+pose.process in-process (one pose graph, one thread) and through the
+out-of-process InferencePool at each requested worker count, with one
+caller thread per worker. Reports throughput, per-frame latency and
+scaling efficiency relative to a single worker.
+
+Usage (from the backend directory):
+    python benchmarks/inference_pool_benchmark.py video:session.mp4 --workers 1,2,4 --frames 300 --json pool.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+from frame_sources import open_frame_source
+from inference_pool import InferencePool
+from replay import summarize_ms
+from model import POSE_OPTIONS
+from sessions import create_pose
+
+
+def load_frames(source_spec, max_frames):
+    """Read up to max_frames frames into memory so decoding isn't measured"""
+    source = open_frame_source(source_spec)
+    if not source.open():
+        raise SystemExit(f"❌ Could not open frame source: {source.describe()}")
+
+    frames = []
+    try:
+        while len(frames) < max_frames:
+            success, frame = source.read()
+            if not success:
+                if source.exhausted:
+                    break
+                continue
+            frames.append(frame)
+    finally:
+        source.release()
+
+    if not frames:
+        raise SystemExit("❌ Frame source produced no frames")
+    return frames
+
+
+def run_in_process(frames):
+    """Baseline: one pose graph in this process, frames processed back to back"""
+    pose = create_pose()
+    latencies = []
+    detected = 0
+    started = time.perf_counter()
+    try:
+        for frame in frames:
+            start = time.perf_counter()
+            results = pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            latencies.append(time.perf_counter() - start)
+            detected += results.pose_landmarks is not None
+    finally:
+        pose.close()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "workers": 0,
+        "frames": len(frames),
+        "elapsed_s": round(elapsed, 3),
+        "fps": round(len(frames) / elapsed, 2),
+        "detected_frames": detected,
+        "latency_ms": summarize_ms(latencies)
+    }
+
+
+def run_pool(frames, workers, warmup):
+    """Push every frame through a pool of the given size, one caller thread per worker"""
+    pool = InferencePool(workers=workers, pose_options=POSE_OPTIONS, max_wait=30.0).start()
+    try:
+        # Let each worker build its graph state before timing
+        for frame in frames[:warmup]:
+            pool.process(frame)
+
+        latencies = []
+        detected = [0]
+        dropped = [0]
+        lock = threading.Lock()
+        next_index = [0]
+
+        def caller(key):
+            while True:
+                with lock:
+                    index = next_index[0]
+                    next_index[0] += 1
+                if index >= len(frames):
+                    return
+
+                start = time.perf_counter()
+                results = pool.process(frames[index], key=key)
+                elapsed = time.perf_counter() - start
+                with lock:
+                    if results is None:
+                        dropped[0] += 1
+                    else:
+                        latencies.append(elapsed)
+                        detected[0] += results.pose_landmarks is not None
+
+        threads = [threading.Thread(target=caller, args=(i,)) for i in range(workers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        stats = pool.stats()
+    finally:
+        pool.close()
+
+    return {
+        "workers": workers,
+        "frames": len(frames),
+        "elapsed_s": round(elapsed, 3),
+        "fps": round(len(latencies) / elapsed, 2),
+        "detected_frames": detected[0],
+        "dropped_frames": dropped[0],
+        "latency_ms": summarize_ms(latencies),
+        "worker_jobs": stats["workerJobs"],
+        "crashes": stats["crashes"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput scaling of the inference pool")
+    parser.add_argument("source", help="Frame source spec, e.g. video:session.mp4")
+    parser.add_argument("--workers", default="1,2,4", help="Comma separated worker counts")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    frames = load_frames(args.source, args.frames)
+    height, width = frames[0].shape[:2]
+    print(f"📼 Loaded {len(frames)} frames ({width}x{height}) from {args.source}, {os.cpu_count()} CPUs")
+
+    runs = [run_in_process(frames)]
+    for workers in (int(n) for n in args.workers.split(",") if n.strip()):
+        runs.append(run_pool(frames, workers, args.warmup))
+
+    single = next((run for run in runs if run["workers"] == 1), None)
+    print("\n" + "=" * 64)
+    print(f"{'workers':>8} {'fps':>9} {'p50 ms':>9} {'p95 ms':>9} {'speedup':>9} {'efficiency':>11}")
+    for run in runs:
+        if single and run["workers"] > 0:
+            run["speedup"] = round(run["fps"] / single["fps"], 2) if single["fps"] else None
+            run["efficiency"] = round(run["speedup"] / run["workers"], 2) if run["speedup"] else None
+        label = run["workers"] or "inproc"
+        print(f"{label:>8} {run['fps']:>9.2f} {run['latency_ms']['p50']:>9.2f} {run['latency_ms']['p95']:>9.2f} "
+              f"{run.get('speedup', '-'):>9} {run.get('efficiency', '-'):>11}")
+    print("=" * 64)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({
+                "source": args.source,
+                "frame_size": [width, height],
+                "cpu_count": os.cpu_count(),
+                "runs": runs
+            }, f, indent=2)
+        print(f"💾 Report written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Landmark Recording Benchmark
+
+Records an hour (by default) of landmarks at a given inference rate in
+each recording dtype and measures:
+    - storage per hour of recording and write cost per frame
+    - replay speed through the memory-mapped reader into score_batch,
+      next to per-frame check_posture on the same landmarks
+    - how far float16 ratios / statuses drift from float32
+
+Usage (from the backend directory):
+    python benchmarks/recording_benchmark.py --fps 10 --hours 1 --json recording.json
+    python benchmarks/recording_benchmark.py --landmarks session.npy --fps 20
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from inference_pool import PoseLandmarks
+from posture import PostureChecker, normalized_v_ratios
+from recording import RECORDING_DTYPES, LandmarkRecorder, LandmarkRecording, replay_into
+from synthetic_data import synthetic_landmarks
+
+
+def calibrated_baseline(landmarks):
+    """Baseline ratio from the first frame with a person"""
+    ratios = normalized_v_ratios(landmarks)
+    return float(ratios[np.isfinite(ratios)][0])
+
+
+def bench_write(path, landmarks, fps, dtype, baseline, chunk_frames):
+    """Record every frame with timestamps 1/fps apart, returns (seconds, bytes)"""
+    start_time = time.time()
+    started = time.perf_counter()
+    recorder = LandmarkRecorder(path, dtype=dtype, chunk_frames=chunk_frames, metadata={"benchmark": True})
+    for i, frame in enumerate(landmarks):
+        recorder.add(None if np.isnan(frame).all() else frame, baseline, start_time + i / fps)
+    recorder.close()
+    return time.perf_counter() - started, os.path.getsize(path)
+
+
+def bench_replay(path, deviation_threshold=0.05):
+    """Open + re-score a recording, returns (open seconds, replay seconds, statuses, ratios)"""
+    started = time.perf_counter()
+    recording = LandmarkRecording(path)
+    opened = time.perf_counter() - started
+
+    checker = PostureChecker()
+    checker.deviation_threshold = deviation_threshold
+    statuses, ratios = [], []
+    started = time.perf_counter()
+    for _, chunk_statuses, chunk_ratios, _ in replay_into(recording, checker):
+        statuses.append(chunk_statuses)
+        ratios.append(chunk_ratios)
+    replayed = time.perf_counter() - started
+    recording.close()
+    return opened, replayed, np.concatenate(statuses), np.concatenate(ratios)
+
+
+def bench_check_posture(landmarks, baseline, frames):
+    """Per-frame check_posture on landmark objects, the live scoring path"""
+    checker = PostureChecker()
+    checker.baseline_ratio = baseline
+    checker.calibrated = True
+    objects = [PoseLandmarks(row).landmark if not np.isnan(row).all() else None for row in landmarks[:frames]]
+    started = time.perf_counter()
+    for frame in objects:
+        checker.check_posture(frame)
+    return len(objects) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Storage and replay speed of landmark recordings")
+    parser.add_argument("--fps", type=float, default=10.0, help="Inference rate the recording is made at")
+    parser.add_argument("--hours", type=float, default=1.0)
+    parser.add_argument("--landmarks", help="Recorded (N, 33, 4) landmark array (.npy), tiled to fill --hours")
+    parser.add_argument("--chunk-frames", type=int, default=256)
+    parser.add_argument("--check-frames", type=int, default=20_000, help="Frames for the check_posture comparison")
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    frames = int(args.fps * args.hours * 3600)
+    if args.landmarks:
+        source = np.load(args.landmarks).astype(np.float32)
+        landmarks = np.resize(source, (frames,) + source.shape[1:])
+    else:
+        landmarks = synthetic_landmarks(frames)
+    baseline = calibrated_baseline(landmarks)
+    print(f"📼 {frames:,} frames ({args.hours:g} h at {args.fps:g} fps)")
+
+    results = []
+    scored = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for dtype in RECORDING_DTYPES:
+            path = os.path.join(workdir, f"bench-{dtype}.pmlr")
+            write_seconds, size = bench_write(path, landmarks, args.fps, dtype, baseline, args.chunk_frames)
+            open_seconds, replay_seconds, statuses, ratios = bench_replay(path)
+            scored[dtype] = (statuses, ratios)
+            results.append({
+                "dtype": dtype,
+                "frames": frames,
+                "bytes": size,
+                "bytes_per_frame": round(size / frames, 1),
+                "mb_per_hour": round(size / args.hours / 1e6, 2),
+                "write_us_per_frame": round(write_seconds / frames * 1e6, 2),
+                "open_ms": round(open_seconds * 1000, 2),
+                "replay_frames_per_second": round(frames / replay_seconds),
+                "replay_x_realtime": round(frames / replay_seconds / args.fps)
+            })
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        check_fps = bench_check_posture(landmarks, baseline, min(frames, args.check_frames))
+
+    statuses16, ratios16 = scored["float16"]
+    statuses32, ratios32 = scored["float32"]
+    drift = {
+        "status_agreement_percent": round(float(np.mean(statuses16 == statuses32)) * 100, 3),
+        "max_ratio_error": round(float(np.max(np.abs(ratios16 - ratios32))), 6)
+    }
+
+    print("\n" + "=" * 60)
+    for result in results:
+        print(f"{result['dtype']:<8} {result['mb_per_hour']:>8.2f} MB/hour | {result['bytes_per_frame']:.0f} B/frame | "
+              f"write {result['write_us_per_frame']:.1f} us/frame | replay {result['replay_frames_per_second']:,} frames/s "
+              f"({result['replay_x_realtime']:,}x realtime)")
+    print(f"check_posture per frame: {check_fps:,.0f} frames/s")
+    print(f"float16 vs float32: {drift['status_agreement_percent']}% same status, max ratio error {drift['max_ratio_error']}")
+    print("=" * 60)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"fps": args.fps, "hours": args.hours, "results": results,
+                       "check_posture_frames_per_second": round(check_fps), "float16_drift": drift}, f, indent=2)
+        print(f"💾 Report written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
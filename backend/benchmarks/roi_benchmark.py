@@ -0,0 +1,134 @@
+"""
+ROI Benchmark
+
+Runs the same recorded footage through pose.process twice, once on the
+full frame and once with the head/shoulder ROI crop, and compares the
+per-frame latency and the posture ratio each pass produces.
+
+Usage (from the backend directory):
+    python benchmarks/roi_benchmark.py video:session.mp4 --downscale 0.5 --json roi.json
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import mediapipe as mp
+from frame_sources import open_frame_source
+from posture import PostureChecker
+from replay import summarize_ms, percentile
+from roi import RoiCropper
+
+
+def run_pass(source_spec, cropper, max_frames=None):
+    """Process a source with the given cropper, returns (latencies, ratios)"""
+    source = open_frame_source(source_spec)
+    if not source.open():
+        raise SystemExit(f"❌ Could not open frame source: {source.describe()}")
+
+    pose = mp.solutions.pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5)
+    checker = PostureChecker()
+    latencies = []
+    ratios = []
+
+    try:
+        while max_frames is None or len(ratios) < max_frames:
+            success, frame = source.read()
+            if not success:
+                if source.exhausted:
+                    break
+                continue
+
+            start = time.perf_counter()
+            pose_input, transform = cropper.prepare(frame)
+            results = pose.process(cv2.cvtColor(pose_input, cv2.COLOR_BGR2RGB))
+            cropper.restore(results, transform)
+            cropper.update(results, frame.shape)
+
+            ratio = None
+            if results.pose_landmarks:
+                ratio = checker._calculate_normalized_v_ratio(results.pose_landmarks.landmark)
+                if math.isnan(ratio):
+                    ratio = None
+            latencies.append(time.perf_counter() - start)
+            ratios.append(ratio)
+    finally:
+        source.release()
+        pose.close()
+
+    return latencies, ratios
+
+
+def compare_ratios(reference, candidate, threshold):
+    """Ratio error and status agreement of candidate against the full-frame reference"""
+    pairs = [(r, c) for r, c in zip(reference, candidate) if r is not None and c is not None]
+    if not pairs:
+        return {"compared_frames": 0}
+
+    # Use the first detected full-frame ratio as the calibration baseline
+    baseline = pairs[0][0]
+    errors = sorted(abs(r - c) for r, c in pairs)
+    agree = sum(
+        1 for r, c in pairs
+        if (abs(r - baseline) > threshold) == (abs(c - baseline) > threshold)
+    )
+
+    return {
+        "compared_frames": len(pairs),
+        "mean_abs_error": round(sum(errors) / len(errors), 5),
+        "p95_abs_error": round(percentile(errors, 95), 5),
+        "max_abs_error": round(errors[-1], 5),
+        "status_agreement": round(agree / len(pairs), 4)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare pose latency and accuracy with ROI on and off")
+    parser.add_argument("source", help="frame source spec, e.g. video:session.mp4")
+    parser.add_argument("--frames", type=int, default=None, help="max frames per pass")
+    parser.add_argument("--margin", type=float, default=0.6, help="ROI margin in shoulder widths")
+    parser.add_argument("--downscale", type=float, default=1.0, help="resize factor for the ROI pass")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    full_latencies, full_ratios = run_pass(args.source, RoiCropper(enabled=False), args.frames)
+    cropper = RoiCropper(enabled=True, margin=args.margin, downscale=args.downscale)
+    roi_latencies, roi_ratios = run_pass(args.source, cropper, args.frames)
+
+    report = {
+        "source": args.source,
+        "margin": args.margin,
+        "downscale": args.downscale,
+        "full_frame": {
+            "frames": len(full_latencies),
+            "detected": sum(1 for r in full_ratios if r is not None),
+            "latency_ms": summarize_ms(full_latencies)
+        },
+        "roi": {
+            "frames": len(roi_latencies),
+            "detected": sum(1 for r in roi_ratios if r is not None),
+            "latency_ms": summarize_ms(roi_latencies),
+            **cropper.stats()
+        },
+        "accuracy": compare_ratios(full_ratios, roi_ratios, PostureChecker().deviation_threshold)
+    }
+
+    full_p50 = report["full_frame"]["latency_ms"]["p50"]
+    roi_p50 = report["roi"]["latency_ms"]["p50"]
+    print(f"📊 Full frame p50: {full_p50:.2f} ms | ROI p50: {roi_p50:.2f} ms")
+    print(f"📊 Accuracy: {report['accuracy']}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Startup Benchmark
+
+Cold-starts the API server in a fresh process (and a scratch directory, so
+it gets its own database) and measures, from launch:
+    - first answered request (/api/health)
+    - model ready (/api/health reports ready)
+    - first scored frame after POST /api/camera/start
+alongside the server's own milestone timings from /api/health.
+
+Usage (from the backend directory):
+    python benchmarks/startup_benchmark.py --runs 3 --source synthetic:0 --json startup.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from replay import summarize_ms
+
+
+def request_json(url, method="GET", body=None, timeout=1.0):
+    """JSON response of a request, None if the server isn't answering yet"""
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method,
+                                 headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            return json.loads(response.read())
+    except (urllib.error.URLError, ConnectionError, OSError):
+        return None
+
+
+def wait_for(check, timeout, interval=0.01):
+    """Poll check() until it returns something truthy, returns (value, seconds waited)"""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        value = check()
+        if value:
+            return value, time.perf_counter() - start
+        time.sleep(interval)
+    raise SystemExit(f"❌ Timed out after {timeout:g}s")
+
+
+def run_once(port, source, extra_args, timeout):
+    """Launch one server process and time its startup milestones"""
+    base = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as workdir:
+        launched = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(BACKEND_DIR, "main.py"), "--port", str(port), *extra_args],
+            cwd=workdir,
+            env={**os.environ, "PYTHONPATH": BACKEND_DIR},
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_for(lambda: request_json(f"{base}/api/health"), timeout)
+            first_response = time.perf_counter() - launched
+
+            wait_for(lambda: (request_json(f"{base}/api/health") or {}).get("ready"), timeout)
+            ready = time.perf_counter() - launched
+
+            request_json(f"{base}/api/camera/start", "POST", {"source": source}, timeout=5.0)
+            health, _ = wait_for(
+                lambda: (lambda h: h if h and "first_scored_frame" in h.get("startup", {}) else None)(
+                    request_json(f"{base}/api/health")),
+                timeout
+            )
+            first_scored = time.perf_counter() - launched
+            request_json(f"{base}/api/camera/stop", "POST", {}, timeout=5.0)
+        finally:
+            server.terminate()
+            server.wait(10)
+
+    return {
+        "first_response_s": first_response,
+        "ready_s": ready,
+        "first_scored_frame_s": first_scored,
+        "server_milestones_ms": health["startup"],
+        "model_timings_ms": health["model"]["timings"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start time of the API server")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--source", default="synthetic:0", help="Frame source for the first scored frame")
+    parser.add_argument("--inference-workers", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    extra_args = ["--inference-workers", str(args.inference_workers)] if args.inference_workers else []
+    runs = []
+    for i in range(args.runs):
+        run = run_once(args.port, args.source, extra_args, args.timeout)
+        runs.append(run)
+        print(f"Run {i + 1}: first response {run['first_response_s'] * 1000:.0f} ms | "
+              f"ready {run['ready_s'] * 1000:.0f} ms | first scored frame {run['first_scored_frame_s'] * 1000:.0f} ms")
+
+    summary = {
+        key: summarize_ms([run[key] for run in runs])
+        for key in ("first_response_s", "ready_s", "first_scored_frame_s")
+    }
+
+    print("\n" + "=" * 50)
+    print(f"⏱️ Cold start over {len(runs)} run(s) (p50)")
+    print(f"   First response:     {summary['first_response_s']['p50']:.0f} ms")
+    print(f"   Model ready:        {summary['ready_s']['p50']:.0f} ms")
+    print(f"   First scored frame: {summary['first_scored_frame_s']['p50']:.0f} ms")
+    print("=" * 50)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"source": args.source, "summary_ms": summary, "runs": runs}, f, indent=2)
+        print(f"💾 Report written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
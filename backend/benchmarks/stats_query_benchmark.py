@@ -0,0 +1,173 @@
+"""
+Stats Query Benchmark
+
+Fills a scratch database with synthetic readings in the old schema
+(TEXT user_id, no index), times the old date-expression queries behind
+/api/stats/today and /api/stats/week, migrates the database through
+DatabaseLogger.create_tables and times the new indexed range queries.
+
+Usage (from the backend directory):
+    python benchmarks/stats_query_benchmark.py --rows 10000000 --users 200 --json stats.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseLogger, day_range
+
+LEGACY_SCHEMA = '''
+    CREATE TABLE users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        created_at REAL NOT NULL
+    );
+    CREATE TABLE posture_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        timestamp REAL NOT NULL,
+        posture_score REAL NOT NULL,
+        status TEXT NOT NULL
+    );
+'''
+
+LEGACY_TODAY_QUERY = '''
+    SELECT posture_score, status, timestamp
+    FROM posture_logs
+    WHERE user_id = ?
+    AND DATE(datetime(timestamp, 'unixepoch'), 'localtime') = ?
+    ORDER BY timestamp ASC
+'''
+
+LEGACY_WEEK_QUERY = '''
+    SELECT
+        DATE(datetime(timestamp, 'unixepoch'), 'localtime') as date,
+        AVG(posture_score) as avg_score,
+        COUNT(*) as reading_count
+    FROM posture_logs
+    WHERE user_id = ?
+    GROUP BY DATE(datetime(timestamp, 'unixepoch'), 'localtime')
+    ORDER BY date DESC
+    LIMIT 30
+'''
+
+
+def populate(path, rows, users, days, batch_size=100000):
+    """Create a legacy-schema database with `rows` readings spread over users and days"""
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.executemany(
+        'INSERT INTO users (username, created_at) VALUES (?, ?)',
+        ((f"user_{i}", time.time()) for i in range(users))
+    )
+
+    now = time.time()
+    span = days * 86400
+    rng = random.Random(42)
+
+    def generate(count):
+        for _ in range(count):
+            score = rng.random()
+            yield (
+                str(rng.randint(1, users)),
+                now - rng.random() * span,
+                score,
+                "GOOD POSTURE" if score > 0.3 else "SLOUCHING"
+            )
+
+    written = 0
+    while written < rows:
+        count = min(batch_size, rows - written)
+        conn.executemany(
+            'INSERT INTO posture_logs (user_id, timestamp, posture_score, status) VALUES (?, ?, ?, ?)',
+            generate(count)
+        )
+        conn.commit()
+        written += count
+        print(f"   {written:,} / {rows:,} rows", end="\r")
+    print()
+    conn.close()
+
+
+def time_calls(fn, repeat):
+    """Mean and max wall time of fn() in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"mean_ms": round(sum(timings) / len(timings), 3), "max_ms": round(max(timings), 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark stats queries before and after indexing")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--db", default="stats_benchmark.db", help="scratch database, overwritten")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(args.db + suffix):
+            os.remove(args.db + suffix)
+
+    print(f"📦 Generating {args.rows:,} rows for {args.users} users over {args.days} days...")
+    start = time.perf_counter()
+    populate(args.db, args.rows, args.users, args.days)
+    populate_seconds = time.perf_counter() - start
+
+    user_id = 1
+    today = datetime.now()
+    today_str = today.strftime('%Y-%m-%d')
+
+    conn = sqlite3.connect(args.db)
+    before = {
+        "today": time_calls(lambda: conn.execute(LEGACY_TODAY_QUERY, (user_id, today_str)).fetchall(), args.repeat),
+        "week": time_calls(lambda: conn.execute(LEGACY_WEEK_QUERY, (user_id,)).fetchall(), args.repeat)
+    }
+    conn.close()
+
+    print("🔧 Migrating schema...")
+    start = time.perf_counter()
+    db = DatabaseLogger(args.db)
+    migrate_seconds = time.perf_counter() - start
+
+    today_range = day_range(today)
+    week_range = day_range(today - timedelta(days=6), days=7)
+    after = {
+        "today": time_calls(lambda: db.get_logs_between(user_id, *today_range), args.repeat),
+        "week": time_calls(lambda: db.get_daily_averages(user_id, *week_range), args.repeat)
+    }
+    db.close()
+
+    report = {
+        "rows": args.rows,
+        "users": args.users,
+        "days": args.days,
+        "populate_seconds": round(populate_seconds, 2),
+        "migrate_seconds": round(migrate_seconds, 2),
+        "before": before,
+        "after": after
+    }
+
+    for name in ("today", "week"):
+        old, new = before[name]["mean_ms"], after[name]["mean_ms"]
+        print(f"📊 /api/stats/{name}: {old:.2f} ms -> {new:.2f} ms ({old / max(new, 1e-6):.0f}x)")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
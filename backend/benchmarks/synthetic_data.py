@@ -0,0 +1,141 @@
+"""
+Synthetic Posture Data
+
+Fills a database in the current schema with readings for a configurable
+number of users and days, and generates landmark sequences for scoring
+benchmarks. Readings are spread evenly over the time span in timestamp
+order (like a fleet of clients logging at once), with random users,
+scores and statuses. Rollups are rebuilt once at the end instead of row
+by row.
+
+Usage (from the backend directory):
+    python benchmarks/synthetic_data.py scratch.db --rows 1000000 --users 50 --days 30
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from database import DatabaseLogger, INSERT_LOG_SQL, READING_INTERVAL
+from posture import LEFT_SHOULDER, NOSE, NUM_LANDMARKS, RIGHT_SHOULDER, STATUS_GOOD, STATUS_NO_PERSON, STATUS_SLOUCHING
+
+# Share of readings per status
+STATUS_WEIGHTS = ((STATUS_GOOD, 0.6), (STATUS_SLOUCHING, 0.3), (STATUS_NO_PERSON, 0.1))
+
+
+def parse_size(text):
+    """'10k' / '1m' / '50M' / '2500' -> int"""
+    text = text.strip().lower().replace("_", "")
+    multiplier = 1
+    if text[-1:] in ("k", "m"):
+        multiplier = 1_000 if text[-1] == "k" else 1_000_000
+        text = text[:-1]
+    return int(float(text) * multiplier)
+
+
+def generate_readings(rows, users, days, seed=42, now=None):
+    """Yield (user_id, timestamp, posture_score, status, seconds) rows in timestamp order, ending now"""
+    rng = random.Random(seed)
+    now = now or time.time()
+    span = days * 86400
+    step = span / max(1, rows)
+    start = now - span
+    statuses = [status for status, _ in STATUS_WEIGHTS]
+    weights = [weight for _, weight in STATUS_WEIGHTS]
+
+    for i in range(rows):
+        status = rng.choices(statuses, weights)[0]
+        score = 0.0 if status == STATUS_NO_PERSON else rng.random() * 0.2
+        yield (rng.randint(1, users), start + i * step, score, status, READING_INTERVAL)
+
+
+def populate(path, rows, users, days, seed=42, batch_size=100_000, verbose=True):
+    """Create (or extend) a database with `rows` readings for users 1..users. Returns seconds taken"""
+    started = time.perf_counter()
+    db = DatabaseLogger(path)
+    try:
+        db.cursor.execute("PRAGMA synchronous = OFF")
+        for i in range(1, users + 1):
+            db.get_or_create_user(f"bench_user_{i}")
+
+        batch = []
+        written = 0
+        for row in generate_readings(rows, users, days, seed):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                db.cursor.executemany(INSERT_LOG_SQL, batch)
+                db.conn.commit()
+                written += len(batch)
+                batch = []
+                if verbose and written % (batch_size * 10) == 0:
+                    print(f"   {written:,} / {rows:,} rows")
+        if batch:
+            db.cursor.executemany(INSERT_LOG_SQL, batch)
+            db.conn.commit()
+
+        db.rebuild_rollups()
+    finally:
+        db.close()
+    return time.perf_counter() - started
+
+
+def row_count(path):
+    """Readings in an existing database, 0 if it doesn't exist"""
+    if not os.path.exists(path):
+        return 0
+    db = DatabaseLogger(path)
+    try:
+        db.cursor.execute("SELECT COUNT(*) FROM posture_logs")
+        return db.cursor.fetchone()[0]
+    finally:
+        db.close()
+
+
+def synthetic_landmarks(frames, seed=42, missing=0.05):
+    """(frames, 33, 4) float32 landmark sequence of someone slowly slouching and sitting up.
+
+    A `missing` share of frames has no person (NaN), like real recordings.
+    """
+    rng = np.random.default_rng(seed)
+    batch = np.empty((frames, NUM_LANDMARKS, 4), dtype=np.float32)
+    batch[:, :, :2] = rng.uniform(0.3, 0.7, size=(frames, NUM_LANDMARKS, 2))
+    batch[:, :, 2] = rng.normal(0.0, 0.1, size=(frames, NUM_LANDMARKS))
+    batch[:, :, 3] = rng.uniform(0.8, 1.0, size=(frames, NUM_LANDMARKS))
+
+    # Head drops towards the shoulders and back every 300 frames
+    t = np.arange(frames)
+    slouch = 0.04 * (1 - np.cos(2 * np.pi * t / 300)) / 2
+    jitter = rng.normal(0.0, 0.003, size=frames)
+    batch[:, LEFT_SHOULDER, 0] = 0.62 + jitter
+    batch[:, RIGHT_SHOULDER, 0] = 0.38 + jitter
+    batch[:, LEFT_SHOULDER, 1] = 0.65 + jitter
+    batch[:, RIGHT_SHOULDER, 1] = 0.65 - jitter
+    batch[:, NOSE, 0] = 0.5 + jitter
+    batch[:, NOSE, 1] = 0.53 + slouch + jitter
+
+    batch[rng.random(frames) < missing] = np.nan
+    return batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill a database with synthetic posture readings")
+    parser.add_argument("db", help="Database file, created if missing")
+    parser.add_argument("--rows", default="1m", help="Number of readings, e.g. 10k, 1m, 50m")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rows = parse_size(args.rows)
+    print(f"📦 Generating {rows:,} rows for {args.users} users over {args.days} days into {args.db}...")
+    seconds = populate(args.db, rows, args.users, args.days, args.seed)
+    print(f"✅ Done in {seconds:.1f}s ({rows / seconds:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
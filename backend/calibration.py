@@ -0,0 +1,118 @@
+"""
+Calibration Profiles
+
+A calibration used to be one frame's ratio held in memory, lost on every
+restart or user switch. Now a session collects the ratio over several
+frames with a detected pose and takes the median, so a blink, a glance
+away or a misdetected shoulder doesn't become the baseline. The median,
+the deviation threshold in force and the spread (median absolute
+deviation) are saved to calibration_profiles as the user's profile.
+
+CalibrationStore keeps recently used profiles in an LRU cache keyed by
+user, so starting a camera or switching to a known user applies their
+baseline before the first frame is scored.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from database import CalibrationProfile
+
+# Frames with a detected pose collected per calibration
+CALIBRATION_FRAMES = 15
+# Fewest usable frames a calibration can be built from
+MIN_CALIBRATION_FRAMES = 3
+
+
+def build_profile(user_id, ratios, deviation_threshold, now=None):
+    """CalibrationProfile from per-frame ratios: median baseline and MAD spread
+
+    Raises ValueError when fewer than MIN_CALIBRATION_FRAMES ratios are usable.
+    """
+    ratios = np.asarray(ratios, dtype=np.float64)
+    ratios = ratios[np.isfinite(ratios)]
+    if len(ratios) < MIN_CALIBRATION_FRAMES:
+        raise ValueError(f"Need at least {MIN_CALIBRATION_FRAMES} frames with a pose, got {len(ratios)}")
+
+    baseline = float(np.median(ratios))
+    spread = float(np.median(np.abs(ratios - baseline)))
+    return CalibrationProfile(user_id, baseline, float(deviation_threshold), len(ratios), spread, now or time.time())
+
+
+class CalibrationStore:
+    """LRU cache of CalibrationProfiles in front of the calibration_profiles table"""
+
+    # Cached "never calibrated" result, so unknown users don't hit the database every start
+    MISSING = object()
+
+    def __init__(self, db_manager, capacity=64):
+        self.db_manager = db_manager
+        self.capacity = max(1, capacity)
+        self.profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.saves = 0
+
+    def get(self, user_id):
+        """The user's profile, None if they never calibrated"""
+        with self._lock:
+            profile = self.profiles.get(user_id)
+            if profile is not None:
+                self.profiles.move_to_end(user_id)
+                self.hits += 1
+                return None if profile is self.MISSING else profile
+            self.misses += 1
+
+        with self.db_manager.reader() as db:
+            profile = db.get_calibration(user_id)
+        self._remember(user_id, profile or self.MISSING)
+        return profile
+
+    def save(self, profile):
+        """Write a new profile through to the database"""
+        with self.db_manager.writer() as db:
+            db.save_calibration(profile)
+        self._remember(profile.user_id, profile)
+        with self._lock:
+            self.saves += 1
+
+    def delete(self, user_id):
+        """Forget a user's calibration, returns False if there was none"""
+        with self.db_manager.writer() as db:
+            deleted = db.delete_calibration(user_id)
+        self._remember(user_id, self.MISSING)
+        return deleted
+
+    def _remember(self, user_id, profile):
+        with self._lock:
+            self.profiles[user_id] = profile
+            self.profiles.move_to_end(user_id)
+            while len(self.profiles) > self.capacity:
+                self.profiles.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "cached": len(self.profiles),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "saves": self.saves
+            }
+
+
+def profile_to_dict(profile):
+    """API shape of a CalibrationProfile"""
+    return {
+        "userId": profile.user_id,
+        "baselineRatio": round(profile.baseline_ratio, 4),
+        "deviationThreshold": profile.deviation_threshold,
+        "frames": profile.frames,
+        "spread": round(profile.spread, 4),
+        "calibratedAt": profile.calibrated_at
+    }
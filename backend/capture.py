@@ -0,0 +1,130 @@
+"""
+Capture Stage for the Posture Pipeline
+
+A CaptureThread reads frames from a FrameSource as fast as the source
+delivers them and puts them into a FrameBuffer. The inference stage takes
+frames out of the buffer, normally always the newest one, so it never
+works on frames that went stale while it was busy.
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class FrameBuffer:
+    """Small ring buffer between the capture and inference stages.
+
+    With lossless=False a full buffer overwrites its oldest frame, which
+    with capacity=1 makes it a latest-frame slot. With lossless=True the
+    producer waits for space instead, which replay mode uses so that every
+    recorded frame gets processed.
+    """
+
+    def __init__(self, capacity=1, lossless=False):
+        self.capacity = max(1, capacity)
+        self.lossless = lossless
+        self.frames = deque()
+        self.closed = False
+        self.captured = 0
+        self.dropped = 0
+        self._cond = threading.Condition()
+
+    def put(self, frame, captured_at=None):
+        """Add a frame, returns False once the buffer has been closed"""
+        with self._cond:
+            if self.lossless:
+                while len(self.frames) >= self.capacity and not self.closed:
+                    self._cond.wait()
+            if self.closed:
+                return False
+
+            if len(self.frames) >= self.capacity:
+                self.frames.popleft()
+                self.dropped += 1
+
+            self.frames.append((frame, captured_at or time.perf_counter()))
+            self.captured += 1
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout=None, latest=True):
+        """Take a (frame, captured_at) pair, or None on timeout / when closed and empty.
+
+        latest=True returns the newest frame and drops anything older.
+        """
+        with self._cond:
+            if not self.frames and not self.closed:
+                self._cond.wait(timeout)
+            if not self.frames:
+                return None
+
+            if latest:
+                item = self.frames.pop()
+                self.dropped += len(self.frames)
+                self.frames.clear()
+            else:
+                item = self.frames.popleft()
+
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        """Wake up everybody waiting, no more frames will arrive"""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    @property
+    def depth(self):
+        with self._cond:
+            return len(self.frames)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "captured_frames": self.captured,
+                "dropped_frames": self.dropped,
+                "queue_depth": len(self.frames)
+            }
+
+
+class CaptureThread(threading.Thread):
+    """Reads frames from a source into a FrameBuffer until stopped or exhausted"""
+
+    def __init__(self, source, buffer, metrics=None):
+        """metrics: optional StageMetrics, each successful read is timed as 'capture'"""
+        super().__init__(daemon=True)
+        self.source = source
+        self.buffer = buffer
+        self.metrics = metrics
+        self._stop_event = threading.Event()
+
+    def run(self):
+        try:
+            while not self._stop_event.is_set():
+                read_start = time.perf_counter()
+                success, frame = self.source.read()
+
+                if not success:
+                    if self.source.exhausted:
+                        break
+                    # Don't spin while a camera is warming up
+                    self._stop_event.wait(0.005)
+                    continue
+
+                captured_at = time.perf_counter()
+                if self.metrics is not None:
+                    self.metrics.observe("capture", captured_at - read_start)
+
+                if not self.buffer.put(frame, captured_at):
+                    break
+        finally:
+            self.buffer.close()
+
+    def stop(self, timeout=1.0):
+        """Stop capturing and wait for the thread to finish its current read"""
+        self._stop_event.set()
+        self.buffer.close()
+        if self.is_alive():
+            self.join(timeout)
@@ -2,19 +2,431 @@
 Database Logger for Posture Tracking
 """
 
+import queue
 import sqlite3
+import threading
 import time
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from metrics import LatencyHistogram
+
+# Bumped whenever create_tables() learns a new migration (stored in PRAGMA user_version)
+SCHEMA_VERSION = 5
+
+# Rows fetched per keyset page by DatabaseLogger.iter_logs
+EXPORT_PAGE_SIZE = 5000
+
+# Seconds of posture a reading stands for when none is given (sessions log
+# every 3s unless their log_interval says otherwise), and for readings
+# logged before posture_logs.seconds existed
+READING_INTERVAL = 3.0
+
+# Rollup tables and the width of their buckets in seconds. Minute and hour
+# buckets are aligned to unix time, day buckets start at local midnight.
+ROLLUP_TABLES = {
+    'minute': ('posture_rollup_minute', 60),
+    'hour': ('posture_rollup_hour', 3600),
+    'day': ('posture_rollup_day', None),
+}
+
+# db_meta key: readings before this timestamp were deleted by retention
+# and only survive in the rollups
+RAW_COMPACTED_BEFORE = 'raw_compacted_before'
+
+# One run of a debounced posture status, logged instead of a reading every
+# few seconds in the intervals log mode (intervals.py)
+PostureInterval = namedtuple('PostureInterval', (
+    'user_id', 'start_time', 'end_time', 'status', 'ratio_min', 'ratio_mean', 'ratio_max', 'samples'
+))
+
+# A user's saved calibration (calibration.py), one row per user
+CalibrationProfile = namedtuple('CalibrationProfile', (
+    'user_id', 'baseline_ratio', 'deviation_threshold', 'frames', 'spread', 'calibrated_at'
+))
+
+INSERT_INTERVAL_SQL = '''
+    INSERT INTO posture_intervals
+        (user_id, start_time, end_time, status, ratio_min, ratio_mean, ratio_max, samples)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_LOG_SQL = '''
+    INSERT INTO posture_logs (user_id, timestamp, posture_score, status, seconds)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+# Per-connection settings applied by connect(); journal_mode=WAL is set once
+# on the database file by create_tables()
+CONNECTION_PRAGMAS = {
+    'synchronous': 'NORMAL',       # WAL only needs to fsync at checkpoints
+    'cache_size': -16000,          # 16 MB page cache
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,          # ms to wait for a lock instead of failing
+}
+
+# What LogWriter.submit does when its queue is full
+ON_FULL_POLICIES = ('drop_oldest', 'drop_newest', 'block')
+
+
+class WriteVersions:
+    """Per-user counters bumped whenever rows are logged for a user
+
+    Lets the stats response cache tell whether a user's stats may have
+    changed without running any SQL.
+    """
+
+    def __init__(self):
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def bump(self, *user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+    def get(self, user_id):
+        return self._versions.get(user_id, 0)
+
+
+# Shared by every DatabaseLogger / LogWriter in the process
+write_versions = WriteVersions()
+
+
+def connect(db_name, read_only=False, check_same_thread=True):
+    """Open a SQLite connection with the tuned PRAGMAs applied"""
+    if read_only:
+        conn = sqlite3.connect(f"file:{db_name}?mode=ro", uri=True, check_same_thread=check_same_thread)
+        conn.execute('PRAGMA query_only=ON')
+    else:
+        conn = sqlite3.connect(db_name, check_same_thread=check_same_thread)
+
+    for name, value in CONNECTION_PRAGMAS.items():
+        conn.execute(f'PRAGMA {name}={value}')
+    return conn
+
+
+def day_range(day, days=1):
+    """Half-open [start, end) unix timestamps covering local calendar days from `day`"""
+    start = datetime(day.year, day.month, day.day)
+    end = start + timedelta(days=days)
+    return start.timestamp(), end.timestamp()
+
+
+def local_midnight(timestamp):
+    """Unix timestamp of the local midnight starting the day of `timestamp`"""
+    day = datetime.fromtimestamp(timestamp)
+    return datetime(day.year, day.month, day.day).timestamp()
+
+
+def bucket_start(granularity, timestamp):
+    """Start of the rollup bucket a reading falls into"""
+    width = ROLLUP_TABLES[granularity][1]
+    if width is None:
+        return local_midnight(timestamp)
+    return float(int(timestamp // width) * width)
+
+
+def get_meta(cursor, key):
+    """Numeric value stored in db_meta, None if unset"""
+    row = cursor.execute('SELECT value FROM db_meta WHERE key = ?', (key,)).fetchone()
+    return row[0] if row else None
+
+
+def set_meta(cursor, key, value):
+    """Store a numeric value in db_meta, caller commits"""
+    cursor.execute('''
+        INSERT INTO db_meta (key, value) VALUES (?, ?)
+        ON CONFLICT (key) DO UPDATE SET value = excluded.value
+    ''', (key, value))
+
+
+def classify_status(status):
+    """Return (is_good, is_bad) the same way the stats endpoints count readings"""
+    status = status.upper()
+    return 'GOOD' in status, 'SLOUCH' in status
+
+
+def next_bucket_start(granularity, start):
+    """Start of the rollup bucket following the one starting at `start`"""
+    width = ROLLUP_TABLES[granularity][1]
+    if width is None:
+        # +36h then back to midnight copes with 23h / 25h DST days
+        return local_midnight(start + 36 * 3600)
+    return start + width
+
+
+def _new_totals():
+    # score_sum, reading_count, good_count, bad_count, streak_seconds, tracked_seconds, score_seconds
+    return [0.0, 0, 0, 0, 0.0, 0.0, 0.0]
+
+
+def _upsert_rollups(cursor, table, buckets):
+    """Add {(user_id, bucket_start): totals} to a rollup table"""
+    cursor.executemany(f'''
+        INSERT INTO {table}
+            (user_id, bucket_start, score_sum, reading_count, good_count, bad_count,
+             streak_seconds, tracked_seconds, score_seconds)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (user_id, bucket_start) DO UPDATE SET
+            score_sum = score_sum + excluded.score_sum,
+            reading_count = reading_count + excluded.reading_count,
+            good_count = good_count + excluded.good_count,
+            bad_count = bad_count + excluded.bad_count,
+            streak_seconds = streak_seconds + excluded.streak_seconds,
+            tracked_seconds = tracked_seconds + excluded.tracked_seconds,
+            score_seconds = score_seconds + excluded.score_seconds
+    ''', [key + tuple(totals) for key, totals in buckets.items()])
+
+
+def update_rollups(cursor, rows):
+    """Add (user_id, timestamp, posture_score, status, seconds) rows to every rollup table"""
+    for granularity, (table, _) in ROLLUP_TABLES.items():
+        buckets = {}
+        for user_id, timestamp, score, status, seconds in rows:
+            key = (user_id, bucket_start(granularity, timestamp))
+            is_good, is_bad = classify_status(status)
+            totals = buckets.setdefault(key, _new_totals())
+            totals[0] += score
+            totals[1] += 1
+            totals[2] += is_good
+            totals[3] += is_bad
+            # A reading stands for the seconds until its session's next one
+            totals[4] += seconds if is_good else 0.0
+            totals[5] += seconds
+            totals[6] += score * seconds
+
+        _upsert_rollups(cursor, table, buckets)
+
+
+def update_interval_rollups(cursor, intervals, since=None):
+    """Add PostureIntervals to every rollup table, split at bucket boundaries.
+
+    Each bucket gets the exact seconds of the interval that fall into it;
+    the interval counts once (reading_count / good / bad) in the bucket it
+    starts in. With since, buckets starting before it are left alone.
+    """
+    for granularity, (table, _) in ROLLUP_TABLES.items():
+        buckets = {}
+        for interval in intervals:
+            is_good, is_bad = classify_status(interval.status)
+            bucket = bucket_start(granularity, interval.start_time)
+            # The start bucket is always visited so zero-length intervals still count
+            while bucket <= interval.start_time or bucket < interval.end_time:
+                following = next_bucket_start(granularity, bucket)
+                if since is None or bucket >= since:
+                    seconds = min(interval.end_time, following) - max(interval.start_time, bucket)
+                    totals = buckets.setdefault((interval.user_id, bucket), _new_totals())
+                    if bucket <= interval.start_time:
+                        totals[0] += interval.ratio_mean
+                        totals[1] += 1
+                        totals[2] += is_good
+                        totals[3] += is_bad
+                    totals[4] += seconds if is_good else 0.0
+                    totals[5] += seconds
+                    totals[6] += interval.ratio_mean * seconds
+                bucket = following
+
+        _upsert_rollups(cursor, table, buckets)
+
+
+def logged_at(row):
+    """When a queued reading or interval was handed to the logger"""
+    return row.end_time if isinstance(row, PostureInterval) else row[1]
+
+
+def insert_logs(cursor, rows):
+    """Insert (user_id, timestamp, posture_score, status, seconds) rows and their rollups, caller commits"""
+    cursor.executemany(INSERT_LOG_SQL, rows)
+    update_rollups(cursor, rows)
+
+
+def insert_intervals(cursor, intervals):
+    """Insert PostureIntervals and their rollups, caller commits"""
+    cursor.executemany(INSERT_INTERVAL_SQL, intervals)
+    update_interval_rollups(cursor, intervals)
+
+
+class LogWriter(threading.Thread):
+    """Write-behind logger that batches readings off the camera thread.
+
+    Readings go onto a bounded queue and are flushed with executemany in a
+    single transaction whenever flush_size rows are waiting or
+    flush_interval seconds have passed, whichever comes first.
+    """
+
+    def __init__(self, db_name, flush_size=50, flush_interval=1.0,
+                 max_queue=1000, on_full='drop_oldest'):
+        super().__init__(daemon=True)
+        if on_full not in ON_FULL_POLICIES:
+            raise ValueError(f"on_full must be one of {ON_FULL_POLICIES}")
+
+        self.db_name = db_name
+        self.flush_size = max(1, flush_size)
+        self.flush_interval = flush_interval
+        self.on_full = on_full
+        self.queue = queue.Queue(maxsize=max_queue)
+        self._stop_event = threading.Event()
+        self._stats_lock = threading.Lock()
+
+        self.rows_flushed = 0
+        self.rows_dropped = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+        # Flush duration, and time from a reading being logged to its commit
+        self.flush_latency = LatencyHistogram()
+        self.commit_lag = LatencyHistogram()
+
+    def submit(self, row):
+        """Queue one row, returns False if it (or an older row) had to be dropped"""
+        if self.on_full == 'block':
+            self.queue.put(row)
+            return True
+
+        try:
+            self.queue.put_nowait(row)
+            return True
+        except queue.Full:
+            pass
+
+        with self._stats_lock:
+            self.rows_dropped += 1
+
+        if self.on_full == 'drop_oldest':
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(row)
+            except queue.Full:
+                pass
+        return False
+
+    def run(self):
+        conn = connect(self.db_name)
+        cursor = conn.cursor()
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+
+        try:
+            while not (self._stop_event.is_set() and self.queue.empty()):
+                timeout = max(0.0, deadline - time.monotonic())
+                try:
+                    batch.append(self.queue.get(timeout=min(timeout, 0.1)))
+                except queue.Empty:
+                    pass
+
+                if len(batch) >= self.flush_size or time.monotonic() >= deadline:
+                    self._flush(conn, cursor, batch)
+                    batch = []
+                    deadline = time.monotonic() + self.flush_interval
+
+            self._flush(conn, cursor, batch)
+        finally:
+            conn.close()
+
+    def _flush(self, conn, cursor, batch):
+        if not batch:
+            return
+
+        start = time.perf_counter()
+        intervals = [row for row in batch if isinstance(row, PostureInterval)]
+        readings = [row for row in batch if not isinstance(row, PostureInterval)] if intervals else batch
+        try:
+            if readings:
+                insert_logs(cursor, readings)
+            if intervals:
+                insert_intervals(cursor, intervals)
+            conn.commit()
+            # log() bumped at enqueue time, this covers reads made before the commit
+            write_versions.bump(*{row[0] for row in batch})
+        except sqlite3.Error as e:
+            conn.rollback()
+            print(f"⚠️ Database flush error: {e}")
+            with self._stats_lock:
+                self.rows_dropped += len(batch)
+            return
+
+        elapsed = time.perf_counter() - start
+        elapsed_ms = elapsed * 1000
+        self.flush_latency.observe(elapsed)
+        self.commit_lag.observe(max(0.0, time.time() - min(logged_at(row) for row in batch)))
+        with self._stats_lock:
+            self.rows_flushed += len(batch)
+            self.flushes += 1
+            self.last_flush_ms = elapsed_ms
+            self.total_flush_ms += elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+
+    def queue_lag(self):
+        """Seconds the oldest queued row has been waiting, 0 when the queue is empty"""
+        with self.queue.mutex:
+            oldest = logged_at(self.queue.queue[0]) if self.queue.queue else None
+        return max(0.0, time.time() - oldest) if oldest is not None else 0.0
+
+    def stop(self, timeout=5.0):
+        """Flush everything still queued and stop the thread"""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "queue_depth": self.queue.qsize(),
+                "queue_lag_ms": round(self.queue_lag() * 1000, 1),
+                "rows_flushed": self.rows_flushed,
+                "rows_dropped": self.rows_dropped,
+                "flushes": self.flushes,
+                "last_flush_ms": round(self.last_flush_ms, 2),
+                "avg_flush_ms": round(self.total_flush_ms / self.flushes, 2) if self.flushes else 0.0,
+                "max_flush_ms": round(self.max_flush_ms, 2)
+            }
+
 
 class DatabaseLogger:
-    def __init__(self, db_name='posture_logs.db'):  # ← Changed from posture_data.db
-        """Initialize database connection"""
+    def __init__(self, db_name='posture_logs.db', conn=None):  # ← Changed from posture_data.db
+        """Initialize database connection
+
+        Without conn a new connection is opened and the schema is checked.
+        With conn (e.g. from a ConnectionManager) the schema is assumed to
+        be set up already and no DDL runs.
+        """
         self.db_name = db_name
-        self.conn = sqlite3.connect(db_name)
+        self.writer = None
+
+        if conn is not None:
+            self.conn = conn
+            self.cursor = self.conn.cursor()
+            return
+
+        self.conn = connect(db_name)
         self.cursor = self.conn.cursor()
         self.create_tables()
+
+    def start_writer(self, flush_size=50, flush_interval=1.0, max_queue=1000, on_full='drop_oldest'):
+        """Send log() calls through a background LogWriter instead of committing inline"""
+        if self.writer is None:
+            self.writer = LogWriter(self.db_name, flush_size, flush_interval, max_queue, on_full)
+            self.writer.start()
+        return self.writer
     
     def create_tables(self):
         """Create necessary tables if they don't exist"""
+        # auto_vacuum can only be switched on before the first table exists,
+        # it lets retention hand freed pages back with incremental_vacuum
+        if self.cursor.execute('PRAGMA page_count').fetchone()[0] == 0:
+            self.conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+
+        # WAL lets readers (stats endpoints) run while the writer commits
+        self.conn.execute('PRAGMA journal_mode=WAL')
+
         # Users table
         self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS users (
@@ -24,19 +436,223 @@ class DatabaseLogger:
             )
         ''')
         
-        # Posture logs table
-        self.cursor.execute('''
+        # Posture logs table, seconds is the time each reading stands for
+        self.cursor.execute(f'''
             CREATE TABLE IF NOT EXISTS posture_logs (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT NOT NULL,
+                user_id INTEGER NOT NULL,
+                timestamp REAL NOT NULL,
+                posture_score REAL NOT NULL,
+                status TEXT NOT NULL,
+                seconds REAL NOT NULL DEFAULT {READING_INTERVAL}
+            )
+        ''')
+
+        # Pre-aggregated stats, kept up to date by insert_logs()
+        for table, _ in ROLLUP_TABLES.values():
+            self.cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {table} (
+                    user_id INTEGER NOT NULL,
+                    bucket_start REAL NOT NULL,
+                    score_sum REAL NOT NULL,
+                    reading_count INTEGER NOT NULL,
+                    good_count INTEGER NOT NULL,
+                    bad_count INTEGER NOT NULL,
+                    streak_seconds REAL NOT NULL,
+                    tracked_seconds REAL NOT NULL DEFAULT 0,
+                    score_seconds REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (user_id, bucket_start)
+                ) WITHOUT ROWID
+            ''')
+
+        # Run-length posture log, written instead of posture_logs in the intervals log mode
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS posture_intervals (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                start_time REAL NOT NULL,
+                end_time REAL NOT NULL,
+                status TEXT NOT NULL,
+                ratio_min REAL NOT NULL,
+                ratio_mean REAL NOT NULL,
+                ratio_max REAL NOT NULL,
+                samples INTEGER NOT NULL
+            )
+        ''')
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_posture_intervals_user_time
+            ON posture_intervals (user_id, start_time)
+        ''')
+
+        # Latest calibration per user, loaded when a session starts for them
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS calibration_profiles (
+                user_id INTEGER PRIMARY KEY,
+                baseline_ratio REAL NOT NULL,
+                deviation_threshold REAL NOT NULL,
+                frames INTEGER NOT NULL,
+                spread REAL NOT NULL,
+                calibrated_at REAL NOT NULL
+            )
+        ''')
+
+        # Small numeric bookkeeping values, e.g. the retention watermark
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS db_meta (
+                key TEXT PRIMARY KEY,
+                value REAL NOT NULL
+            )
+        ''')
+
+        version = self.cursor.execute('PRAGMA user_version').fetchone()[0]
+        if version < 1:
+            self._migrate_user_id_to_integer()
+        if version < 4:
+            self._add_rollup_seconds()
+        if version < 5:
+            self._add_reading_seconds()
+
+        # Every stats query filters on one user and a time range
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_posture_logs_user_time
+            ON posture_logs (user_id, timestamp)
+        ''')
+
+        if version < 2:
+            self.rebuild_rollups()
+
+        self.cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        self.conn.commit()
+
+    def _migrate_user_id_to_integer(self):
+        """Rebuild posture_logs from older databases that stored user_id as TEXT"""
+        columns = self.cursor.execute('PRAGMA table_info(posture_logs)').fetchall()
+        user_id_type = next(col[2] for col in columns if col[1] == 'user_id')
+        if user_id_type.upper() == 'INTEGER':
+            return
+
+        print("🔧 Migrating posture_logs.user_id from TEXT to INTEGER...")
+
+        # Readings logged under a name (e.g. the old "test" default) get a real user
+        self.cursor.execute('SELECT DISTINCT user_id FROM posture_logs')
+        for (old_id,) in self.cursor.fetchall():
+            if not str(old_id).isdigit():
+                new_id = self.get_or_create_user(str(old_id))
+                self.cursor.execute(
+                    'UPDATE posture_logs SET user_id = ? WHERE user_id = ?',
+                    (str(new_id), old_id)
+                )
+
+        self.cursor.execute('DROP TABLE IF EXISTS posture_logs_new')
+        self.cursor.execute('''
+            CREATE TABLE posture_logs_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
                 timestamp REAL NOT NULL,
                 posture_score REAL NOT NULL,
                 status TEXT NOT NULL
             )
         ''')
-        
+        self.cursor.execute('''
+            INSERT INTO posture_logs_new (id, user_id, timestamp, posture_score, status)
+            SELECT id, CAST(user_id AS INTEGER), timestamp, posture_score, status
+            FROM posture_logs
+        ''')
+        self.cursor.execute('DROP TABLE posture_logs')
+        self.cursor.execute('ALTER TABLE posture_logs_new RENAME TO posture_logs')
         self.conn.commit()
     
+    def _add_rollup_seconds(self):
+        """Give rollups from before the intervals log mode their tracked / score seconds"""
+        for table, _ in ROLLUP_TABLES.values():
+            columns = [col[1] for col in self.cursor.execute(f'PRAGMA table_info({table})').fetchall()]
+            if 'tracked_seconds' in columns:
+                continue
+            self.cursor.execute(f'ALTER TABLE {table} ADD COLUMN tracked_seconds REAL NOT NULL DEFAULT 0')
+            self.cursor.execute(f'ALTER TABLE {table} ADD COLUMN score_seconds REAL NOT NULL DEFAULT 0')
+            # Every reading so far stood for READING_INTERVAL seconds
+            self.cursor.execute(f'''
+                UPDATE {table}
+                SET tracked_seconds = reading_count * ?, score_seconds = score_sum * ?
+            ''', (READING_INTERVAL, READING_INTERVAL))
+
+    def _add_reading_seconds(self):
+        """Give posture_logs from before per-session log intervals a seconds column"""
+        columns = [col[1] for col in self.cursor.execute('PRAGMA table_info(posture_logs)').fetchall()]
+        if 'seconds' not in columns:
+            # Every reading so far stood for READING_INTERVAL seconds
+            self.cursor.execute(
+                f'ALTER TABLE posture_logs ADD COLUMN seconds REAL NOT NULL DEFAULT {READING_INTERVAL}'
+            )
+
+    def rebuild_rollups(self):
+        """Recompute every rollup table from posture_logs and posture_intervals.
+
+        Buckets older than the retention watermark are left alone, their
+        raw readings are gone and the rollups are all that's left of them.
+        """
+        compacted_before = get_meta(self.cursor, RAW_COMPACTED_BEFORE) or float('-inf')
+
+        for granularity, (table, width) in ROLLUP_TABLES.items():
+            if width is None:
+                # Local midnight of each reading, same as local_midnight()
+                bucket = "CAST(strftime('%s', DATE(timestamp, 'unixepoch', 'localtime'), 'utc') AS REAL)"
+            else:
+                bucket = f"CAST(CAST(timestamp / {width} AS INTEGER) * {width} AS REAL)"
+
+            self.cursor.execute(f'DELETE FROM {table} WHERE bucket_start >= ?', (compacted_before,))
+            self.cursor.execute(f'''
+                INSERT INTO {table}
+                    (user_id, bucket_start, score_sum, reading_count, good_count, bad_count,
+                     streak_seconds, tracked_seconds, score_seconds)
+                SELECT
+                    user_id,
+                    {bucket} AS bucket,
+                    SUM(posture_score),
+                    COUNT(*),
+                    SUM(UPPER(status) LIKE '%GOOD%'),
+                    SUM(UPPER(status) LIKE '%SLOUCH%'),
+                    SUM((UPPER(status) LIKE '%GOOD%') * seconds),
+                    SUM(seconds),
+                    SUM(posture_score * seconds)
+                FROM posture_logs
+                WHERE timestamp >= ?
+                GROUP BY user_id, bucket
+                HAVING bucket >= ?
+            ''', (compacted_before, compacted_before))
+
+        # Intervals are split across buckets in Python, there are few of them
+        self.cursor.execute('''
+            SELECT user_id, start_time, end_time, status, ratio_min, ratio_mean, ratio_max, samples
+            FROM posture_intervals
+            WHERE end_time >= ?
+        ''', (compacted_before,))
+        while True:
+            intervals = [PostureInterval(*row) for row in self.cursor.fetchmany(10000)]
+            if not intervals:
+                break
+            update_interval_rollups(self.conn.cursor(), intervals, since=compacted_before)
+
+        self.conn.commit()
+
+    def get_rollups(self, user_id, granularity, start, end):
+        """Get rollup rows with start <= bucket_start < end.
+
+        Rows are (bucket_start, score_sum, reading_count, good_count,
+        bad_count, streak_seconds, tracked_seconds, score_seconds), oldest
+        first. streak_seconds is the time spent in good posture.
+        """
+        table = ROLLUP_TABLES[granularity][0]
+        self.cursor.execute(f'''
+            SELECT bucket_start, score_sum, reading_count, good_count, bad_count, streak_seconds,
+                   tracked_seconds, score_seconds
+            FROM {table}
+            WHERE user_id = ? AND bucket_start >= ? AND bucket_start < ?
+            ORDER BY bucket_start ASC
+        ''', (user_id, start, end))
+
+        return self.cursor.fetchall()
+
     def get_or_create_user(self, username):
         """Get user ID or create new user"""
         self.cursor.execute('SELECT id FROM users WHERE username = ?', (username,))
@@ -54,17 +670,143 @@ class DatabaseLogger:
             self.conn.commit()
             return self.cursor.lastrowid
     
-    def log(self, user_id, posture_score, status):
-        """Log posture data"""
+    def log(self, user_id, posture_score, status, seconds=READING_INTERVAL):
+        """Log posture data, a reading that stands for `seconds` of posture"""
         timestamp = time.time()
-        
-        self.cursor.execute('''
-            INSERT INTO posture_logs (user_id, timestamp, posture_score, status)
-            VALUES (?, ?, ?, ?)
-        ''', (user_id, timestamp, posture_score, status))
-        
+        row = (user_id, timestamp, posture_score, status, seconds)
+
+        if self.writer is not None:
+            self.writer.submit(row)
+            write_versions.bump(user_id)
+            return
+
+        insert_logs(self.cursor, [row])
         self.conn.commit()
+        write_versions.bump(user_id)
     
+    def log_interval(self, interval):
+        """Log a PostureInterval (intervals log mode)"""
+        if self.writer is not None:
+            self.writer.submit(interval)
+            write_versions.bump(interval.user_id)
+            return
+
+        insert_intervals(self.cursor, [interval])
+        self.conn.commit()
+        write_versions.bump(interval.user_id)
+
+    def save_calibration(self, profile):
+        """Store a CalibrationProfile, replacing the user's previous one"""
+        self.cursor.execute('''
+            INSERT OR REPLACE INTO calibration_profiles
+                (user_id, baseline_ratio, deviation_threshold, frames, spread, calibrated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', profile)
+        self.conn.commit()
+
+    def get_calibration(self, user_id):
+        """The user's CalibrationProfile, None if they never calibrated"""
+        self.cursor.execute('''
+            SELECT user_id, baseline_ratio, deviation_threshold, frames, spread, calibrated_at
+            FROM calibration_profiles WHERE user_id = ?
+        ''', (user_id,))
+        row = self.cursor.fetchone()
+        return CalibrationProfile(*row) if row else None
+
+    def delete_calibration(self, user_id):
+        """Forget a user's calibration, returns False if there was none"""
+        self.cursor.execute('DELETE FROM calibration_profiles WHERE user_id = ?', (user_id,))
+        self.conn.commit()
+        return self.cursor.rowcount > 0
+
+    def get_intervals_between(self, user_id, start, end):
+        """Get PostureIntervals overlapping [start, end), oldest first"""
+        self.cursor.execute('''
+            SELECT user_id, start_time, end_time, status, ratio_min, ratio_mean, ratio_max, samples
+            FROM posture_intervals
+            WHERE user_id = ? AND start_time < ? AND end_time >= ?
+            ORDER BY start_time ASC
+        ''', (user_id, end, start))
+
+        return [PostureInterval(*row) for row in self.cursor.fetchall()]
+
+    def get_logs_between(self, user_id, start, end):
+        """Get (posture_score, status, timestamp) rows with start <= timestamp < end"""
+        self.cursor.execute('''
+            SELECT posture_score, status, timestamp
+            FROM posture_logs
+            WHERE user_id = ? AND timestamp >= ? AND timestamp < ?
+            ORDER BY timestamp ASC
+        ''', (user_id, start, end))
+
+        return self.cursor.fetchall()
+
+    def get_daily_averages(self, user_id, start, end):
+        """Get (local date, avg score, reading count) per day with start <= timestamp < end"""
+        # The range filter uses the (user_id, timestamp) index, only the
+        # matching rows are grouped by their local date
+        self.cursor.execute('''
+            SELECT
+                DATE(timestamp, 'unixepoch', 'localtime') as date,
+                AVG(posture_score) as avg_score,
+                COUNT(*) as reading_count
+            FROM posture_logs
+            WHERE user_id = ? AND timestamp >= ? AND timestamp < ?
+            GROUP BY date
+            ORDER BY date DESC
+        ''', (user_id, start, end))
+
+        return self.cursor.fetchall()
+
+    def iter_logs(self, user_id=None, start=None, end=None, page_size=EXPORT_PAGE_SIZE):
+        """Yield (id, user_id, timestamp, posture_score, status) rows ordered by (user_id, timestamp, id).
+
+        Rows are fetched page by page with keyset pagination: each page
+        continues after the last (timestamp, id) seen, which is a range scan
+        on idx_posture_logs_user_time, so memory stays at one page and late
+        pages cost as much as early ones. Without user_id every user is
+        exported in turn, the next user is found with an index seek.
+        """
+        start = start if start is not None else float('-inf')
+        end = end if end is not None else float('inf')
+        current_user = user_id if user_id is not None else self._next_log_user(None)
+
+        while current_user is not None:
+            last_timestamp, last_id = start, 0
+            while True:
+                # Row-value comparison keeps the seek on the index
+                self.cursor.execute('''
+                    SELECT id, user_id, timestamp, posture_score, status
+                    FROM posture_logs
+                    WHERE user_id = ? AND (timestamp, id) > (?, ?) AND timestamp < ?
+                    ORDER BY timestamp, id
+                    LIMIT ?
+                ''', (current_user, last_timestamp, last_id, end, page_size))
+                page = self.cursor.fetchall()
+                yield from page
+
+                if len(page) < page_size:
+                    break
+                last_timestamp, last_id = page[-1][2], page[-1][0]
+
+            if user_id is not None:
+                break
+            current_user = self._next_log_user(current_user)
+
+    def _next_log_user(self, after):
+        """Smallest user_id with logs greater than after (None = first), None when there are no more"""
+        if after is None:
+            self.cursor.execute('SELECT MIN(user_id) FROM posture_logs')
+        else:
+            self.cursor.execute('SELECT MIN(user_id) FROM posture_logs WHERE user_id > ?', (after,))
+        row = self.cursor.fetchone()
+        return row[0] if row else None
+
+    def get_user_names(self):
+        """{user_id: username} for every user"""
+        self.cursor.execute('SELECT id, username FROM users')
+        return dict(self.cursor.fetchall())
+
     def get_recent_logs(self, user_id, limit=10):
         """Get recent logs for a user"""
         self.cursor.execute('''
@@ -79,4 +821,88 @@ class DatabaseLogger:
     
     def close(self):
         """Close database connection"""
-        self.conn.close()
\ No newline at end of file
+        if self.writer is not None:
+            self.writer.stop()
+            self.writer = None
+        self.conn.close()
+
+
+class ConnectionManager:
+    """Shares tuned SQLite connections instead of opening one per request.
+
+    The schema is set up once by init_schema(). Request handlers borrow a
+    connection from the reader (read-only) or writer pool for the length
+    of a with block; long-lived threads such as the camera loop get their
+    own connection from connect().
+    """
+
+    def __init__(self, db_name='posture_logs.db', pool_size=4):
+        self.db_name = db_name
+        self.pool_size = pool_size
+        self._pools = {True: [], False: []}  # read_only -> idle connections
+        self._lock = threading.Lock()
+        self.schema_ready = False
+
+    def init_schema(self):
+        """Create / migrate tables, meant to run once at startup"""
+        db = DatabaseLogger(self.db_name)
+        db.close()
+        self.schema_ready = True
+
+    def connect(self, read_only=False, check_same_thread=True):
+        """Dedicated DatabaseLogger for a long-lived thread or a streamed response, caller closes it"""
+        return DatabaseLogger(self.db_name, conn=connect(self.db_name, read_only, check_same_thread))
+
+    @contextmanager
+    def _borrow(self, read_only):
+        with self._lock:
+            pool = self._pools[read_only]
+            conn = pool.pop() if pool else None
+        if conn is None:
+            # Pooled connections move between Flask's request threads, but
+            # only one thread uses a connection at a time
+            conn = connect(self.db_name, read_only=read_only, check_same_thread=False)
+
+        try:
+            yield DatabaseLogger(self.db_name, conn=conn)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            with self._lock:
+                pool = self._pools[read_only]
+                if len(pool) < self.pool_size:
+                    pool.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+
+    def reader(self):
+        """Borrow a read-only DatabaseLogger: with manager.reader() as db: ..."""
+        return self._borrow(True)
+
+    def writer(self):
+        """Borrow a read-write DatabaseLogger: with manager.writer() as db: ..."""
+        return self._borrow(False)
+
+    def close_all(self):
+        with self._lock:
+            for pool in self._pools.values():
+                for conn in pool:
+                    conn.close()
+                pool.clear()
+
+
+if __name__ == "__main__":
+    import sys
+
+    db_path = sys.argv[2] if len(sys.argv) > 2 else 'posture_logs.db'
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--rebuild-rollups":
+        db = DatabaseLogger(db_path)
+        start = time.perf_counter()
+        db.rebuild_rollups()
+        print(f"✅ Rollups rebuilt for {db_path} in {time.perf_counter() - start:.2f}s")
+        db.close()
+    else:
+        print("Usage: python database.py --rebuild-rollups [db_path]")
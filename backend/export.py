@@ -0,0 +1,136 @@
+"""
+History Export
+
+Streams posture_logs out as NDJSON or CSV for analytics tools. Rows come
+from DatabaseLogger.iter_logs (keyset pagination) and are encoded a chunk
+at a time, so memory use stays flat however many months are exported.
+Used by GET /api/export and by this file's CLI.
+
+Usage (from the backend directory):
+    python export.py --format csv --user alice --start 2025-01-01 --end 2025-04-01 --output alice.csv
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+from datetime import datetime, timezone
+
+from database import DatabaseLogger, EXPORT_PAGE_SIZE, connect
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+EXPORT_COLUMNS = ("id", "user_id", "user_name", "timestamp", "time", "posture_score", "status")
+
+# Rows encoded into one chunk of the streamed response
+ROWS_PER_CHUNK = 1000
+
+
+def parse_time(value):
+    """Unix seconds, or an ISO date / datetime in local time, to a unix timestamp. None stays None"""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        raise ValueError(f"Invalid time: {value!r} (use unix seconds or an ISO date)")
+
+
+def export_records(db, user_id=None, start=None, end=None, page_size=EXPORT_PAGE_SIZE):
+    """Yield one tuple per reading in EXPORT_COLUMNS order"""
+    user_names = db.get_user_names()
+    for log_id, log_user_id, timestamp, score, status in db.iter_logs(user_id, start, end, page_size):
+        yield (
+            log_id,
+            log_user_id,
+            user_names.get(log_user_id),
+            timestamp,
+            datetime.fromtimestamp(timestamp, timezone.utc).isoformat(),
+            score,
+            status
+        )
+
+
+def ndjson_chunks(records, rows_per_chunk=ROWS_PER_CHUNK):
+    """One JSON object per line, grouped into chunks of rows_per_chunk lines"""
+    lines = []
+    for record in records:
+        lines.append(json.dumps(dict(zip(EXPORT_COLUMNS, record))))
+        if len(lines) >= rows_per_chunk:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def csv_chunks(records, rows_per_chunk=ROWS_PER_CHUNK):
+    """A header row then the records, grouped into chunks of rows_per_chunk lines"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    count = 0
+    for record in records:
+        writer.writerow(record)
+        count += 1
+        if count % rows_per_chunk == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_export(db, fmt="ndjson", user_id=None, start=None, end=None, page_size=EXPORT_PAGE_SIZE):
+    """Generator of text chunks for the whole export"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt} (use {' or '.join(EXPORT_FORMATS)})")
+    records = export_records(db, user_id, start, end, page_size)
+    return ndjson_chunks(records) if fmt == "ndjson" else csv_chunks(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export posture history as NDJSON or CSV")
+    parser.add_argument("--db", default="posture_logs.db")
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="ndjson")
+    parser.add_argument("--user", help="User name to export (default: everyone)")
+    parser.add_argument("--user-id", type=int)
+    parser.add_argument("--start", help="Unix seconds or ISO date/datetime (inclusive)")
+    parser.add_argument("--end", help="Unix seconds or ISO date/datetime (exclusive)")
+    parser.add_argument("--page-size", type=int, default=EXPORT_PAGE_SIZE)
+    parser.add_argument("--output", help="File to write (default: stdout)")
+    args = parser.parse_args()
+
+    db = DatabaseLogger(args.db, conn=connect(args.db, read_only=True))
+    try:
+        user_id = args.user_id
+        if args.user:
+            db.cursor.execute('SELECT id FROM users WHERE username = ?', (args.user,))
+            row = db.cursor.fetchone()
+            if row is None:
+                raise SystemExit(f"❌ Unknown user: {args.user}")
+            user_id = row[0]
+
+        chunks = stream_export(db, args.format, user_id, parse_time(args.start), parse_time(args.end), args.page_size)
+        out = open(args.output, "w", newline="") if args.output else sys.stdout
+        try:
+            for chunk in chunks:
+                out.write(chunk)
+        finally:
+            if args.output:
+                out.close()
+    finally:
+        db.close()
+
+    if args.output:
+        print(f"💾 Export written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
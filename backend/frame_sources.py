@@ -0,0 +1,233 @@
+"""
+Frame Sources for the Posture Pipeline
+
+Every source hands out BGR frames through read() the same way
+cv2.VideoCapture does, so the camera loops can run against a webcam,
+a recorded video, a folder of images or generated frames.
+"""
+
+import os
+import time
+import cv2
+import numpy as np
+
+DEFAULT_SOURCE = "camera:0"
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+class FrameSource:
+    """Base class for all frame sources"""
+    kind = "base"
+    live = False  # Live sources produce frames in real time and never run out
+
+    def __init__(self, realtime=False, fps=30.0):
+        self.realtime = realtime
+        self.fps = fps
+        self.exhausted = False
+        self.frames_read = 0
+        self._next_frame_time = None
+
+    def open(self):
+        """Open the source, returns True on success"""
+        return True
+
+    def read(self):
+        """Return (success, frame) like cv2.VideoCapture.read()"""
+        raise NotImplementedError
+
+    def release(self):
+        """Release any underlying resources"""
+        pass
+
+    def describe(self):
+        return self.kind
+
+    def _pace(self):
+        """Sleep so recorded sources play back at their native frame rate"""
+        if not self.realtime or self.fps <= 0:
+            return
+        now = time.perf_counter()
+        if self._next_frame_time is None:
+            self._next_frame_time = now
+        delay = self._next_frame_time - now
+        if delay > 0:
+            time.sleep(delay)
+        self._next_frame_time = max(self._next_frame_time, now) + 1.0 / self.fps
+
+
+class CameraSource(FrameSource):
+    """Live webcam through cv2.VideoCapture"""
+    kind = "camera"
+    live = True
+
+    def __init__(self, device=0):
+        super().__init__(realtime=True)
+        self.device = device
+        self.cap = None
+
+    def open(self):
+        self.cap = cv2.VideoCapture(self.device)
+        return self.cap.isOpened()
+
+    def read(self):
+        success, frame = self.cap.read()
+        if success:
+            self.frames_read += 1
+        return success, frame
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+
+    def describe(self):
+        return f"camera:{self.device}"
+
+
+class VideoFileSource(FrameSource):
+    """Recorded video file, read until the end"""
+    kind = "video"
+
+    def __init__(self, path, realtime=False):
+        super().__init__(realtime=realtime)
+        self.path = path
+        self.cap = None
+
+    def open(self):
+        if not os.path.isfile(self.path):
+            return False
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            return False
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        return True
+
+    def read(self):
+        success, frame = self.cap.read()
+        if not success:
+            self.exhausted = True
+            return False, None
+        self._pace()
+        self.frames_read += 1
+        return True, frame
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+
+    def describe(self):
+        return f"video:{self.path}"
+
+
+class ImageDirectorySource(FrameSource):
+    """Directory of still images, played in file name order"""
+    kind = "images"
+
+    def __init__(self, path, realtime=False, fps=30.0):
+        super().__init__(realtime=realtime, fps=fps)
+        self.path = path
+        self.files = []
+
+    def open(self):
+        if not os.path.isdir(self.path):
+            return False
+        self.files = sorted(
+            os.path.join(self.path, name)
+            for name in os.listdir(self.path)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        return len(self.files) > 0
+
+    def read(self):
+        while self.frames_read < len(self.files):
+            frame = cv2.imread(self.files[self.frames_read])
+            self.frames_read += 1
+            if frame is not None:
+                self._pace()
+                return True, frame
+        self.exhausted = True
+        return False, None
+
+    def describe(self):
+        return f"images:{self.path}"
+
+
+class SyntheticSource(FrameSource):
+    """Generated frames for throughput testing on machines without a webcam.
+
+    The frames are a moving gradient with no person in them, so they
+    exercise capture, conversion and inference but never score a posture.
+    """
+    kind = "synthetic"
+
+    def __init__(self, frames=300, width=640, height=480, realtime=False, fps=30.0):
+        super().__init__(realtime=realtime, fps=fps)
+        self.total_frames = frames
+        self.width = width
+        self.height = height
+        self._base = None
+
+    def open(self):
+        row = np.linspace(0, 255, self.width, dtype=np.float32)
+        gradient = np.tile(row, (self.height, 1)).astype(np.uint8)
+        self._base = np.dstack([gradient, gradient[::-1], np.roll(gradient, self.width // 3, axis=1)])
+        return True
+
+    def read(self):
+        if self.total_frames is not None and self.frames_read >= self.total_frames:
+            self.exhausted = True
+            return False, None
+        frame = np.roll(self._base, self.frames_read * 4, axis=1)
+        self._pace()
+        self.frames_read += 1
+        return True, frame
+
+    def describe(self):
+        # Endless sources have no count to show
+        return f"synthetic:{self.total_frames}" if self.total_frames is not None else "synthetic"
+
+
+def open_frame_source(spec=None, realtime=False):
+    """Build a frame source from a spec string.
+
+    Supported specs:
+        camera[:index]     live webcam (default camera:0)
+        video:<path>       recorded video file
+        images:<dir>       directory of still images
+        synthetic[:count]  generated frames, count 0 means endless
+
+    A bare integer is treated as a camera index and a bare path as a video
+    file or image directory. realtime=True paces recorded sources at their
+    native frame rate; otherwise they are read as fast as possible.
+    Raises ValueError for specs that cannot be understood.
+    """
+    spec = (spec or DEFAULT_SOURCE).strip()
+
+    if spec.isdigit():
+        return CameraSource(int(spec))
+    if os.path.isfile(spec):
+        return VideoFileSource(spec, realtime=realtime)
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, realtime=realtime)
+
+    kind, _, arg = spec.partition(':')
+    kind = kind.lower()
+
+    if kind == "camera":
+        if arg and not arg.isdigit():
+            raise ValueError(f"Invalid camera index: {arg}")
+        return CameraSource(int(arg) if arg else 0)
+    if kind == "video":
+        if not arg:
+            raise ValueError("video source needs a file path")
+        return VideoFileSource(arg, realtime=realtime)
+    if kind == "images":
+        if not arg:
+            raise ValueError("images source needs a directory")
+        return ImageDirectorySource(arg, realtime=realtime)
+    if kind == "synthetic":
+        if arg and not arg.isdigit():
+            raise ValueError(f"Invalid synthetic frame count: {arg}")
+        frames = int(arg) if arg else 300
+        return SyntheticSource(frames=frames or None, realtime=realtime)
+
+    raise ValueError(f"Unknown frame source: {spec}")
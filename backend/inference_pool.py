@@ -0,0 +1,349 @@
+"""
+Out-of-Process Inference Pool
+
+Runs MediaPipe pose.process in worker processes so inference doesn't
+compete with Flask for the GIL, and several sessions can run inference on
+separate cores. Each worker owns one pose graph and two shared-memory
+segments: the caller copies a BGR frame into the frame segment and the
+worker writes the (33, 4) landmark array into the result segment, so only
+a tiny (height, width) message crosses the pipe and frames are never
+pickled.
+
+Backpressure: a caller waits at most max_wait seconds for an idle worker
+and gets None back when they are all busy, so the session drops that frame
+instead of queueing it. A worker that dies or hangs is replaced in the
+background and the frame it was working on is dropped.
+"""
+
+import multiprocessing
+import threading
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from posture import NUM_LANDMARKS
+
+RESULT_BYTES = NUM_LANDMARKS * 4 * np.dtype(np.float32).itemsize
+
+
+class Landmark:
+    """Mutable stand-in for a MediaPipe NormalizedLandmark"""
+    __slots__ = ("x", "y", "z", "visibility")
+
+    def __init__(self, x, y, z, visibility):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.visibility = visibility
+
+
+class PoseLandmarks:
+    """Stand-in for results.pose_landmarks, built from a (33, 4) array"""
+
+    def __init__(self, array):
+        self.landmark = [Landmark(*row) for row in array.tolist()]
+
+
+class PoseResults:
+    """Stand-in for the pose.process results object"""
+
+    def __init__(self, pose_landmarks=None):
+        self.pose_landmarks = pose_landmarks
+
+
+def _worker_main(conn, frame_name, result_name, pose_options):
+    """Worker process: (height, width) in, landmarks found True/False out"""
+    import mediapipe as mp
+    from posture import landmarks_to_array
+
+    frame_shm = shared_memory.SharedMemory(name=frame_name)
+    result_shm = shared_memory.SharedMemory(name=result_name)
+    landmarks_out = np.ndarray((NUM_LANDMARKS, 4), dtype=np.float32, buffer=result_shm.buf)
+    pose = mp.solutions.pose.Pose(**pose_options)
+    frame = None
+    conn.send("ready")
+
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+
+            height, width = message
+            frame = np.ndarray((height, width, 3), dtype=np.uint8, buffer=frame_shm.buf)
+            results = pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+            if results.pose_landmarks:
+                landmarks_out[:] = landmarks_to_array(results.pose_landmarks.landmark)
+                conn.send(True)
+            else:
+                conn.send(False)
+    finally:
+        pose.close()
+        del frame, landmarks_out
+        frame_shm.close()
+        result_shm.close()
+
+
+class _Worker:
+    """Parent-side handle for one worker process and its shared memory"""
+
+    def __init__(self, index, frame_bytes):
+        self.index = index
+        self.frame_shm = shared_memory.SharedMemory(create=True, size=frame_bytes)
+        self.result_shm = shared_memory.SharedMemory(create=True, size=RESULT_BYTES)
+        self.landmarks = np.ndarray((NUM_LANDMARKS, 4), dtype=np.float32, buffer=self.result_shm.buf)
+        self.process = None
+        self.conn = None
+        self.jobs = 0
+        self.busy_seconds = 0.0
+        self.restarts = 0
+
+    def spawn(self, context, pose_options, timeout):
+        """Start the worker process and wait for its pose graph to load"""
+        parent_conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, self.frame_shm.name, self.result_shm.name, pose_options),
+            daemon=True,
+            name=f"pose-worker-{self.index}"
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+        if not self.conn.poll(timeout):
+            raise RuntimeError(f"Inference worker {self.index} did not start within {timeout:g}s")
+        self.conn.recv()
+
+    def kill(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        if self.process is not None:
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process.join(1.0)
+            self.process = None
+
+    def shutdown(self):
+        if self.conn is not None and self.process is not None and self.process.is_alive():
+            try:
+                self.conn.send(None)
+                self.process.join(2.0)
+            except (BrokenPipeError, OSError):
+                pass
+        self.kill()
+        del self.landmarks
+        self.frame_shm.close()
+        self.frame_shm.unlink()
+        self.result_shm.close()
+        self.result_shm.unlink()
+
+
+class InferencePool:
+    def __init__(self, workers=2, pose_options=None, max_width=1920, max_height=1080,
+                 max_wait=0.5, job_timeout=5.0, start_timeout=60.0):
+        """Configure the pool, call start() to launch the workers
+
+        max_width/max_height: largest frame a worker accepts, bigger frames are downscaled
+        max_wait: seconds a caller waits for an idle worker before the frame is dropped
+        job_timeout: a worker that takes longer than this on one frame is restarted
+        """
+        self.size = max(1, int(workers))
+        self.pose_options = pose_options or {}
+        self.max_width = max_width
+        self.max_height = max_height
+        self.max_wait = max_wait
+        self.job_timeout = job_timeout
+        self.start_timeout = start_timeout
+
+        # Spawned, not forked: the parent runs camera / Flask threads and
+        # forking with those alive can deadlock the child
+        self._context = multiprocessing.get_context("spawn")
+        self._cond = threading.Condition()
+        self.workers = []
+        self.idle = []
+        self.affinity = {}
+        self.closed = False
+        self.started = 0
+
+        self.jobs = 0
+        self.rejected = 0
+        self.crashes = 0
+        self.wait_seconds = 0.0
+
+    def start(self, wait=True):
+        """Launch every worker in parallel.
+
+        With wait=True this blocks until all of them are ready and raises if
+        one fails; otherwise workers join the pool one by one as their pose
+        graphs finish loading and callers get None until the first is ready.
+        """
+        frame_bytes = self.max_width * self.max_height * 3
+        self.workers = [_Worker(i, frame_bytes) for i in range(self.size)]
+
+        errors = []
+
+        def spawn(worker):
+            try:
+                worker.spawn(self._context, self.pose_options, self.start_timeout)
+            except Exception as e:
+                errors.append(e)
+                print(f"❌ Inference worker {worker.index} failed to start: {e}")
+                return
+            with self._cond:
+                self.started += 1
+                started = self.started
+            self._release(worker)
+            if started == self.size:
+                print(f"✅ Inference pool started with {self.size} worker(s)")
+
+        threads = [threading.Thread(target=spawn, args=(worker,), daemon=True) for worker in self.workers]
+        for thread in threads:
+            thread.start()
+        if not wait:
+            return self
+
+        for thread in threads:
+            thread.join()
+        if errors:
+            self.close()
+            raise errors[0]
+        return self
+
+    @property
+    def ready(self):
+        return self.started == self.size
+
+    def _acquire(self, key):
+        """Take an idle worker, preferring the one key used last. None if all stay busy"""
+        deadline = time.monotonic() + self.max_wait
+        with self._cond:
+            while not self.idle:
+                remaining = deadline - time.monotonic()
+                if self.closed or remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            if self.closed:
+                return None
+
+            # MediaPipe tracks the person between frames, keeping a session
+            # on the same worker keeps its tracker warm
+            preferred = self.affinity.get(key)
+            worker = preferred if preferred in self.idle else self.idle[-1]
+            self.idle.remove(worker)
+            if key is not None:
+                self.affinity[key] = worker
+            return worker
+
+    def _release(self, worker):
+        with self._cond:
+            self.idle.append(worker)
+            self._cond.notify()
+
+    def _restart(self, worker):
+        """Replace a crashed or hung worker, it rejoins the pool once its graph has loaded"""
+        with self._cond:
+            self.crashes += 1
+            for key, assigned in list(self.affinity.items()):
+                if assigned is worker:
+                    del self.affinity[key]
+        print(f"⚠️ Inference worker {worker.index} failed, restarting")
+
+        def restart():
+            worker.kill()
+            while not self.closed:
+                try:
+                    worker.spawn(self._context, self.pose_options, self.start_timeout)
+                    worker.restarts += 1
+                    self._release(worker)
+                    return
+                except Exception as e:
+                    worker.kill()
+                    print(f"❌ Inference worker {worker.index} restart failed: {e}")
+                    time.sleep(1.0)
+
+        threading.Thread(target=restart, daemon=True, name=f"pose-worker-{worker.index}-restart").start()
+
+    def _fit(self, frame):
+        """Downscale frames bigger than the shared-memory slot, landmarks are normalized anyway"""
+        height, width = frame.shape[:2]
+        if width <= self.max_width and height <= self.max_height:
+            return frame
+        scale = min(self.max_width / width, self.max_height / height)
+        return cv2.resize(frame, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+
+    def process(self, frame, key=None):
+        """Run pose detection on a BGR frame in a worker process.
+
+        Returns a results object shaped like pose.process output, or None if
+        no worker was free within max_wait or the worker failed (the frame
+        is dropped).
+        """
+        frame = self._fit(frame)
+        height, width = frame.shape[:2]
+
+        wait_start = time.perf_counter()
+        worker = self._acquire(key)
+        waited = time.perf_counter() - wait_start
+        with self._cond:
+            self.wait_seconds += waited
+            if worker is None:
+                self.rejected += 1
+                return None
+
+        job_start = time.perf_counter()
+        try:
+            slot = np.ndarray((height, width, 3), dtype=np.uint8, buffer=worker.frame_shm.buf)
+            np.copyto(slot, frame)
+            del slot
+
+            worker.conn.send((height, width))
+            if not worker.conn.poll(self.job_timeout):
+                raise TimeoutError(f"no reply within {self.job_timeout:g}s")
+            found = worker.conn.recv()
+        except (EOFError, OSError, TimeoutError):
+            self._restart(worker)
+            return None
+
+        # Copy the landmarks out before the worker is handed to another caller
+        pose_landmarks = PoseLandmarks(worker.landmarks.copy()) if found else None
+        worker.jobs += 1
+        worker.busy_seconds += time.perf_counter() - job_start
+        with self._cond:
+            self.jobs += 1
+        self._release(worker)
+        return PoseResults(pose_landmarks)
+
+    def close(self):
+        """Stop every worker and free the shared memory"""
+        with self._cond:
+            if self.closed:
+                return
+            self.closed = True
+            self._cond.notify_all()
+        for worker in self.workers:
+            worker.shutdown()
+        print("✅ Inference pool stopped")
+
+    def stats(self):
+        with self._cond:
+            return {
+                "workers": self.size,
+                "ready": self.ready,
+                "alive": sum(1 for w in self.workers if w.process is not None and w.process.is_alive()),
+                "idle": len(self.idle),
+                "jobs": self.jobs,
+                "rejected": self.rejected,
+                "crashes": self.crashes,
+                "restarts": sum(w.restarts for w in self.workers),
+                "avgWaitMs": round(self.wait_seconds / (self.jobs + self.rejected) * 1000, 2) if self.jobs + self.rejected else 0.0,
+                "workerJobs": [w.jobs for w in self.workers],
+                "workerBusySeconds": [round(w.busy_seconds, 3) for w in self.workers]
+            }
@@ -0,0 +1,127 @@
+"""
+Run-length Posture Logging
+
+In the intervals log mode a session stores one PostureInterval per run of
+the same posture status instead of a reading every few seconds. An
+interval records its start and end time, its status and the min / mean /
+max ratio over its frames.
+
+Statuses are debounced: a new status has to hold for `debounce` seconds
+before the current interval is closed (at the moment the new status first
+appeared), so a single misdetected frame doesn't split an interval.
+Intervals are also closed after `max_length` seconds, which bounds how
+stale the stats can get while someone sits still.
+"""
+
+import math
+
+from database import PostureInterval
+
+
+class _OpenInterval:
+    def __init__(self, status, start_time):
+        self.status = status
+        self.start_time = start_time
+        self.end_time = start_time
+        self.ratio_min = math.inf
+        self.ratio_max = -math.inf
+        self.ratio_sum = 0.0
+        self.samples = 0
+
+    def add(self, ratio, now):
+        self.end_time = now
+        self.ratio_min = min(self.ratio_min, ratio)
+        self.ratio_max = max(self.ratio_max, ratio)
+        self.ratio_sum += ratio
+        self.samples += 1
+
+    def merge(self, other):
+        """Absorb the samples of a pending status that didn't last"""
+        if other.samples:
+            self.ratio_min = min(self.ratio_min, other.ratio_min)
+            self.ratio_max = max(self.ratio_max, other.ratio_max)
+            self.ratio_sum += other.ratio_sum
+            self.samples += other.samples
+        self.end_time = max(self.end_time, other.end_time)
+
+    def close(self, user_id, end_time):
+        if not self.samples:
+            return PostureInterval(user_id, self.start_time, end_time, self.status, 0.0, 0.0, 0.0, 0)
+        return PostureInterval(
+            user_id, self.start_time, end_time, self.status,
+            self.ratio_min, self.ratio_sum / self.samples, self.ratio_max, self.samples
+        )
+
+
+class IntervalTracker:
+    """Turns a stream of (status, ratio) observations into PostureIntervals"""
+
+    def __init__(self, user_id, debounce=2.0, max_length=300.0):
+        self.user_id = user_id
+        self.debounce = debounce
+        self.max_length = max_length
+        self.current = None
+        self.pending = None
+        self.intervals_closed = 0
+        self.samples = 0
+
+    def update(self, status, ratio, now):
+        """Add one observation, returns the intervals it closed (usually none)"""
+        ratio = float(ratio) if ratio is not None and math.isfinite(ratio) else 0.0
+        self.samples += 1
+        closed = []
+
+        if self.current is None:
+            self.current = _OpenInterval(status, now)
+            self.current.add(ratio, now)
+            return closed
+
+        if status == self.current.status:
+            if self.pending is not None:
+                # The other status didn't last, it was noise
+                self.current.merge(self.pending)
+                self.pending = None
+            self.current.add(ratio, now)
+        else:
+            if self.pending is None or self.pending.status != status:
+                if self.pending is not None:
+                    self.current.merge(self.pending)
+                self.pending = _OpenInterval(status, now)
+            self.pending.add(ratio, now)
+
+            if now - self.pending.start_time >= self.debounce:
+                # The new status held, the old run ended when it first appeared
+                closed.append(self._close(self.pending.start_time))
+                self.current, self.pending = self.pending, None
+
+        if now - self.current.start_time >= self.max_length and self.pending is None:
+            closed.append(self._close(now))
+            self.current = _OpenInterval(status, now)
+
+        return closed
+
+    def flush(self, now=None):
+        """Close whatever is open (session stopped, user changed, calibration lost)"""
+        closed = []
+        if self.current is not None:
+            if self.pending is not None:
+                self.current.merge(self.pending)
+            end_time = max(now if now is not None else self.current.end_time, self.current.start_time)
+            # Nothing happened since a max_length split
+            if self.current.samples or end_time > self.current.start_time:
+                closed.append(self._close(end_time))
+        self.current = None
+        self.pending = None
+        return closed
+
+    def _close(self, end_time):
+        self.intervals_closed += 1
+        return self.current.close(self.user_id, end_time)
+
+    def stats(self):
+        return {
+            "intervals": self.intervals_closed,
+            "samples": self.samples,
+            "open_status": self.current.status if self.current else None,
+            "open_seconds": round(self.current.end_time - self.current.start_time, 1) if self.current else 0.0
+        }
@@ -0,0 +1,187 @@
+"""
+Pipeline Metrics
+
+Per-stage latency histograms (capture, cvtColor, pose.process,
+check_posture, DB log) and frame rates for each session, rendered in the
+Prometheus text format by /api/metrics. Histograms keep cumulative
+Prometheus buckets for the whole run plus a rolling window of recent
+samples for p50 / p95 / p99.
+"""
+
+import threading
+import time
+from collections import deque
+
+# Bucket upper bounds in seconds, chosen around pose.process (10-200 ms)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+DEFAULT_WINDOW = 1024
+QUANTILES = (0.5, 0.95, 0.99)
+
+STAGES = ("capture", "cvt_color", "pose_process", "check_posture", "db_log")
+
+
+class LatencyHistogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS, window=DEFAULT_WINDOW):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.count += 1
+            self.sum += seconds
+            self.recent.append(seconds)
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    self.counts[i] += 1
+                    break
+
+    def quantiles(self, qs=QUANTILES):
+        """Nearest-rank quantiles of the rolling window, in seconds"""
+        with self._lock:
+            ordered = sorted(self.recent)
+        if not ordered:
+            return {q: 0.0 for q in qs}
+        return {q: ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))] for q in qs}
+
+    def cumulative_buckets(self):
+        """[(upper bound, cumulative count)] ending with +Inf, plus sum and count"""
+        with self._lock:
+            running = 0
+            result = []
+            for bound, count in zip(self.buckets, self.counts):
+                running += count
+                result.append((bound, running))
+            result.append((float("inf"), self.count))
+            return result, self.sum, self.count
+
+    def summary(self):
+        """Recent-window percentiles in milliseconds, for JSON responses"""
+        quantiles = self.quantiles()
+        with self._lock:
+            count, total = self.count, self.sum
+        return {
+            "count": count,
+            "mean_ms": round(total / count * 1000, 3) if count else 0.0,
+            "p50_ms": round(quantiles[0.5] * 1000, 3),
+            "p95_ms": round(quantiles[0.95] * 1000, 3),
+            "p99_ms": round(quantiles[0.99] * 1000, 3)
+        }
+
+
+class RateMeter:
+    """Events per second over a sliding time window"""
+
+    def __init__(self, window=5.0):
+        self.window = window
+        self.events = deque()
+        self._lock = threading.Lock()
+
+    def tick(self, now=None):
+        now = now or time.monotonic()
+        with self._lock:
+            self.events.append(now)
+            self._trim(now)
+
+    def rate(self):
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            if len(self.events) < 2:
+                return 0.0
+            span = now - self.events[0]
+            return len(self.events) / span if span > 0 else 0.0
+
+    def _trim(self, now):
+        while self.events and now - self.events[0] > self.window:
+            self.events.popleft()
+
+
+class StageMetrics:
+    """Latency histograms per pipeline stage and capture / inference rates for one session"""
+
+    def __init__(self, stages=STAGES):
+        self.stages = {stage: LatencyHistogram() for stage in stages}
+        self.capture_rate = RateMeter()
+        self.inference_rate = RateMeter()
+
+    def observe(self, stage, seconds):
+        self.stages[stage].observe(seconds)
+        if stage == "capture":
+            self.capture_rate.tick()
+        elif stage == "pose_process":
+            self.inference_rate.tick()
+
+    def summary(self):
+        return {
+            "stages": {stage: histogram.summary() for stage, histogram in self.stages.items()},
+            "capture_fps": round(self.capture_rate.rate(), 2),
+            "inference_fps": round(self.inference_rate.rate(), 2)
+        }
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class PrometheusWriter:
+    """Builds a response in the Prometheus text exposition format (0.0.4)"""
+
+    def __init__(self, prefix="posturemon_"):
+        self.prefix = prefix
+        self.families = {}
+
+    def _family(self, name, metric_type, help_text):
+        name = self.prefix + name
+        if name not in self.families:
+            self.families[name] = (metric_type, help_text, [])
+        return name, self.families[name][2]
+
+    def sample(self, name, metric_type, help_text, value, labels=None):
+        """Add one gauge or counter sample"""
+        if value is None:
+            return
+        name, samples = self._family(name, metric_type, help_text)
+        samples.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    def histogram(self, name, help_text, histogram, labels=None):
+        """Add the buckets, sum and count of a LatencyHistogram"""
+        name, samples = self._family(name, "histogram", help_text)
+        labels = labels or {}
+        buckets, total, count = histogram.cumulative_buckets()
+        for bound, cumulative in buckets:
+            samples.append(f"{name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}")
+        samples.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+        samples.append(f"{name}_count{_format_labels(labels)} {count}")
+
+    def quantiles(self, name, help_text, histogram, labels=None):
+        """Add rolling-window quantiles of a LatencyHistogram as gauges"""
+        for q, value in histogram.quantiles().items():
+            self.sample(name, "gauge", help_text, value, {**(labels or {}), "quantile": q})
+
+    def render(self):
+        lines = []
+        for name, (metric_type, help_text, samples) in self.families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
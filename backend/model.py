@@ -0,0 +1,126 @@
+"""
+Pose Model Loading
+
+Importing mediapipe and building the first pose graph takes over a second,
+so nothing imports it at module level any more. PoseModel loads it on
+first use or in the background at startup, pushes one blank frame through
+a graph to warm it up and hands that warmed graph to the first session
+that asks for one. The loading state is what /api/health reports as
+readiness. configure() swaps the graph options (tuning.py), sessions
+notice the new generation and rebuild their graphs.
+"""
+
+import importlib
+import threading
+import time
+
+import numpy as np
+
+from startup import startup_timer
+
+POSE_OPTIONS = {"min_detection_confidence": 0.5, "min_tracking_confidence": 0.5}
+
+STATE_COLD = "cold"
+STATE_LOADING = "loading"
+STATE_READY = "ready"
+STATE_FAILED = "failed"
+
+WARMUP_FRAME_SHAPE = (480, 640, 3)
+
+
+class PoseModel:
+    def __init__(self, pose_options=None):
+        self.pose_options = dict(pose_options or POSE_OPTIONS)
+        self.generation = 0
+        self.state = STATE_COLD
+        self.error = None
+        self.timings = {}
+        self.mp = None
+        self._warm_pose = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self.state == STATE_READY
+
+    def load(self):
+        """Import mediapipe and warm up a pose graph, blocks until done. Safe to call repeatedly"""
+        with self._lock:
+            if self.state == STATE_READY:
+                return self.mp
+            self.state = STATE_LOADING
+            self.error = None
+
+            try:
+                start = time.perf_counter()
+                mp = importlib.import_module("mediapipe")
+                imported = time.perf_counter()
+                pose = mp.solutions.pose.Pose(**self.pose_options)
+                built = time.perf_counter()
+                # The first process() call loads the TFLite models and allocates buffers
+                pose.process(np.zeros(WARMUP_FRAME_SHAPE, dtype=np.uint8))
+                warmed = time.perf_counter()
+            except Exception as e:
+                self.state = STATE_FAILED
+                self.error = str(e)
+                print(f"❌ Pose model failed to load: {e}")
+                raise
+
+            self.mp = mp
+            self._warm_pose = pose
+            self.timings = {
+                "importMs": round((imported - start) * 1000, 1),
+                "graphMs": round((built - imported) * 1000, 1),
+                "warmupMs": round((warmed - built) * 1000, 1)
+            }
+            self.state = STATE_READY
+
+        startup_timer.mark("model_ready")
+        print(f"✅ Pose model ready (import {self.timings['importMs']:.0f} ms, warmup {self.timings['warmupMs']:.0f} ms)")
+        return mp
+
+    def start_background(self):
+        """Load the model on a background thread so the server can answer meanwhile"""
+        def load():
+            try:
+                self.load()
+            except Exception:
+                pass
+
+        threading.Thread(target=load, daemon=True, name="pose-model-warmup").start()
+        return self
+
+    def create_pose(self):
+        """A pose graph for one session, the warmed-up graph goes to the first caller"""
+        mp = self.load()
+        with self._lock:
+            pose, self._warm_pose = self._warm_pose, None
+        return pose or mp.solutions.pose.Pose(**self.pose_options)
+
+    def configure(self, pose_options):
+        """Use new graph options (e.g. model_complexity) for every graph created from now on"""
+        with self._lock:
+            self.pose_options = {**POSE_OPTIONS, **pose_options}
+            self.generation += 1
+            stale, self._warm_pose = self._warm_pose, None
+        if stale is not None:
+            stale.close()
+        return self.generation
+
+    def solutions(self):
+        """mediapipe.solutions, loading it if needed (drawing utils for demo mode)"""
+        return self.load().solutions
+
+    def status(self):
+        return {
+            "state": self.state,
+            "ready": self.ready,
+            "error": self.error,
+            "timings": self.timings,
+            "options": self.pose_options,
+            "generation": self.generation
+        }
+
+
+# Shared by every session in this process
+pose_model = PoseModel()
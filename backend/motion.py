@@ -0,0 +1,68 @@
+"""
+Motion Gate
+
+Cheap change detector in front of pose.process. Each frame is shrunk to
+a small grayscale thumbnail and compared with the thumbnail of the last
+frame that went through inference. When the mean pixel difference stays
+under the threshold the previous pose result is reused, but never for
+more than max_skip frames in a row so the status can't go stale.
+"""
+
+import cv2
+
+
+class MotionGate:
+    def __init__(self, enabled=False, threshold=3.0, max_skip=10, thumb_size=(32, 24)):
+        """Configure the gate
+
+        threshold: mean absolute gray level difference (0-255) that counts as change
+        max_skip: max consecutive frames that may reuse the previous result
+        thumb_size: (width, height) of the comparison thumbnail
+        """
+        self.enabled = enabled
+        self.threshold = threshold
+        self.max_skip = max_skip
+        self.thumb_size = thumb_size
+
+        self.reference = None
+        self.skipped_in_row = 0
+        self.processed = 0
+        self.skipped = 0
+        self.last_diff = 0.0
+
+    def _thumbnail(self, frame):
+        small = cv2.resize(frame, self.thumb_size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def should_process(self, frame, force=False):
+        """Return True if this frame needs a fresh pose.process call"""
+        if not self.enabled:
+            self.processed += 1
+            return True
+
+        thumb = self._thumbnail(frame)
+
+        if self.reference is not None and not force:
+            self.last_diff = float(cv2.absdiff(thumb, self.reference).mean())
+            if self.last_diff <= self.threshold and self.skipped_in_row < self.max_skip:
+                self.skipped_in_row += 1
+                self.skipped += 1
+                return False
+
+        # Compare future frames against the frame that was actually processed,
+        # so slow drift still adds up and triggers inference
+        self.reference = thumb
+        self.skipped_in_row = 0
+        self.processed += 1
+        return True
+
+    def reset(self):
+        """Drop the reference frame, e.g. when the source restarts"""
+        self.reference = None
+        self.skipped_in_row = 0
+
+    def stats(self):
+        return {
+            "processed_frames": self.processed,
+            "skipped_frames": self.skipped
+        }
@@ -0,0 +1,414 @@
+"""
+Frame Pipeline
+
+One engine for API sessions and the demo window: capture runs on its own
+thread into a latest-frame slot, the inference loop takes the newest frame
+when the scheduler says it's due (or reuses the last result for a static
+scene), and every FrameResult is offered to the registered sinks:
+
+    StateSink        session.state + the posture stream, every frame
+    ReadingLogSink   one reading per log_interval (the LogWriter batches them)
+    IntervalLogSink  run-length intervals (--log-mode intervals)
+    RecorderSink     raw landmarks to a recording, on its own thread
+    OverlaySink      skeleton + status in an OpenCV window (demo mode)
+
+Each sink has its own cadence (interval) and either runs inline on the
+inference thread (cheap sinks) or on its own thread behind a small queue,
+so rendering or disk writes can only drop their own results, never hold
+back inference. Sinks count what they were offered, handled, skipped and
+dropped for per-sink throughput.
+"""
+
+import threading
+import time
+from collections import deque, namedtuple
+
+import cv2
+
+from capture import FrameBuffer, CaptureThread
+
+# One processed frame. results is the latest pose result (reused when the
+# frame wasn't inferred), baseline is None while uncalibrated.
+FrameResult = namedtuple('FrameResult', (
+    'frame', 'captured_at', 'timestamp', 'frame_count', 'results', 'status', 'distance', 'inferred', 'baseline'
+))
+
+
+class Sink:
+    """Base class for pipeline sinks
+
+    interval: least seconds between handled results, 0 takes every frame
+    threaded: handle() runs on the sink's own thread, results wait in a
+        queue of queue_size (1 keeps only the newest, replaced ones count
+        as dropped)
+    main_thread: a threaded sink whose drain() the caller runs itself
+        (OpenCV windows belong on the main thread)
+    """
+
+    name = "sink"
+
+    def __init__(self, interval=0.0, threaded=False, queue_size=1, main_thread=False):
+        self.interval = interval
+        self.threaded = threaded or main_thread
+        self.main_thread = main_thread
+        self.queue = deque(maxlen=max(1, queue_size))
+        self._ready = threading.Condition()
+        self._finished = threading.Event()
+        self._last_offer = None
+        self.started_at = None
+
+        self.offered = 0
+        self.handled = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.errors = 0
+        self.handle_seconds = 0.0
+        self.max_handle_seconds = 0.0
+
+    def accepts(self, result):
+        """Whether a result is for this sink at all (rejected ones don't use up the cadence)"""
+        return True
+
+    def handle(self, result):
+        raise NotImplementedError
+
+    def idle(self):
+        """Called by drain() while no result is waiting"""
+
+    def close(self):
+        """Called once after the last result, on the thread that handled them"""
+
+    def start(self):
+        self.started_at = time.time()
+        self._last_offer = None
+        self._finished.clear()
+
+    def offer(self, result):
+        """Hand over a result, called on the inference thread for every frame"""
+        if not self.accepts(result):
+            return
+        now = time.monotonic()
+        if self._last_offer is not None and now - self._last_offer < self.interval:
+            self.skipped += 1
+            return
+        self._last_offer = now
+        self.offered += 1
+
+        if not self.threaded:
+            self._handle(result)
+            return
+        with self._ready:
+            if len(self.queue) == self.queue.maxlen:
+                self.dropped += 1
+            self.queue.append(result)
+            self._ready.notify()
+
+    def _handle(self, result):
+        start = time.perf_counter()
+        try:
+            self.handle(result)
+        except Exception as e:
+            self.errors += 1
+            if self.errors == 1:
+                print(f"⚠️ Sink {self.name} failed: {e}")
+            return
+        elapsed = time.perf_counter() - start
+        self.handled += 1
+        self.handle_seconds += elapsed
+        self.max_handle_seconds = max(self.max_handle_seconds, elapsed)
+
+    def drain(self, timeout=0.05):
+        """Threaded sinks: handle queued results until finish() and an empty queue, then close()"""
+        try:
+            while True:
+                with self._ready:
+                    if not self.queue and not self._finished.is_set():
+                        self._ready.wait(timeout)
+                    result = self.queue.popleft() if self.queue else None
+                if result is not None:
+                    self._handle(result)
+                elif self._finished.is_set():
+                    break
+                else:
+                    self.idle()
+        finally:
+            self.close()
+
+    def finish(self):
+        """No more results are coming, drain() returns once the queue is empty"""
+        with self._ready:
+            self._finished.set()
+            self._ready.notify_all()
+
+    def stats(self):
+        elapsed = time.time() - self.started_at if self.started_at else 0.0
+        return {
+            "threaded": self.threaded,
+            "interval_seconds": self.interval,
+            "offered": self.offered,
+            "handled": self.handled,
+            "skipped": self.skipped,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "queue_depth": len(self.queue),
+            "handled_per_second": round(self.handled / elapsed, 2) if elapsed > 0 else 0.0,
+            "avg_handle_ms": round(self.handle_seconds / self.handled * 1000, 3) if self.handled else 0.0,
+            "max_handle_ms": round(self.max_handle_seconds * 1000, 3)
+        }
+
+
+class StateSink(Sink):
+    """Keeps session.state current and publishes it to the posture stream"""
+
+    name = "state"
+
+    def __init__(self, session):
+        super().__init__()
+        self.session = session
+
+    def handle(self, result):
+        session = self.session
+        session.state = {
+            "status": result.status,
+            "distance": result.distance,
+            "calibrated": result.baseline is not None,
+            "person_detected": result.results is not None and result.results.pose_landmarks is not None,
+            "timestamp": result.timestamp,
+            "frame_count": result.frame_count,
+            "latency_ms": round((time.perf_counter() - result.captured_at) * 1000, 1),
+            "inference_fps": round(session.scheduler.current_fps, 2),
+            **session.frame_buffer.stats(),
+            **session.roi.stats(),
+            **session.motion_gate.stats()
+        }
+        session.broadcaster.publish(session.state)
+
+
+class ReadingLogSink(Sink):
+    """One reading per log_interval while calibrated (log_reading only enqueues)"""
+
+    name = "db_readings"
+
+    def __init__(self, session, log_reading, interval=3.0):
+        super().__init__(interval=interval)
+        self.session = session
+        self.log_reading = log_reading
+
+    def accepts(self, result):
+        return result.baseline is not None and bool(self.session.user_id)
+
+    def handle(self, result):
+        session = self.session
+        log_start = time.perf_counter()
+        # Each reading stands for the log interval until the next one
+        self.log_reading(session.user_id, result.distance, result.status, self.interval)
+        session.metrics.observe("db_log", time.perf_counter() - log_start)
+        session.readings_logged += 1
+
+
+class IntervalLogSink(Sink):
+    """Feeds every frame to an IntervalTracker and logs the intervals it closes"""
+
+    name = "db_intervals"
+
+    def __init__(self, session, tracker, log_posture_interval):
+        super().__init__()
+        self.session = session
+        self.tracker = tracker
+        self.log_posture_interval = log_posture_interval
+        self._last_timestamp = None
+
+    def handle(self, result):
+        self._last_timestamp = result.timestamp
+        # Intervals are only kept while calibrated
+        if result.baseline is None or not self.session.user_id:
+            self._log(self.tracker.flush(result.timestamp))
+            return
+        self._log(self.tracker.update(result.status, result.distance, result.timestamp))
+
+    def _log(self, intervals):
+        session = self.session
+        for interval in intervals:
+            try:
+                log_start = time.perf_counter()
+                self.log_posture_interval(interval)
+                session.metrics.observe("db_log", time.perf_counter() - log_start)
+                session.intervals_logged += 1
+            except Exception as e:
+                print(f"⚠️ [{session.session_id}] Database log error: {e}")
+
+    def close(self):
+        self._log(self.tracker.flush(self._last_timestamp))
+
+
+class RecorderSink(Sink):
+    """Writes inferred frames' landmarks to a LandmarkRecorder off the inference thread"""
+
+    name = "recorder"
+
+    def __init__(self, recorder, queue_size=256):
+        # Every inferred frame should make it to disk, so queue rather than keep the newest
+        super().__init__(threaded=True, queue_size=queue_size)
+        self.recorder = recorder
+
+    def accepts(self, result):
+        return result.inferred
+
+    def handle(self, result):
+        results = result.results
+        self.recorder.add(
+            results.pose_landmarks.landmark if results is not None and results.pose_landmarks else None,
+            result.baseline,
+            result.timestamp
+        )
+
+    def close(self):
+        self.recorder.close()
+        print(f"📼 Recorded {self.recorder.frames_written} frames ({self.recorder.bytes_written / 1e6:.2f} MB)")
+
+
+class OverlaySink(Sink):
+    """Skeleton and status drawn in an OpenCV window (demo mode), on the caller's thread
+
+    on_key(key) gets every key pressed in the window.
+    """
+
+    name = "overlay"
+
+    def __init__(self, solutions, on_key=None, window="Posture Checker", interval=0.0):
+        super().__init__(interval=interval, main_thread=True)
+        self.solutions = solutions
+        self.on_key = on_key
+        self.window = window
+
+    def handle(self, result):
+        frame = result.frame
+        status = result.status
+
+        color = (0, 255, 0)
+        if "SLOUCHING" in status:
+            color = (0, 0, 255)
+        elif "CALIBRATE" in status:
+            color = (0, 255, 255)
+
+        cv2.putText(frame, f"STATUS: {status}", (50, 50),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1, color, 2, cv2.LINE_AA)
+
+        if result.baseline is not None:
+            cv2.putText(frame, f"V-Distance: {result.distance:.2f}", (50, 100),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2, cv2.LINE_AA)
+
+        if result.results is not None and result.results.pose_landmarks:
+            self.solutions.drawing_utils.draw_landmarks(
+                frame, result.results.pose_landmarks, self.solutions.pose.POSE_CONNECTIONS)
+
+        cv2.imshow(self.window, frame)
+        self._poll_keys()
+
+    def idle(self):
+        # Keep the window responsive between results
+        self._poll_keys()
+
+    def _poll_keys(self):
+        key = cv2.waitKey(1) & 0xFF
+        if key != 0xFF and self.on_key is not None:
+            self.on_key(key)
+
+    def close(self):
+        cv2.destroyAllWindows()
+
+
+class FramePipeline:
+    """Capture -> scheduled inference -> sinks, for one PostureSession"""
+
+    def __init__(self, session, sinks):
+        self.session = session
+        self.sinks = list(sinks)
+        self.started_at = None
+        self._threads = []
+
+    def run(self, cap):
+        """Process frames from an opened source until session.stop_event or the source ends"""
+        session = self.session
+        self.started_at = time.time()
+        cpu_start = time.thread_time()
+        for sink in self.sinks:
+            sink.start()
+            if sink.threaded and not sink.main_thread:
+                thread = threading.Thread(target=sink.drain, daemon=True,
+                                          name=f"sink-{session.session_id}-{sink.name}")
+                thread.start()
+                self._threads.append(thread)
+
+        # Capture runs on its own thread into a latest-frame slot, inference
+        # below always takes the newest frame and stale ones are dropped
+        session.frame_buffer = FrameBuffer(capacity=1)
+        capture = CaptureThread(cap, session.frame_buffer, session.metrics)
+        capture.start()
+        session.scheduler.reset()
+        session.motion_gate.reset()
+        frame_count = 0
+        results, status, distance = None, "CALIBRATE FIRST", 0.0
+
+        try:
+            while not session.stop_event.is_set():
+                # Inference rate is set by the scheduler, frames captured in
+                # between are simply dropped from the latest-frame slot
+                session.scheduler.wait_until_due(session.stop_event)
+                item = session.frame_buffer.get(timeout=0.5)
+
+                if item is None:
+                    if session.frame_buffer.closed:
+                        print(f"📼 [{session.session_id}] Frame source finished")
+                        break
+                    continue
+
+                frame, captured_at = item
+                frame_count += 1
+                session.frames += 1
+
+                # Reuse the previous status when the scene hasn't changed
+                outcome = None
+                if session.motion_gate.should_process(frame, force=session.calibration_requested.is_set()):
+                    session.ensure_pose()
+                    inference_start = time.perf_counter()
+                    outcome = session.process_frame(frame)
+                    inference_time = time.perf_counter() - inference_start
+
+                if outcome is not None:
+                    results, status, distance = outcome
+                    session.scheduler.observe(status, distance, inference_time)
+                    session.inference_frames += 1
+                    session.inference_seconds += inference_time
+                else:
+                    # Unchanged scene, or the inference pool was busy
+                    session.scheduler.skipped()
+
+                checker = session.checker
+                result = FrameResult(
+                    frame, captured_at, time.time(), frame_count, results, status,
+                    float(distance) if distance is not None else 0.0,
+                    outcome is not None,
+                    checker.baseline_ratio if checker.calibrated else None
+                )
+                for sink in self.sinks:
+                    sink.offer(result)
+                session.cpu_seconds = time.thread_time() - cpu_start
+
+                # Print status every 60 frames
+                if frame_count % 60 == 0:
+                    pose_p95 = session.metrics.stages["pose_process"].quantiles()[0.95] * 1000
+                    print(f"[{session.session_id}] Frame {frame_count}: {status} | Distance: {result.distance:.2f} | Calibrated: {checker.calibrated} | Dropped: {session.frame_buffer.dropped} | pose p95: {pose_p95:.1f} ms")
+        finally:
+            capture.stop()
+            for sink in self.sinks:
+                if sink.threaded:
+                    sink.finish()
+                else:
+                    sink.close()
+            for thread in self._threads:
+                thread.join(timeout=5.0)
+
+    def stats(self):
+        """Per-sink throughput, keyed by sink name"""
+        return {sink.name: sink.stats() for sink in self.sinks}
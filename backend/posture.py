@@ -1,54 +1,154 @@
-import mediapipe as mp
+import math
+
+import numpy as np
+
+# MediaPipe pose landmark indices, kept as plain constants so scoring
+# doesn't have to import mediapipe
+NOSE = 0
+LEFT_SHOULDER = 11
+RIGHT_SHOULDER = 12
+NUM_LANDMARKS = 33
+
+STATUS_GOOD = "GOOD POSTURE"
+STATUS_SLOUCHING = "SLOUCHING"
+STATUS_NO_PERSON = "NO PERSON DETECTED"
+STATUS_CALIBRATE = "PRESS 'C' TO CALIBRATE"
+
+# How far the ratio may move from the baseline before it counts as slouching
+DEFAULT_DEVIATION_THRESHOLD = 0.05
+
+
+def landmarks_to_array(landmarks):
+    """Convert one frame of MediaPipe landmarks to a (33, 4) float32 array of x, y, z, visibility"""
+    values = np.fromiter(
+        (value for lm in landmarks for value in (lm.x, lm.y, lm.z, lm.visibility)),
+        dtype=np.float32,
+        count=len(landmarks) * 4
+    )
+    return values.reshape(-1, 4)
+
+
+def stack_landmarks(frames):
+    """Stack per-frame landmark lists into an (N, 33, 4) float32 array.
+
+    Frames without a detected pose (None) become rows of NaN.
+    """
+    batch = np.full((len(frames), NUM_LANDMARKS, 4), np.nan, dtype=np.float32)
+    for i, landmarks in enumerate(frames):
+        if landmarks is not None:
+            batch[i] = landmarks_to_array(landmarks)
+    return batch
+
+
+def normalized_v_ratios(batch):
+    """Nose-to-shoulder vertical distance divided by shoulder width, for every frame.
+
+    batch is an (N, 33, 4) array; frames with no person or zero shoulder
+    width come out as NaN.
+    """
+    batch = np.asarray(batch, dtype=np.float32)
+    shoulder_L = batch[:, LEFT_SHOULDER]
+    shoulder_R = batch[:, RIGHT_SHOULDER]
+    nose = batch[:, NOSE]
+
+    shoulder_width = np.abs(shoulder_L[:, 0] - shoulder_R[:, 0])
+    mid_point_shoulder = (shoulder_L[:, 1] + shoulder_R[:, 1]) / 2
+
+    vertical_distance = np.abs(nose[:, 1] - mid_point_shoulder)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = vertical_distance / shoulder_width
+    ratios[~np.isfinite(ratios)] = np.nan
+    return ratios
+
+
+def normalized_v_ratio(landmarks):
+    """normalized_v_ratios() for one frame's landmark list, NaN if it can't be computed
+
+    Plain float arithmetic on the three landmarks used: building an array
+    costs more than the score itself for a single frame.
+    """
+    nose = landmarks[NOSE]
+    shoulder_L = landmarks[LEFT_SHOULDER]
+    shoulder_R = landmarks[RIGHT_SHOULDER]
+
+    shoulder_width = abs(shoulder_L.x - shoulder_R.x)
+    if shoulder_width == 0:
+        return math.nan
+    ratio = abs(nose.y - (shoulder_L.y + shoulder_R.y) / 2) / shoulder_width
+    return ratio if math.isfinite(ratio) else math.nan
 
-mp_pose = mp.solutions.pose
 
 class PostureChecker:
     def __init__(self):
         self.calibrated = False
         self.baseline_ratio = 0
-        self.deviation_threshold = 0.05
+        self.deviation_threshold = DEFAULT_DEVIATION_THRESHOLD
 
     def _calculate_normalized_v_ratio(self, landmarks):
-        shoulder_L = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-        shoulder_R = landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
-        nose = landmarks[mp_pose.PoseLandmark.NOSE.value]
-            
-
-        shoulder_width = abs(shoulder_L.x - shoulder_R.x)
-        mid_point_shoulder = (shoulder_L.y + shoulder_R.y) / 2
-
-        vertical_distance = abs(nose.y - mid_point_shoulder)
-            
-        normalized_ratio = vertical_distance / shoulder_width
-        return normalized_ratio
+        """Ratio for a single frame of landmarks, NaN if it can't be computed"""
+        return normalized_v_ratio(landmarks)
 
     def calibrate(self, landmarks):
         """Sets the current posture as the baseline for vertical head position."""
-        try:
-            
-            self.baseline_ratio = self._calculate_normalized_v_ratio(landmarks)
-            self.calibrated = True
-            print(f"Calibration successful. Baseline ratio: {self.baseline_ratio:.3f}")
-            return True
-        except:
+        if landmarks is None:
             return False
 
+        ratio = self._calculate_normalized_v_ratio(landmarks)
+        if not np.isfinite(ratio):
+            return False
+
+        self.apply_calibration(ratio)
+        print(f"Calibration successful. Baseline ratio: {self.baseline_ratio:.3f}")
+        return True
+
+    def apply_calibration(self, baseline_ratio, deviation_threshold=None):
+        """Use a known baseline (e.g. a saved calibration profile) without looking at a frame"""
+        self.baseline_ratio = float(baseline_ratio)
+        if deviation_threshold is not None:
+            self.deviation_threshold = float(deviation_threshold)
+        self.calibrated = True
+
+    def reset_calibration(self):
+        self.calibrated = False
+        self.baseline_ratio = 0
+        self.deviation_threshold = DEFAULT_DEVIATION_THRESHOLD
+
+    def score_batch(self, batch):
+        """Score a whole (N, 33, 4) batch of frames in one vectorized call.
+
+        Returns (statuses, ratios, deviations): an array of status strings and
+        two float32 arrays. Frames with no person get ratio and deviation 0.
+        """
+        ratios = normalized_v_ratios(batch)
+        missing = np.isnan(ratios)
+
+        if not self.calibrated:
+            statuses = np.full(len(ratios), STATUS_CALIBRATE, dtype=object)
+            return statuses, np.zeros_like(ratios), np.zeros_like(ratios)
+
+        deviations = np.abs(ratios - np.float32(self.baseline_ratio))
+
+        statuses = np.where(deviations > self.deviation_threshold, STATUS_SLOUCHING, STATUS_GOOD).astype(object)
+        statuses[missing] = STATUS_NO_PERSON
+        ratios[missing] = 0
+        deviations[missing] = 0
+        return statuses, ratios, deviations
+
     def check_posture(self, landmarks):
-        """Checks the current normalized ratio against the calibrated baseline."""
+        """Checks the current normalized ratio against the calibrated baseline.
+
+        The live per-frame path, scalar like score_batch but without arrays.
+        """
         if not self.calibrated:
-            return "PRESS 'C' TO CALIBRATE", 0
-
-        try:
-       
-            current_ratio = self._calculate_normalized_v_ratio(landmarks)
-
-            deviation = abs(current_ratio - self.baseline_ratio)
-        
-            if deviation > self.deviation_threshold:
-                status = "SLOUCHING"
-            else:
-                status = "GOOD POSTURE"
-            
-            return status, current_ratio
-        except:
-            return "NO PERSON DETECTED", 0
\ No newline at end of file
+            return STATUS_CALIBRATE, 0
+
+        if landmarks is None:
+            return STATUS_NO_PERSON, 0
+
+        ratio = normalized_v_ratio(landmarks)
+        if math.isnan(ratio):
+            return STATUS_NO_PERSON, 0
+
+        deviation = abs(ratio - self.baseline_ratio)
+        return (STATUS_SLOUCHING if deviation > self.deviation_threshold else STATUS_GOOD), ratio
@@ -0,0 +1,274 @@
+"""
+Landmark Recordings
+
+Sessions can record every scored frame's raw pose landmarks so new
+thresholds or metrics can be tried on old sessions without re-recording
+anyone. A recording is one append-only file:
+
+    header   b"PMLR" | uint32 version | uint32 JSON length | JSON metadata | padding to 8 bytes
+    chunk    b"CHNK" | uint32 frames n
+             float64[n] timestamps (unix seconds)
+             float32[n] calibration baseline at that frame (NaN = uncalibrated), padded to 8 bytes
+             dtype[n, 33, 4] landmarks (x, y, z, visibility), NaN rows = no person
+
+Frames are buffered and written a chunk at a time, a chunk cut short by a
+crash is ignored by the reader. LandmarkRecording memory-maps the file and
+hands out numpy views of each chunk, so replaying into
+PostureChecker.score_batch doesn't copy the landmarks (float16 is widened
+to float32 on the way in, one chunk at a time).
+
+Usage (from the backend directory):
+    python recording.py info recordings/default-1700000000.pmlr
+    python recording.py replay recordings/default-1700000000.pmlr --threshold 0.07
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+from posture import NUM_LANDMARKS, PostureChecker, landmarks_to_array
+
+MAGIC = b"PMLR"
+CHUNK_MAGIC = b"CHNK"
+FORMAT_VERSION = 1
+FIELDS = 4  # x, y, z, visibility
+
+RECORDING_DTYPES = {"float16": np.float16, "float32": np.float32}
+RECORDING_SUFFIX = ".pmlr"
+
+_HEADER = struct.Struct("<4sII")
+_CHUNK_HEADER = struct.Struct("<4sI")
+
+
+def _padding(size, alignment=8):
+    return -size % alignment
+
+
+class LandmarkRecorder:
+    """Appends landmark frames to a recording file, chunk_frames at a time"""
+
+    def __init__(self, path, dtype="float16", chunk_frames=256, metadata=None):
+        if dtype not in RECORDING_DTYPES:
+            raise ValueError(f"dtype must be one of {', '.join(RECORDING_DTYPES)}")
+
+        self.path = path
+        self.dtype = dtype
+        self.chunk_frames = max(1, chunk_frames)
+        self.frames_written = 0
+        self.bytes_written = 0
+
+        self._timestamps = np.empty(self.chunk_frames, dtype=np.float64)
+        self._baselines = np.empty(self.chunk_frames, dtype=np.float32)
+        self._landmarks = np.empty((self.chunk_frames, NUM_LANDMARKS, FIELDS), dtype=RECORDING_DTYPES[dtype])
+        self._pending = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "wb")
+
+        header = json.dumps({
+            "version": FORMAT_VERSION,
+            "dtype": dtype,
+            "landmarks": NUM_LANDMARKS,
+            "fields": FIELDS,
+            "created_at": time.time(),
+            **(metadata or {})
+        }).encode()
+        blob = _HEADER.pack(MAGIC, FORMAT_VERSION, len(header)) + header
+        self._write(blob + b"\0" * _padding(len(blob)))
+
+    def add(self, landmarks, baseline=None, timestamp=None):
+        """Record one frame: MediaPipe landmarks, a (33, 4) array or None for no person"""
+        i = self._pending
+        self._timestamps[i] = timestamp or time.time()
+        self._baselines[i] = np.nan if baseline is None else baseline
+        if landmarks is None:
+            self._landmarks[i] = np.nan
+        elif isinstance(landmarks, np.ndarray):
+            self._landmarks[i] = landmarks
+        else:
+            self._landmarks[i] = landmarks_to_array(landmarks)
+
+        self._pending += 1
+        if self._pending >= self.chunk_frames:
+            self.flush()
+
+    def flush(self):
+        """Write buffered frames out as one chunk"""
+        n = self._pending
+        if n == 0 or self._file is None:
+            return
+        baselines = self._baselines[:n].tobytes()
+        self._write(b"".join((
+            _CHUNK_HEADER.pack(CHUNK_MAGIC, n),
+            self._timestamps[:n].tobytes(),
+            baselines + b"\0" * _padding(len(baselines)),
+            self._landmarks[:n].tobytes()
+        )))
+        self._file.flush()
+        self.frames_written += n
+        self._pending = 0
+
+    def _write(self, data):
+        self._file.write(data)
+        self.bytes_written += len(data)
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "dtype": self.dtype,
+            "frames": self.frames_written + self._pending,
+            "bytes": self.bytes_written
+        }
+
+
+class LandmarkRecording:
+    """Memory-mapped, read-only view of a recording file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < _HEADER.size:
+            self._file.close()
+            raise ValueError(f"{path} is not a landmark recording")
+
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_size = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version > FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a landmark recording (or a newer format version)")
+
+        offset = _HEADER.size
+        self.metadata = json.loads(bytes(self._mmap[offset:offset + header_size]))
+        self.dtype = np.dtype(RECORDING_DTYPES[self.metadata["dtype"]])
+        offset += header_size
+        offset += _padding(offset)
+
+        # (timestamps, baselines, landmarks) views per complete chunk
+        self.chunks = []
+        frame_bytes = NUM_LANDMARKS * FIELDS * self.dtype.itemsize
+        while offset + _CHUNK_HEADER.size <= size:
+            chunk_magic, n = _CHUNK_HEADER.unpack_from(self._mmap, offset)
+            baseline_bytes = n * 4 + _padding(n * 4)
+            end = offset + _CHUNK_HEADER.size + n * 8 + baseline_bytes + n * frame_bytes
+            if chunk_magic != CHUNK_MAGIC or end > size:
+                break  # Truncated by a crash mid-write
+
+            offset += _CHUNK_HEADER.size
+            timestamps = np.frombuffer(self._mmap, np.float64, n, offset)
+            offset += n * 8
+            baselines = np.frombuffer(self._mmap, np.float32, n, offset)
+            offset += baseline_bytes
+            landmarks = np.frombuffer(self._mmap, self.dtype, n * NUM_LANDMARKS * FIELDS, offset)
+            self.chunks.append((timestamps, baselines, landmarks.reshape(n, NUM_LANDMARKS, FIELDS)))
+            offset = end
+
+        self.frames = sum(len(chunk[0]) for chunk in self.chunks)
+        self.size_bytes = size
+
+    def duration(self):
+        """Seconds between the first and last recorded frame"""
+        if not self.frames:
+            return 0.0
+        return float(self.chunks[-1][0][-1] - self.chunks[0][0][0])
+
+    def landmarks(self):
+        """Every frame as one (N, 33, 4) array (this one copies)"""
+        if not self.chunks:
+            return np.empty((0, NUM_LANDMARKS, FIELDS), dtype=self.dtype)
+        return np.concatenate([chunk[2] for chunk in self.chunks])
+
+    def close(self):
+        # numpy views keep the mmap exported, they have to go first
+        self.chunks = []
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # A caller still holds a view, the mmap closes with it
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def replay_into(recording, checker=None, recorded_calibration=True):
+    """Score every recorded frame with PostureChecker.score_batch.
+
+    With recorded_calibration the checker's baseline follows the baseline
+    recorded with each frame (uncalibrated frames score as such), otherwise
+    the checker's own calibration is used throughout. Yields
+    (timestamps, statuses, ratios, deviations) per run of frames.
+    """
+    checker = checker or PostureChecker()
+    for timestamps, baselines, landmarks in recording.chunks:
+        if not recorded_calibration:
+            yield (timestamps, *checker.score_batch(landmarks))
+            continue
+
+        # Split the chunk where the recorded baseline changes (recalibration)
+        values = np.nan_to_num(baselines, nan=-1.0)
+        edges = np.flatnonzero(np.diff(values)) + 1
+        for start, end in zip(np.r_[0, edges], np.r_[edges, len(values)]):
+            baseline = float(baselines[start])
+            checker.calibrated = np.isfinite(baseline)
+            checker.baseline_ratio = baseline if checker.calibrated else 0
+            yield (timestamps[start:end], *checker.score_batch(landmarks[start:end]))
+
+
+def recording_path(directory, session_id, started_at=None):
+    """recordings/<session>-<unix start>.pmlr"""
+    return os.path.join(directory, f"{session_id}-{int(started_at or time.time())}{RECORDING_SUFFIX}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or re-score a landmark recording")
+    parser.add_argument("command", choices=("info", "replay"))
+    parser.add_argument("path")
+    parser.add_argument("--threshold", type=float, help="deviation_threshold to score with")
+    args = parser.parse_args()
+
+    with LandmarkRecording(args.path) as recording:
+        duration = recording.duration()
+        print(f"📼 {args.path}: {recording.frames:,} frames, {duration / 60:.1f} min, "
+              f"{recording.size_bytes / 1e6:.2f} MB ({recording.metadata['dtype']})")
+        if duration > 0:
+            print(f"   {recording.size_bytes / duration * 3600 / 1e6:.1f} MB per hour")
+        if args.command == "info":
+            print(f"   {json.dumps(recording.metadata)}")
+            return
+
+        checker = PostureChecker()
+        if args.threshold is not None:
+            checker.deviation_threshold = args.threshold
+        counts = {}
+        start = time.perf_counter()
+        for _, statuses, _, _ in replay_into(recording, checker):
+            values, frequency = np.unique(statuses.astype(str), return_counts=True)
+            for status, count in zip(values, frequency):
+                counts[status] = counts.get(status, 0) + int(count)
+        elapsed = time.perf_counter() - start
+
+        print(f"   Re-scored at {recording.frames / elapsed:,.0f} frames/s "
+              f"(threshold {checker.deviation_threshold:g})" if elapsed > 0 else "")
+        for status, count in sorted(counts.items()):
+            print(f"   {status}: {count:,} ({count / max(1, recording.frames) * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
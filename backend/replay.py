@@ -0,0 +1,116 @@
+"""
+Replay Mode
+
+Runs the posture pipeline over a recorded frame source as fast as
+possible and reports end-to-end throughput and per-frame latency.
+"""
+
+import json
+import time
+from capture import FrameBuffer, CaptureThread
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def run_replay(source, process_frame, max_frames=None, buffer_size=4):
+    """Feed every frame of an opened source through process_frame.
+
+    Frames go through the same capture thread and buffer as the live
+    pipeline, but the buffer is lossless so nothing is skipped. Latency is
+    measured per frame from capture until process_frame returns, process
+    time covers process_frame alone. Returns a report dict.
+    """
+    latencies = []
+    process_times = []
+    statuses = {}
+
+    frame_buffer = FrameBuffer(capacity=buffer_size, lossless=True)
+    capture = CaptureThread(source, frame_buffer)
+    started = time.perf_counter()
+    capture.start()
+
+    try:
+        while max_frames is None or len(latencies) < max_frames:
+            item = frame_buffer.get(timeout=0.5, latest=False)
+
+            if item is None:
+                if frame_buffer.closed:
+                    break
+                continue
+
+            frame, captured_at = item
+            process_start = time.perf_counter()
+            _, status, _ = process_frame(frame)
+            done = time.perf_counter()
+
+            process_times.append(done - process_start)
+            latencies.append(done - captured_at)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        capture.stop()
+
+    elapsed = time.perf_counter() - started
+    report = build_report(source.describe(), latencies, elapsed, statuses)
+    report["process_ms"] = summarize_ms(process_times)
+    report["dropped_frames"] = frame_buffer.dropped
+    return report
+
+
+def summarize_ms(durations):
+    """Mean / percentiles / max of a list of durations in seconds, as milliseconds"""
+    ordered = sorted(durations)
+    count = len(ordered)
+    to_ms = lambda seconds: round(seconds * 1000, 3)
+
+    return {
+        "mean": to_ms(sum(ordered) / count) if count else 0.0,
+        "p50": to_ms(percentile(ordered, 50)),
+        "p95": to_ms(percentile(ordered, 95)),
+        "p99": to_ms(percentile(ordered, 99)),
+        "max": to_ms(ordered[-1]) if count else 0.0,
+    }
+
+
+def build_report(source_name, latencies, elapsed, statuses=None):
+    """Summarize a list of per-frame latencies (seconds) into a report dict"""
+    frames = len(latencies)
+
+    return {
+        "source": source_name,
+        "frames": frames,
+        "elapsed_seconds": round(elapsed, 3),
+        "fps": round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": summarize_ms(latencies),
+        "statuses": statuses or {},
+    }
+
+
+def print_report(report):
+    """Print a replay report to the terminal"""
+    latency = report["latency_ms"]
+    print("\n" + "="*50)
+    print(f"📼 Replay: {report['source']}")
+    print(f"   Frames: {report['frames']} in {report['elapsed_seconds']:.2f}s")
+    print(f"   Throughput: {report['fps']:.1f} fps")
+    print(f"   Latency (ms): mean={latency['mean']:.2f} p50={latency['p50']:.2f} "
+          f"p95={latency['p95']:.2f} p99={latency['p99']:.2f} max={latency['max']:.2f}")
+    if "process_ms" in report:
+        process = report["process_ms"]
+        print(f"   Processing (ms): mean={process['mean']:.2f} p50={process['p50']:.2f} "
+              f"p95={process['p95']:.2f} max={process['max']:.2f}")
+    for status, count in report["statuses"].items():
+        print(f"   {status}: {count}")
+    print("="*50 + "\n")
+
+
+def write_report(report, path):
+    """Write a replay report as JSON so runs can be compared"""
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"📝 Report written to {path}")
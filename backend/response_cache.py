@@ -0,0 +1,91 @@
+"""
+Stats Response Cache
+
+Caches serialized /api/stats/* responses keyed by (endpoint, user, local
+date). Each entry remembers the user's write version (database.py
+write_versions) it was built at, and is only served while that version
+hasn't moved, so logging a reading or interval invalidates the user's
+entries without any SQL. The local date in the key takes care of
+midnight.
+
+The ETag is derived from the same key and version, so an If-None-Match
+request can be answered with 304 before the cache is even looked at.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from datetime import date
+
+from database import write_versions
+
+
+class ResponseCache:
+    """LRU of serialized responses, valid while the user's write version is unchanged"""
+
+    def __init__(self, versions=write_versions, max_entries=256):
+        self.versions = versions
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # (endpoint, user_id, day) -> (version, body)
+        # Versions restart at 0 with the process, so ETags from a previous run never match
+        self.instance = os.urandom(4).hex()
+        self._lock = threading.Lock()
+
+        self.hits = {}
+        self.misses = {}
+        self.not_modified = {}
+
+    def get(self, endpoint, user_id, build, if_none_match=None):
+        """Return (status, etag, body): 304 with no body, or 200 with a cached or freshly built body
+
+        build() returns the serialized body. The version is read before
+        building, so a write that lands mid-build leaves the entry stale.
+        if_none_match(etag) tells whether the client already has etag.
+        """
+        day = date.today().isoformat()
+        key = (endpoint, user_id, day)
+        version = self.versions.get(user_id)
+        etag = f"{self.instance}-{endpoint}-{user_id}-{day}-{version}"
+
+        with self._lock:
+            if if_none_match is not None and if_none_match(etag):
+                self._count(self.not_modified, endpoint)
+                return 304, etag, None
+
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.entries.move_to_end(key)
+                self._count(self.hits, endpoint)
+                return 200, etag, entry[1]
+
+        body = build()
+        with self._lock:
+            self.entries[key] = (version, body)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self._count(self.misses, endpoint)
+        return 200, etag, body
+
+    def _count(self, counter, endpoint):
+        counter[endpoint] = counter.get(endpoint, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self._lock:
+            endpoints = sorted(set(self.hits) | set(self.misses) | set(self.not_modified))
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "endpoints": {
+                    endpoint: {
+                        "hits": self.hits.get(endpoint, 0),
+                        "misses": self.misses.get(endpoint, 0),
+                        "not_modified": self.not_modified.get(endpoint, 0)
+                    }
+                    for endpoint in endpoints
+                }
+            }
@@ -0,0 +1,259 @@
+"""
+Retention for posture_logs
+
+Raw readings and posture intervals are kept for raw_days, then deleted.
+Their totals live on in the minute / hour / day rollups that logging
+already maintains, so the stats endpoints keep working on compacted
+history. Minute and hour
+rollups are pruned the same way after minute_days / hour_days, day
+rollups are kept forever.
+
+Deletes run in small per-user batches (each its own short transaction)
+and freed pages are handed back with PRAGMA incremental_vacuum a few at a
+time, so the LogWriter never waits long for the write lock. The camera
+thread only ever enqueues, so it isn't blocked at all.
+
+Usage (from the backend directory):
+    python retention.py --raw-days 30 [--db posture_logs.db] [--enable-incremental-vacuum]
+"""
+
+import argparse
+import os
+import threading
+import time
+
+from database import (DatabaseLogger, ROLLUP_TABLES, connect, get_meta, local_midnight,
+                      set_meta, RAW_COMPACTED_BEFORE)
+
+DEFAULT_RETENTION = {
+    "raw_days": 30,        # Raw posture_logs rows
+    "minute_days": 90,     # posture_rollup_minute
+    "hour_days": 730,      # posture_rollup_hour
+}
+
+# PRAGMA auto_vacuum value for INCREMENTAL
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+def retention_cutoff(days, now=None):
+    """Local midnight `days` days ago: everything before it is compacted"""
+    now = now or time.time()
+    return local_midnight(now - days * 86400)
+
+
+class RetentionManager(threading.Thread):
+    """Compacts old rows and reclaims their space every `interval` seconds"""
+
+    def __init__(self, db_name, raw_days=30, minute_days=90, hour_days=730, interval=3600.0,
+                 initial_delay=60.0, batch_size=5000, vacuum_pages=256, pause=0.05):
+        super().__init__(daemon=True)
+        if raw_days < 1:
+            raise ValueError("raw_days must be at least 1")
+
+        self.db_name = db_name
+        self.raw_days = raw_days
+        self.minute_days = minute_days
+        self.hour_days = hour_days
+        self.interval = interval
+        self.initial_delay = initial_delay
+        self.batch_size = max(1, batch_size)
+        self.vacuum_pages = max(1, vacuum_pages)
+        self.pause = pause
+        self._stop_event = threading.Event()
+        self._run_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+        self.runs = 0
+        self.errors = 0
+        self.rows_compacted = {"posture_logs": 0, "posture_intervals": 0, "minute": 0, "hour": 0}
+        self.bytes_reclaimed = 0
+        self.last_report = None
+
+    def run(self):
+        if self._stop_event.wait(self.initial_delay):
+            return
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                with self._stats_lock:
+                    self.errors += 1
+                print(f"⚠️ Retention run failed: {e}")
+            if self._stop_event.wait(self.interval):
+                return
+
+    def run_once(self, now=None):
+        """Compact and vacuum once, returns a report of what was removed"""
+        with self._run_lock:
+            started = time.perf_counter()
+            db = DatabaseLogger(self.db_name, conn=connect(self.db_name))
+            try:
+                size_before = self._database_bytes(db)
+
+                raw_cutoff = retention_cutoff(self.raw_days, now)
+                compacted = {
+                    "posture_logs": self._delete_before(db, "posture_logs", "timestamp", raw_cutoff),
+                    # By end time, an interval running past the cutoff is still needed by rebuild_rollups
+                    "posture_intervals": self._delete_before(db, "posture_intervals", "end_time", raw_cutoff)
+                }
+                # Rebuilding rollups must not wipe the totals of deleted readings
+                if raw_cutoff > (get_meta(db.cursor, RAW_COMPACTED_BEFORE) or 0):
+                    set_meta(db.cursor, RAW_COMPACTED_BEFORE, raw_cutoff)
+                    db.conn.commit()
+
+                for granularity, days in (("minute", self.minute_days), ("hour", self.hour_days)):
+                    table = ROLLUP_TABLES[granularity][0]
+                    compacted[granularity] = self._delete_before(
+                        db, table, "bucket_start", retention_cutoff(days, now))
+
+                vacuum = self._incremental_vacuum(db)
+                size_after = self._database_bytes(db)
+            finally:
+                db.close()
+
+            report = {
+                "rows_compacted": compacted,
+                "raw_cutoff": raw_cutoff,
+                "pages_freed": vacuum["pages_freed"],
+                "bytes_reclaimed": max(0, size_before - size_after),
+                "free_pages": vacuum["free_pages"],
+                "incremental_vacuum": vacuum["enabled"],
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                "finished_at": time.time()
+            }
+
+        with self._stats_lock:
+            self.runs += 1
+            for key, count in compacted.items():
+                self.rows_compacted[key] += count
+            self.bytes_reclaimed += report["bytes_reclaimed"]
+            self.last_report = report
+
+        total = sum(compacted.values())
+        print(f"🧹 Retention: compacted {total:,} rows ({compacted['posture_logs']:,} raw), "
+              f"reclaimed {report['bytes_reclaimed'] / 1e6:.1f} MB in {report['duration_ms']:.0f} ms")
+        return report
+
+    def _delete_before(self, db, table, column, cutoff):
+        """Delete rows with column < cutoff user by user, batch_size rows per transaction"""
+        deleted = 0
+        user_id = self._next_user(db, table, None)
+        while user_id is not None and not self._stop_event.is_set():
+            while True:
+                # Upper bound of this batch, found on the (user_id, time) index
+                db.cursor.execute(f'''
+                    SELECT MAX({column}) FROM (
+                        SELECT {column} FROM {table}
+                        WHERE user_id = ? AND {column} < ?
+                        ORDER BY {column}
+                        LIMIT ?
+                    )
+                ''', (user_id, cutoff, self.batch_size))
+                batch_end = db.cursor.fetchone()[0]
+                if batch_end is None:
+                    break
+
+                db.cursor.execute(
+                    f'DELETE FROM {table} WHERE user_id = ? AND {column} <= ? AND {column} < ?',
+                    (user_id, batch_end, cutoff)
+                )
+                deleted += db.cursor.rowcount
+                db.conn.commit()
+                # Let the LogWriter take the write lock between batches
+                time.sleep(self.pause)
+            user_id = self._next_user(db, table, user_id)
+        return deleted
+
+    def _next_user(self, db, table, after):
+        if after is None:
+            db.cursor.execute(f'SELECT MIN(user_id) FROM {table}')
+        else:
+            db.cursor.execute(f'SELECT MIN(user_id) FROM {table} WHERE user_id > ?', (after,))
+        return db.cursor.fetchone()[0]
+
+    def _incremental_vacuum(self, db):
+        """Return free pages to the OS vacuum_pages at a time (auto_vacuum=INCREMENTAL only)"""
+        enabled = db.cursor.execute('PRAGMA auto_vacuum').fetchone()[0] == AUTO_VACUUM_INCREMENTAL
+        free_before = db.cursor.execute('PRAGMA freelist_count').fetchone()[0]
+        free = free_before
+
+        while enabled and free > 0 and not self._stop_event.is_set():
+            # executescript steps the pragma to completion, execute() frees a single page
+            db.conn.executescript(f'PRAGMA incremental_vacuum({self.vacuum_pages})')
+            remaining = db.cursor.execute('PRAGMA freelist_count').fetchone()[0]
+            if remaining >= free:
+                break
+            free = remaining
+            time.sleep(self.pause)
+
+        if enabled:
+            # PASSIVE never waits on readers or the writer; the file shrinks once the WAL is copied back
+            db.cursor.execute('PRAGMA wal_checkpoint(PASSIVE)').fetchall()
+        return {"enabled": enabled, "pages_freed": free_before - free, "free_pages": free}
+
+    def _database_bytes(self, db):
+        page_count = db.cursor.execute('PRAGMA page_count').fetchone()[0]
+        page_size = db.cursor.execute('PRAGMA page_size').fetchone()[0]
+        return page_count * page_size
+
+    def stop(self, timeout=5.0):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "raw_days": self.raw_days,
+                "minute_days": self.minute_days,
+                "hour_days": self.hour_days,
+                "interval_seconds": self.interval,
+                "runs": self.runs,
+                "errors": self.errors,
+                "rows_compacted": dict(self.rows_compacted),
+                "bytes_reclaimed": self.bytes_reclaimed,
+                "last_run": self.last_report
+            }
+
+
+def enable_incremental_vacuum(db_name):
+    """Switch an existing database to auto_vacuum=INCREMENTAL (one full VACUUM, blocks writers)"""
+    conn = connect(db_name)
+    try:
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == AUTO_VACUUM_INCREMENTAL:
+            return False
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        conn.execute('VACUUM')
+        return True
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact old posture readings and reclaim space")
+    parser.add_argument("--db", default="posture_logs.db")
+    parser.add_argument("--raw-days", type=int, default=DEFAULT_RETENTION["raw_days"])
+    parser.add_argument("--minute-days", type=int, default=DEFAULT_RETENTION["minute_days"])
+    parser.add_argument("--hour-days", type=int, default=DEFAULT_RETENTION["hour_days"])
+    parser.add_argument("--enable-incremental-vacuum", action="store_true",
+                        help="Convert a database created before retention existed (runs a full VACUUM)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        raise SystemExit(f"❌ No database at {args.db}")
+
+    if args.enable_incremental_vacuum:
+        print(f"🔧 Converting {args.db} to incremental auto-vacuum...")
+        if not enable_incremental_vacuum(args.db):
+            print("   Already incremental")
+
+    manager = RetentionManager(args.db, args.raw_days, args.minute_days, args.hour_days, pause=0.0)
+    report = manager.run_once()
+    for table, count in report["rows_compacted"].items():
+        print(f"   {table}: {count:,} rows")
+    if not report["incremental_vacuum"]:
+        print(f"   {report['free_pages']:,} free pages will be reused, run with --enable-incremental-vacuum to shrink the file")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Landmark-Guided Region of Interest
+
+Posture scoring only needs the nose and the two shoulders, so instead of
+handing the full camera frame to pose.process we crop to the head and
+shoulder box found on the previous frame (plus a margin) and optionally
+downscale it. Landmarks are mapped back to full-frame coordinates before
+scoring, and the full frame is used again whenever tracking is lost.
+"""
+
+import cv2
+
+# MediaPipe pose landmark indices used to place the box
+NOSE = 0
+LEFT_EAR = 7
+RIGHT_EAR = 8
+LEFT_SHOULDER = 11
+RIGHT_SHOULDER = 12
+ROI_LANDMARKS = (NOSE, LEFT_EAR, RIGHT_EAR, LEFT_SHOULDER, RIGHT_SHOULDER)
+
+
+class RoiCropper:
+    def __init__(self, enabled=False, margin=0.6, downscale=1.0,
+                 min_visibility=0.5, min_size=96, move_threshold=0.1):
+        """Configure the cropper
+
+        margin: padding around the head/shoulder box, in shoulder widths
+        downscale: resize factor applied to the pose input (1.0 = none)
+        min_visibility: landmarks less visible than this count as lost
+        min_size: smallest crop side in pixels
+        move_threshold: only move the box when it shifts by more than this
+            fraction of its size, which keeps MediaPipe's tracker steady
+        """
+        self.enabled = enabled
+        self.margin = margin
+        self.downscale = min(1.0, max(0.1, downscale))
+        self.min_visibility = min_visibility
+        self.min_size = min_size
+        self.move_threshold = move_threshold
+
+        self.box = None  # (x0, y0, x1, y1) in pixels of the full frame
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.tracking_lost = 0
+
+    def prepare(self, frame):
+        """Crop and downscale a frame, returns (pose_input, transform)"""
+        height, width = frame.shape[:2]
+        x0, y0, x1, y1 = 0, 0, width, height
+
+        if self.enabled and self.box is not None:
+            x0, y0, x1, y1 = self.box
+            frame = frame[y0:y1, x0:x1]
+            self.roi_frames += 1
+        else:
+            self.full_frames += 1
+
+        if self.downscale < 1.0:
+            frame = cv2.resize(frame, None, fx=self.downscale, fy=self.downscale,
+                               interpolation=cv2.INTER_AREA)
+
+        return frame, (x0, y0, x1 - x0, y1 - y0, width, height)
+
+    def restore(self, results, transform):
+        """Map landmarks from crop coordinates back to the full frame, in place"""
+        x0, y0, crop_w, crop_h, width, height = transform
+        if not results.pose_landmarks or (crop_w == width and crop_h == height):
+            return
+
+        for landmark in results.pose_landmarks.landmark:
+            landmark.x = (x0 + landmark.x * crop_w) / width
+            landmark.y = (y0 + landmark.y * crop_h) / height
+
+    def update(self, results, frame_shape):
+        """Place the box for the next frame from this frame's (full-frame) landmarks"""
+        if not self.enabled:
+            return
+
+        if not results.pose_landmarks:
+            self._lose_tracking()
+            return
+
+        landmarks = results.pose_landmarks.landmark
+        points = [landmarks[i] for i in ROI_LANDMARKS]
+        required = (landmarks[NOSE], landmarks[LEFT_SHOULDER], landmarks[RIGHT_SHOULDER])
+        if any(point.visibility < self.min_visibility for point in required):
+            self._lose_tracking()
+            return
+
+        height, width = frame_shape[:2]
+        xs = [point.x * width for point in points]
+        ys = [point.y * height for point in points]
+        shoulder_width = abs(xs[3] - xs[4])
+        pad = max(self.margin * shoulder_width, self.min_size / 2)
+
+        x0 = int(max(0, min(xs) - pad))
+        y0 = int(max(0, min(ys) - pad))
+        x1 = int(min(width, max(xs) + pad))
+        y1 = int(min(height, max(ys) + pad))
+
+        if x1 - x0 < self.min_size or y1 - y0 < self.min_size:
+            self._lose_tracking()
+            return
+
+        new_box = (x0, y0, x1, y1)
+        if self.box is None or self._moved(new_box):
+            self.box = new_box
+
+    def _moved(self, new_box):
+        old_w = self.box[2] - self.box[0]
+        old_h = self.box[3] - self.box[1]
+        limit_x = old_w * self.move_threshold
+        limit_y = old_h * self.move_threshold
+        return (abs(new_box[0] - self.box[0]) > limit_x or abs(new_box[2] - self.box[2]) > limit_x or
+                abs(new_box[1] - self.box[1]) > limit_y or abs(new_box[3] - self.box[3]) > limit_y)
+
+    def _lose_tracking(self):
+        if self.box is not None:
+            self.tracking_lost += 1
+        self.box = None
+
+    def stats(self):
+        return {
+            "roi_enabled": self.enabled,
+            "roi_frames": self.roi_frames,
+            "full_frames": self.full_frames,
+            "roi_tracking_lost": self.tracking_lost
+        }
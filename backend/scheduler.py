@@ -0,0 +1,131 @@
+"""
+Adaptive Inference Rate Scheduler
+
+Decides how often camera_loop runs pose.process. While the posture
+results are stable the rate backs off towards min_fps, and it jumps back
+to max_fps as soon as the ratio drifts, the status flips or a calibration
+is requested. The rate is also capped so inference stays inside a CPU
+budget (fraction of one core).
+"""
+
+import threading
+import time
+
+
+class InferenceScheduler:
+    def __init__(self, min_fps=2.0, max_fps=20.0, cpu_budget=0.5,
+                 stable_frames=15, drift_tolerance=0.02, backoff=0.75):
+        """Configure the scheduler
+
+        min_fps / max_fps: bounds for the inference rate
+        cpu_budget: max fraction of one core to spend in inference (0 disables)
+        stable_frames: stable results needed before each step down
+        drift_tolerance: ratio change against the recent average that counts as drift
+        backoff: multiplier applied to the rate on each step down
+        """
+        self.min_fps = min_fps
+        self.max_fps = max(min_fps, max_fps)
+        self.cpu_budget = cpu_budget
+        self.stable_frames = stable_frames
+        self.drift_tolerance = drift_tolerance
+        self.backoff = backoff
+
+        self.target_fps = self.max_fps
+        self.reason = "startup"
+        self.avg_inference_seconds = 0.0
+        self.avg_ratio = None
+        self.last_status = None
+        self.stable_count = 0
+        self.next_due = 0.0
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def current_fps(self):
+        """Target rate after applying the CPU budget cap"""
+        fps = self.target_fps
+        if self.cpu_budget > 0 and self.avg_inference_seconds > 0:
+            fps = min(fps, self.cpu_budget / self.avg_inference_seconds)
+        return max(self.min_fps, fps)
+
+    def wait_until_due(self, stop_event):
+        """Block until the next inference is due, a boost arrives or stop_event is set"""
+        while not stop_event.is_set():
+            remaining = self.next_due - time.perf_counter()
+            if remaining <= 0:
+                return
+            # Wake up regularly so a stop request is noticed quickly
+            if self._wake.wait(min(remaining, 0.1)):
+                self._wake.clear()
+                return
+
+    def observe(self, status, ratio, inference_seconds):
+        """Record one inference result and schedule the next one"""
+        with self._lock:
+            now = time.perf_counter()
+
+            if self.avg_inference_seconds == 0:
+                self.avg_inference_seconds = inference_seconds
+            else:
+                self.avg_inference_seconds = 0.9 * self.avg_inference_seconds + 0.1 * inference_seconds
+
+            ratio = float(ratio or 0.0)
+            if self.last_status is not None and status != self.last_status:
+                self._boost("status changed")
+            elif self.avg_ratio is not None and abs(ratio - self.avg_ratio) > self.drift_tolerance:
+                self._boost("ratio drift")
+            else:
+                self.stable_count += 1
+                if self.stable_count >= self.stable_frames:
+                    self.stable_count = 0
+                    if self.target_fps > self.min_fps:
+                        self.target_fps = max(self.min_fps, self.target_fps * self.backoff)
+                        self.reason = "stable"
+
+            self.last_status = status
+            if self.avg_ratio is None:
+                self.avg_ratio = ratio
+            else:
+                self.avg_ratio = 0.8 * self.avg_ratio + 0.2 * ratio
+
+            self.next_due = now + 1.0 / self.current_fps
+
+    def skipped(self):
+        """A frame reused the previous result, which counts as stable"""
+        with self._lock:
+            self.stable_count += 1
+            self.next_due = time.perf_counter() + 1.0 / self.current_fps
+
+    def boost(self, reason):
+        """Go back to full rate right away (e.g. a calibration was requested)"""
+        with self._lock:
+            self._boost(reason)
+            self.next_due = 0.0
+        self._wake.set()
+
+    def _boost(self, reason):
+        self.target_fps = self.max_fps
+        self.stable_count = 0
+        self.reason = reason
+
+    def reset(self):
+        """Forget the previous run, used when the camera restarts"""
+        with self._lock:
+            self.target_fps = self.max_fps
+            self.reason = "startup"
+            self.avg_ratio = None
+            self.last_status = None
+            self.stable_count = 0
+            self.next_due = 0.0
+
+    def snapshot(self):
+        """Current rate and configuration for the API"""
+        return {
+            "currentFps": round(self.current_fps, 2),
+            "targetFps": round(self.target_fps, 2),
+            "minFps": self.min_fps,
+            "maxFps": self.max_fps,
+            "cpuBudget": self.cpu_budget,
+            "avgInferenceMs": round(self.avg_inference_seconds * 1000, 2),
+            "reason": self.reason
+        }
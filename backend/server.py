@@ -0,0 +1,876 @@
+"""
+Posturemon Server
+
+Database, sessions and the Flask API, started by main.py. Which mode runs
+is decided by the command line when this module is imported: --demo and
+--replay run to completion during the import, API mode defines the routes
+and leaves serving to serve().
+"""
+
+import atexit
+import threading
+import sys
+from database import ConnectionManager, day_range
+from frame_sources import DEFAULT_SOURCE
+from calibration import CalibrationStore, profile_to_dict
+from sessions import PostureSession, SessionManager, DEFAULT_OPTIONS, open_source_or_report
+from inference_pool import InferencePool
+from pipeline import OverlaySink
+from retention import DEFAULT_RETENTION, RetentionManager
+from tuning import AutoTuner
+from metrics import PrometheusWriter
+from response_cache import ResponseCache
+from export import EXPORT_FORMATS, parse_time, stream_export
+from model import POSE_OPTIONS, pose_model
+from startup import startup_timer
+from stats import TodayStats
+import replay
+from flask import Flask, Response, request, jsonify, stream_with_context
+from flask_cors import CORS
+from datetime import datetime, timedelta
+
+# mediapipe is no longer imported here, the pose model loads lazily (model.py)
+startup_timer.mark("imports")
+
+app = Flask(__name__)
+CORS(app)
+
+db_logger = None
+db_writer = None
+inference_pool = None
+retention_manager = None
+auto_tuner = None
+_db_writer_lock = threading.Lock()
+
+# Shared SQLite connections, the schema is created / migrated once here
+db_manager = ConnectionManager()
+db_manager.init_schema()
+
+# In-memory running totals behind /api/stats/today
+today_stats = TodayStats(db_manager)
+
+# Initialize user (created in the database by initialize_user)
+user_id = None
+user_name = "test_user"
+
+def get_cli_option(name, default=None):
+    """Return the value following a flag such as --source on the command line"""
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
+
+# Serialized /api/stats/* responses, dropped when a user's readings change
+stats_cache = ResponseCache(max_entries=int(get_cli_option("--stats-cache-size", 256)))
+
+# Saved per-user calibrations, recently used ones kept in memory
+calibration_store = CalibrationStore(db_manager, capacity=int(get_cli_option("--calibration-cache-size", 64)))
+
+# Frame source used when /api/camera/start doesn't ask for one
+default_source = get_cli_option("--source", DEFAULT_SOURCE)
+
+# Per-session settings, every session gets its own scheduler / ROI / motion gate
+session_options = {
+    # Adaptive pose.process rate, backs off while posture is stable
+    "min_fps": float(get_cli_option("--min-fps", DEFAULT_OPTIONS["min_fps"])),
+    "max_fps": float(get_cli_option("--max-fps", DEFAULT_OPTIONS["max_fps"])),
+    "cpu_budget": float(get_cli_option("--cpu-budget", DEFAULT_OPTIONS["cpu_budget"])),
+    # Optional head/shoulder crop + downscale of the pose.process input
+    "roi": "--roi" in sys.argv,
+    "roi_margin": float(get_cli_option("--roi-margin", DEFAULT_OPTIONS["roi_margin"])),
+    "downscale": float(get_cli_option("--downscale", DEFAULT_OPTIONS["downscale"])),
+    # Optional change detector that reuses the last pose result for static scenes
+    "motion_gate": "--motion-gate" in sys.argv,
+    "motion_threshold": float(get_cli_option("--motion-threshold", DEFAULT_OPTIONS["motion_threshold"])),
+    "max_skip": int(get_cli_option("--max-skip", DEFAULT_OPTIONS["max_skip"])),
+    # Readings every 3s, or one row per debounced run of the same status
+    "log_mode": get_cli_option("--log-mode", DEFAULT_OPTIONS["log_mode"]),
+    "debounce": float(get_cli_option("--debounce", DEFAULT_OPTIONS["debounce"])),
+    "max_interval": float(get_cli_option("--max-interval", DEFAULT_OPTIONS["max_interval"])),
+    # Optional raw landmark recording for re-scoring sessions later
+    "record": get_cli_option("--record", DEFAULT_OPTIONS["record"]),
+    "record_dtype": get_cli_option("--record-dtype", DEFAULT_OPTIONS["record_dtype"])
+}
+
+def start_db_writer(db_logger):
+    """Batch every session's log() calls on a background writer"""
+    global db_writer
+    db_writer = db_logger.start_writer(
+        flush_size=int(get_cli_option("--flush-size", 50)),
+        flush_interval=float(get_cli_option("--flush-interval", 1.0)),
+        max_queue=int(get_cli_option("--log-queue-size", 1000)),
+        on_full=get_cli_option("--on-full", "drop_oldest")
+    )
+    return db_writer
+
+def get_db_logger():
+    """The one logger + writer thread shared by all sessions, opened on first use"""
+    global db_logger
+    with _db_writer_lock:
+        if db_logger is None:
+            # Opened by whichever session logs first, closed by shutdown() on the main thread
+            db_logger = db_manager.connect(check_same_thread=False)
+            start_db_writer(db_logger)
+        return db_logger
+
+def log_reading(reading_user_id, posture_score, status, seconds):
+    """Log a reading standing for `seconds` of a session user's posture and count it in today's totals"""
+    get_db_logger().log(reading_user_id, posture_score, status, seconds)
+    today_stats.record(reading_user_id, posture_score, status, seconds=seconds)
+
+def log_posture_interval(interval):
+    """Log a closed posture interval (--log-mode intervals) and count it in today's totals"""
+    get_db_logger().log_interval(interval)
+    today_stats.record_interval(interval)
+
+# Every camera / user pair runs as its own session
+session_manager = SessionManager(
+    log_reading=log_reading,
+    log_posture_interval=log_posture_interval,
+    calibration_store=calibration_store,
+    default_options=session_options,
+    max_sessions=int(get_cli_option("--max-sessions", 32))
+)
+
+def shutdown_sessions():
+    """Stop every session first, so open intervals are flushed before the logger closes"""
+    session_manager.stop_all()
+    with _db_writer_lock:
+        if db_logger is not None:
+            db_logger.close()
+
+atexit.register(shutdown_sessions)
+
+def initialize_user():
+    """Initialize user without blocking"""
+    global user_id, user_name
+    if user_id is None:
+        if len(sys.argv) > 2 and sys.argv[1] == "--demo" and not sys.argv[2].startswith("--"):
+            user_name = sys.argv[2]
+        user_name = get_cli_option("--user", user_name)
+        print(f"Initializing user: {user_name}")
+        with db_manager.writer() as db:
+            user_id = db.get_or_create_user(user_name)
+        print(f"User ID: {user_id}")
+
+def camera_loop_with_display(source_spec=None):
+    """Camera loop WITH display - for demo mode only"""
+    initialize_user()
+    session = PostureSession("demo", user_id, source_spec or default_source, session_options,
+                             log_reading=log_reading, log_posture_interval=log_posture_interval,
+                             calibration_store=calibration_store)
+
+    def on_key(key):
+        if key == ord('q') and not session.stop_event.is_set():
+            print("User pressed 'q' - stopping camera")
+            session.stop_event.set()
+        elif key == ord('c'):
+            # Calibrates over the next frames with a detected pose
+            session.request_calibration()
+
+    # Demo mode draws the skeleton, which needs mediapipe loaded up front.
+    # Same pipeline as the API, the window is just one more sink.
+    overlay = OverlaySink(pose_model.solutions(), on_key=on_key)
+    session.add_sink(overlay)
+    session.start()
+
+    print("Press 'c' to calibrate")
+    print("Press 'q' to quit")
+
+    # OpenCV windows belong on the main thread, inference runs on the session thread
+    try:
+        overlay.drain()
+    finally:
+        session.stop()
+
+    if session.pipeline is not None:
+        for name, sink_stats in session.pipeline.stats().items():
+            print(f"   {name}: {sink_stats['handled']} handled ({sink_stats['handled_per_second']}/s), "
+                  f"{sink_stats['dropped']} dropped, avg {sink_stats['avg_handle_ms']} ms")
+    print("✅ Camera stopped")
+
+def replay_loop(source_spec):
+    """Replay mode - process a recorded source as fast as possible and report fps"""
+    cap = open_source_or_report(source_spec, realtime=False)
+    if cap is None:
+        return
+
+    max_frames = get_cli_option("--frames")
+    report_path = get_cli_option("--json")
+
+    # Calibrate on the first detected pose so statuses are meaningful
+    session = PostureSession("replay", source_spec=source_spec, options=session_options)
+    session.calibration_requested.set()
+
+    print(f"📼 Replaying {cap.describe()} as fast as possible...")
+    try:
+        report = replay.run_replay(cap, session.process_frame, int(max_frames) if max_frames else None)
+    finally:
+        cap.release()
+        if session.pose is not None:
+            session.pose.close()
+
+    replay.print_report(report)
+    if report_path:
+        replay.write_report(report, report_path)
+
+def start_inference_pool():
+    """Move pose.process into --inference-workers worker processes (0 keeps it in-process)"""
+    global inference_pool
+    workers = int(get_cli_option("--inference-workers", 0))
+    if workers <= 0:
+        return None
+
+    inference_pool = InferencePool(
+        workers=workers,
+        pose_options=POSE_OPTIONS,
+        max_wait=float(get_cli_option("--inference-max-wait", 0.5))
+    ).start(wait=False)
+    session_manager.pool = inference_pool
+
+    def shutdown():
+        session_manager.stop_all()
+        inference_pool.close()
+    atexit.register(shutdown)
+    return inference_pool
+
+def start_retention():
+    """With --retention, compact readings older than --retain-raw-days on a schedule"""
+    global retention_manager
+    # Deleting raw history is opt-in
+    if "--retention" not in sys.argv:
+        return None
+
+    retention_manager = RetentionManager(
+        db_manager.db_name,
+        raw_days=int(get_cli_option("--retain-raw-days", DEFAULT_RETENTION["raw_days"])),
+        minute_days=int(get_cli_option("--retain-minute-days", DEFAULT_RETENTION["minute_days"])),
+        hour_days=int(get_cli_option("--retain-hour-days", DEFAULT_RETENTION["hour_days"])),
+        interval=float(get_cli_option("--retention-interval", 3600))
+    )
+    retention_manager.start()
+    atexit.register(retention_manager.stop)
+    return retention_manager
+
+def start_auto_tuner():
+    """Pose model auto-tuning against --latency-budget ms, at startup and on drift with --auto-tune"""
+    global auto_tuner
+    auto_tuner = AutoTuner(
+        session_manager,
+        budget_ms=float(get_cli_option("--latency-budget", 50)),
+        source_spec=get_cli_option("--tune-source", default_source),
+        sample_size=int(get_cli_option("--tune-frames", 20))
+    )
+    if "--auto-tune" in sys.argv:
+        if inference_pool is not None:
+            print("💡 Auto-tuned model settings only apply to in-process inference, workers keep theirs")
+        auto_tuner.start()
+        atexit.register(auto_tuner.stop)
+    return auto_tuner
+
+def serve():
+    """Run the Flask server on --port (API mode)"""
+    startup_timer.mark("server_starting")
+    app.run(host="0.0.0.0", port=int(get_cli_option("--port", 5050)), debug=True, use_reloader=False)
+
+if len(sys.argv) > 1 and sys.argv[1] == "--demo":
+    mode = "demo"
+elif len(sys.argv) > 2 and sys.argv[1] == "--replay":
+    mode = "replay"
+else:
+    mode = "api"
+
+# Check if running in demo mode
+if mode == "demo":
+    print("Running in demo mode (with display window)")
+    camera_loop_with_display()
+elif mode == "replay":
+    replay_loop(sys.argv[2])
+else:
+    # API mode
+    print("🚀 Starting Flask API server...")
+    initialize_user()
+    today_stats.get(user_id)
+    start_retention()
+
+    # Load mediapipe / the worker processes in the background so requests
+    # are answered straight away, /api/health reports when they are ready
+    # (--no-warmup leaves it to the first session)
+    # (--auto-tune loads it while profiling instead)
+    if start_inference_pool() is None and "--no-warmup" not in sys.argv and "--auto-tune" not in sys.argv:
+        pose_model.start_background()
+    start_auto_tuner()
+    
+    # The legacy single-camera endpoints drive this session
+    default_session = session_manager.create(user_id=user_id, source_spec=default_source, session_id="default")
+
+    @app.before_request
+    def mark_first_request():
+        startup_timer.mark("first_request")
+
+    def cached_stats_response(endpoint, stats_user_id, build):
+        """Serve build()'s payload through stats_cache, 304 while the client's ETag is current"""
+        status, etag, body = stats_cache.get(
+            endpoint, stats_user_id,
+            build=lambda: app.json.dumps(build()),
+            if_none_match=request.if_none_match.contains
+        )
+        response = Response(body, status=status, mimetype="application/json")
+        response.set_etag(etag)
+        # Let browsers keep the body but always revalidate, a 304 costs next to nothing
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    def stream_response(session):
+        """Server-Sent Events response for one session (?maxRate=N caps messages/sec)"""
+        max_rate = request.args.get('maxRate', type=float)
+        return Response(
+            stream_with_context(session.broadcaster.stream(max_rate=max_rate)),
+            mimetype='text/event-stream',
+            headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'
+            }
+        )
+
+    @app.route('/api/camera/start', methods=['POST'])
+    def start_camera():
+        if not default_session.connected:
+            data = request.get_json(silent=True) or {}
+            source_spec = data.get("source") or default_source
+
+            # Readings are logged under the user set when the camera starts,
+            # /api/user/set mid-session only applies to the next start.
+            # Bad source specs fail the request
+            try:
+                default_session.start(source_spec, user_id=user_id)
+            except ValueError as e:
+                return jsonify({
+                    "status": "error",
+                    "message": str(e)
+                }), 400
+
+            print(f"📹 Starting camera ({source_spec})...")
+            return jsonify({"status": "camera started"}), 200
+        else:
+            print("⚠️ Camera already running")
+            return jsonify({"status": "camera already running"}), 200
+
+    @app.route('/api/camera/stop', methods=['POST'])
+    def stop_camera():
+        if default_session.connected:
+            print("🛑 Stopping camera...")
+            default_session.stop()
+            return jsonify({"status": "camera stopped"}), 200
+        else:
+            print("⚠️ Camera not running")
+            return jsonify({"status": "camera not running"}), 200
+
+    @app.route('/api/camera/calibrate', methods=['POST'])
+    def calibrate_camera():
+        """Trigger calibration via API button"""
+        recalibrating = default_session.checker.calibrated
+        if default_session.request_calibration():
+            print("🎯 Calibration requested via button")
+            if recalibrating:
+                print("🔄 Re-calibrating (resetting previous calibration)")
+            return jsonify({
+                "status": "calibration requested",
+                "message": f"Will calibrate over the next {default_session.options['calibration_frames']} frames with a detected pose",
+                "recalibrating": recalibrating
+            }), 200
+        else:
+            return jsonify({
+                "status": "error",
+                "message": "Camera not running"
+            }), 400
+
+    @app.route('/api/posture/current', methods=['GET'])
+    def get_current_posture():
+        """Get current posture data"""
+        return jsonify(default_session.state), 200
+
+    @app.route('/api/posture/stream', methods=['GET'])
+    def stream_posture():
+        """Server-Sent Events stream of posture changes (?maxRate=N caps messages/sec)"""
+        return stream_response(default_session)
+
+    @app.route('/api/sessions', methods=['POST'])
+    def create_session():
+        """Start a new session for a user on its own frame source"""
+        data = request.get_json(silent=True) or {}
+        session_user_id = data.get("userId")
+        session_user_name = (data.get("userName") or "").strip()
+
+        try:
+            if session_user_name:
+                with db_manager.writer() as db:
+                    session_user_id = db.get_or_create_user(session_user_name)
+            elif session_user_id is None:
+                return jsonify({
+                    "status": "error",
+                    "message": "userName or userId is required"
+                }), 400
+
+            session = session_manager.create(
+                user_id=int(session_user_id),
+                source_spec=data.get("source") or default_source,
+                options=data.get("options")
+            )
+        except (TypeError, ValueError) as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400
+
+        today_stats.get(session.user_id)
+        if data.get("autoStart", True):
+            session.start()
+
+        print(f"📹 Session {session.session_id} created for user {session.user_id} ({session.source_spec})")
+        return jsonify(session.snapshot()), 201
+
+    @app.route('/api/sessions', methods=['GET'])
+    def list_sessions():
+        return jsonify({
+            **session_manager.stats(),
+            "sessionList": [session.snapshot() for session in session_manager.list()]
+        }), 200
+
+    def session_or_404(session_id):
+        session = session_manager.get(session_id)
+        if session is None:
+            return None, (jsonify({
+                "status": "error",
+                "message": f"Session {session_id} not found"
+            }), 404)
+        return session, None
+
+    @app.route('/api/sessions/<session_id>', methods=['GET'])
+    def get_session(session_id):
+        session, error = session_or_404(session_id)
+        if error:
+            return error
+        return jsonify(session.snapshot()), 200
+
+    @app.route('/api/sessions/<session_id>', methods=['DELETE'])
+    def delete_session(session_id):
+        """Stop a session and release its camera and pose graph"""
+        if session_id == default_session.session_id:
+            return jsonify({
+                "status": "error",
+                "message": "The default session is stopped with /api/camera/stop"
+            }), 400
+
+        if not session_manager.remove(session_id):
+            return session_or_404(session_id)[1]
+        print(f"🛑 Session {session_id} removed")
+        return jsonify({"status": "session removed", "sessionId": session_id}), 200
+
+    @app.route('/api/sessions/<session_id>/start', methods=['POST'])
+    def start_session(session_id):
+        session, error = session_or_404(session_id)
+        if error:
+            return error
+
+        data = request.get_json(silent=True) or {}
+        try:
+            started = session.start(data.get("source"))
+        except ValueError as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400
+        return jsonify({"status": "session started" if started else "session already running"}), 200
+
+    @app.route('/api/sessions/<session_id>/stop', methods=['POST'])
+    def stop_session(session_id):
+        session, error = session_or_404(session_id)
+        if error:
+            return error
+        stopped = session.stop()
+        return jsonify({"status": "session stopped" if stopped else "session not running"}), 200
+
+    @app.route('/api/sessions/<session_id>/calibrate', methods=['POST'])
+    def calibrate_session(session_id):
+        session, error = session_or_404(session_id)
+        if error:
+            return error
+
+        recalibrating = session.checker.calibrated
+        if not session.request_calibration():
+            return jsonify({
+                "status": "error",
+                "message": "Session not running"
+            }), 400
+        return jsonify({
+            "status": "calibration requested",
+            "message": f"Will calibrate over the next {session.options['calibration_frames']} frames with a detected pose",
+            "recalibrating": recalibrating
+        }), 200
+
+    @app.route('/api/sessions/<session_id>/posture', methods=['GET'])
+    def get_session_posture(session_id):
+        session, error = session_or_404(session_id)
+        if error:
+            return error
+        return jsonify(session.state), 200
+
+    @app.route('/api/sessions/<session_id>/stream', methods=['GET'])
+    def stream_session(session_id):
+        session, error = session_or_404(session_id)
+        if error:
+            return error
+        return stream_response(session)
+
+    @app.route('/api/stats/today', methods=['GET'])
+    def get_today_stats():
+        """Get today's statistics from the in-memory running totals (cached until the next reading)"""
+        try:
+            stats_user_id = request.args.get('userId', user_id, type=int)
+
+            def build():
+                summary = today_stats.get(stats_user_id).summary()
+                print(f"📊 Today's stats: avg={summary['average_score']}, readings={summary['total_readings']}, good_hours={summary['good_posture_hours']}")
+                return {
+                    **summary,
+                    "date": datetime.now().isoformat()
+                }
+
+            return cached_stats_response("today", stats_user_id, build)
+                
+        except Exception as e:
+            print(f"❌ Error getting today's stats: {e}")
+            import traceback
+            traceback.print_exc()
+            return jsonify({"error": str(e)}), 500
+
+    @app.route('/api/stats/week', methods=['GET'])
+    def get_week_stats():
+        """Get last 7 days statistics (cached until the next reading or midnight)"""
+        try:
+            stats_user_id = request.args.get('userId', user_id, type=int)
+
+            def build():
+                # Get last 7 days
+                today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+                print(f"📊 Fetching weekly stats...")
+                print(f"   User ID: {stats_user_id}")
+
+                # One day rollup row per day with data
+                start, end = day_range(today - timedelta(days=6), days=7)
+                with db_manager.reader() as db:
+                    rollups = db.get_rollups(stats_user_id, 'day', start, end)
+
+                print(f"   Found {len(rollups)} days with data")
+
+                # Create a map of date -> score
+                score_map = {}
+                for bucket, _, reading_count, _, _, _, tracked_seconds, score_seconds in rollups:
+                    date_str = datetime.fromtimestamp(bucket).strftime('%Y-%m-%d')
+                    # Time-weighted, readings and intervals count for the time they cover
+                    raw_score = score_seconds / tracked_seconds if tracked_seconds else 0
+
+                    # Convert 0-1 scale to 0-100 scale
+                    if raw_score > 0 and raw_score <= 1.0:
+                        avg_score = round(raw_score * 100, 1)
+                        print(f"  {date_str}: {avg_score} (from {reading_count} readings) [converted from {raw_score:.3f}]")
+                    else:
+                        avg_score = round(raw_score, 1)
+                        print(f"  {date_str}: {avg_score} (from {reading_count} readings)")
+
+                    score_map[date_str] = avg_score
+
+                # Generate last 7 days including days with no data
+                daily_scores = []
+                for i in range(6, -1, -1):  # 6 days ago to today
+                    day = today - timedelta(days=i)
+                    date_str = day.strftime('%Y-%m-%d')
+
+                    score = score_map.get(date_str, 0)
+
+                    daily_scores.append({
+                        "date": date_str,
+                        "average_score": score  # 0 if no data
+                    })
+
+                    print(f"  Day {6-i} ago ({date_str}): {score}")
+
+                return {
+                    "daily_scores": daily_scores
+                }
+
+            return cached_stats_response("week", stats_user_id, build)
+            
+        except Exception as e:
+            print(f"❌ Error getting week stats: {e}")
+            import traceback
+            traceback.print_exc()
+            return jsonify({"error": str(e)}), 500
+
+    @app.route('/api/export', methods=['GET'])
+    def export_history():
+        """Stream raw readings as NDJSON or CSV (?format=, userId=, start=, end=)"""
+        fmt = request.args.get('format', 'ndjson')
+        try:
+            if fmt not in EXPORT_FORMATS:
+                raise ValueError(f"Unknown export format: {fmt} (use {' or '.join(EXPORT_FORMATS)})")
+            export_user_id = request.args.get('userId', type=int)
+            start = parse_time(request.args.get('start'))
+            end = parse_time(request.args.get('end'))
+            page_size = max(1, request.args.get('pageSize', 5000, type=int))
+        except ValueError as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400
+
+        print(f"📤 Exporting {fmt} (user: {export_user_id or 'all'}, start: {start}, end: {end})")
+
+        def generate():
+            # A dedicated read-only connection for as long as the client keeps reading
+            db = db_manager.connect(read_only=True, check_same_thread=False)
+            try:
+                yield from stream_export(db, fmt, export_user_id, start, end, page_size)
+            finally:
+                db.close()
+
+        return Response(
+            stream_with_context(generate()),
+            content_type=f"{EXPORT_FORMATS[fmt]}; charset=utf-8",
+            headers={
+                'Content-Disposition': f'attachment; filename="posture_logs.{fmt}"',
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'
+            }
+        )
+
+    @app.route('/api/status', methods=['GET'])
+    def get_status():
+        return jsonify({
+            "cameraConnected": default_session.connected,
+            "calibrated": default_session.checker.calibrated,
+            "postureData": default_session.state,
+            "inferenceRate": default_session.scheduler.snapshot(),
+            "dbWriter": db_writer.stats() if db_writer else None,
+            "postureStream": default_session.broadcaster.stats(),
+            "sessions": session_manager.stats(),
+            "inferencePool": inference_pool.stats() if inference_pool else None,
+            "retention": retention_manager.stats() if retention_manager else None,
+            "tuning": auto_tuner.status(),
+            "statsCache": stats_cache.stats(),
+            "calibrationProfiles": calibration_store.stats()
+        })
+
+    @app.route('/api/tuning', methods=['GET'])
+    def get_tuning():
+        """Auto-tuned pose profile, the budget and the last profiling results"""
+        return jsonify(auto_tuner.status()), 200
+
+    @app.route('/api/tuning/run', methods=['POST'])
+    def run_tuning():
+        """Re-profile the pose settings in the background (optional {"budgetMs": N})"""
+        data = request.get_json(silent=True) or {}
+        budget_ms = data.get("budgetMs")
+        if budget_ms is not None and (not isinstance(budget_ms, (int, float)) or budget_ms <= 0):
+            return jsonify({
+                "status": "error",
+                "message": "budgetMs must be a positive number"
+            }), 400
+
+        if not auto_tuner.tune_in_background(reason="on demand", budget_ms=budget_ms):
+            return jsonify({
+                "status": "error",
+                "message": "Tuning already running"
+            }), 409
+
+        return jsonify({
+            "status": "started",
+            "budgetMs": budget_ms or auto_tuner.budget_ms
+        }), 202
+
+    def model_status():
+        """The model that serves inference: the worker pool's in pool mode, else the in-process one"""
+        if inference_pool is None:
+            return {**pose_model.status(), "backend": "in-process"}
+        pool_stats = inference_pool.stats()
+        return {
+            "backend": "pool",
+            "state": "ready" if pool_stats["ready"] else "loading",
+            "ready": pool_stats["ready"],
+            "workers": pool_stats["workers"],
+            "workersAlive": pool_stats["alive"],
+            "options": inference_pool.pose_options
+        }
+
+    @app.route('/api/health', methods=['GET'])
+    def health_check():
+        """Health check endpoint, 'ready' turns true once the pose model has warmed up"""
+        model = model_status()
+        return jsonify({
+            "status": "ok",
+            "ready": model["ready"],
+            "model": model,
+            "startup": startup_timer.report(),
+            "cameraConnected": default_session.connected,
+            "calibrated": default_session.checker.calibrated,
+            "sessions": len(session_manager.list())
+        }), 200
+
+    @app.route('/api/metrics', methods=['GET'])
+    def get_metrics():
+        """Per-stage latency, frame rates, DB writer and inference pool metrics in Prometheus text format"""
+        metrics = PrometheusWriter()
+
+        for session in session_manager.list():
+            labels = {"session": session.session_id}
+            metrics.sample("session_running", "gauge", "1 while the session's camera loop is running", session.connected, labels)
+
+            for stage, histogram in session.metrics.stages.items():
+                stage_labels = {**labels, "stage": stage}
+                metrics.histogram("stage_latency_seconds", "Latency of each pipeline stage", histogram, stage_labels)
+                metrics.quantiles("stage_latency_recent_seconds", "Stage latency quantiles over the most recent samples", histogram, stage_labels)
+
+            buffer_stats = session.frame_buffer.stats() if session.frame_buffer else {}
+            metrics.sample("capture_fps", "gauge", "Frames read from the source per second", session.metrics.capture_rate.rate(), labels)
+            metrics.sample("inference_fps", "gauge", "pose.process calls per second", session.metrics.inference_rate.rate(), labels)
+            metrics.sample("inference_target_fps", "gauge", "Inference rate currently set by the scheduler", session.scheduler.current_fps, labels)
+            metrics.sample("frames_captured_total", "counter", "Frames captured", buffer_stats.get("captured_frames", 0), labels)
+            metrics.sample("frames_dropped_total", "counter", "Captured frames dropped before inference", buffer_stats.get("dropped_frames", 0), labels)
+
+            for sink, sink_stats in (session.pipeline.stats() if session.pipeline else {}).items():
+                sink_labels = {**labels, "sink": sink}
+                metrics.sample("sink_results_handled_total", "counter", "Frame results handled by each pipeline sink", sink_stats["handled"], sink_labels)
+                metrics.sample("sink_results_dropped_total", "counter", "Frame results a threaded sink dropped because it fell behind", sink_stats["dropped"], sink_labels)
+                metrics.sample("sink_handled_per_second", "gauge", "Average pipeline sink throughput since the session started", sink_stats["handled_per_second"], sink_labels)
+            metrics.sample("frames_processed_total", "counter", "Frames that went through pose.process", session.inference_frames, labels)
+            metrics.sample("frames_skipped_total", "counter", "Frames skipped by the motion gate", session.motion_gate.stats()["skipped_frames"], labels)
+            metrics.sample("readings_logged_total", "counter", "Readings sent to the database", session.readings_logged, labels)
+
+        if db_writer:
+            writer_stats = db_writer.stats()
+            metrics.sample("db_queue_depth", "gauge", "Readings waiting for the database writer", writer_stats["queue_depth"])
+            metrics.sample("db_queue_lag_seconds", "gauge", "Age of the oldest reading waiting for the database writer", db_writer.queue_lag())
+            metrics.sample("db_rows_flushed_total", "counter", "Readings committed by the database writer", writer_stats["rows_flushed"])
+            metrics.sample("db_rows_dropped_total", "counter", "Readings dropped by the database writer", writer_stats["rows_dropped"])
+            metrics.histogram("db_flush_seconds", "Duration of one database writer batch commit", db_writer.flush_latency)
+            metrics.histogram("db_commit_lag_seconds", "Time from the oldest reading of a batch being logged to its commit", db_writer.commit_lag)
+
+        if inference_pool:
+            pool_stats = inference_pool.stats()
+            metrics.sample("inference_pool_workers_idle", "gauge", "Idle inference workers", pool_stats["idle"])
+            metrics.sample("inference_pool_jobs_total", "counter", "Frames processed by inference workers", pool_stats["jobs"])
+            metrics.sample("inference_pool_rejected_total", "counter", "Frames dropped because every worker was busy", pool_stats["rejected"])
+            metrics.sample("inference_pool_crashes_total", "counter", "Inference worker crashes and hangs", pool_stats["crashes"])
+
+        if retention_manager:
+            retention_stats = retention_manager.stats()
+            for table, count in retention_stats["rows_compacted"].items():
+                metrics.sample("retention_rows_compacted_total", "counter", "Rows deleted by retention after being rolled up", count, {"table": table})
+            metrics.sample("retention_bytes_reclaimed_total", "counter", "Database bytes reclaimed by incremental vacuum", retention_stats["bytes_reclaimed"])
+            metrics.sample("retention_runs_total", "counter", "Completed retention runs", retention_stats["runs"])
+
+        cache_stats = stats_cache.stats()
+        metrics.sample("stats_cache_entries", "gauge", "Cached /api/stats responses", cache_stats["entries"])
+        for endpoint, counts in cache_stats["endpoints"].items():
+            for result, count in counts.items():
+                metrics.sample("stats_cache_requests_total", "counter", "Stats requests by cache result (hits, misses, not_modified)", count, {"endpoint": endpoint, "result": result})
+
+        tuning = auto_tuner.status()
+        metrics.sample("pose_latency_budget_seconds", "gauge", "Per-frame pose.process budget used by auto-tuning", tuning["budgetMs"] / 1000)
+        metrics.sample("pose_autotune_runs_total", "counter", "Completed pose model auto-tuning runs", tuning["tunes"])
+        if tuning["profile"]:
+            metrics.sample("pose_profile_info", "gauge", "Auto-tuned pose profile in use", 1, {"profile": tuning["profile"]["name"]})
+
+        metrics.sample("model_ready", "gauge", "1 once the pose model (or every inference worker) is ready", model_status()["ready"])
+        return Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+    @app.route('/api/user/set', methods=['POST'])
+    def set_user():
+        """Set the user name and create/get user ID"""
+        global user_id, user_name
+
+        data = request.get_json()
+        new_user_name = data.get("userName", "").strip()
+
+        if not new_user_name:
+            return jsonify({
+                "status": "error",
+                "message": "User name is required"
+            }), 400
+
+        try:
+            # Update user name
+            user_name = new_user_name
+
+            # Get or create user ID from database
+            with db_manager.writer() as db:
+                user_id = db.get_or_create_user(user_name)
+
+            # Load the user's totals for today before the dashboard asks
+            today_stats.get(user_id)
+            # and their saved calibration before the camera starts
+            calibration = calibration_store.get(user_id)
+
+            print(f"✅ User set: {user_name} (ID: {user_id})")
+
+            return jsonify({
+                "status": "success",
+                "userName": user_name,
+                "userId": user_id,
+                "calibrated": calibration is not None
+            }), 200
+
+        except Exception as e:
+            print(f"❌ Error setting user: {e}")
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 500
+
+    @app.route('/api/user/get', methods=['GET'])
+    def get_user():
+        """Get current user info"""
+        return jsonify({
+            "userName": user_name,
+            "userId": user_id
+        }), 200
+
+    @app.route('/api/calibration', methods=['GET'])
+    def get_calibration():
+        """Saved calibration profile for the current user (?userId=N for another user)"""
+        calibration_user_id = request.args.get('userId', user_id, type=int)
+        profile = calibration_store.get(calibration_user_id)
+        if profile is None:
+            return jsonify({
+                "status": "error",
+                "message": f"No calibration saved for user {calibration_user_id}"
+            }), 404
+        return jsonify(profile_to_dict(profile)), 200
+
+    @app.route('/api/calibration', methods=['DELETE'])
+    def delete_calibration():
+        """Forget a user's saved calibration, running sessions keep theirs until restarted"""
+        calibration_user_id = request.args.get('userId', user_id, type=int)
+        if not calibration_store.delete(calibration_user_id):
+            return jsonify({
+                "status": "error",
+                "message": f"No calibration saved for user {calibration_user_id}"
+            }), 404
+        return jsonify({"status": "deleted", "userId": calibration_user_id}), 200
+
+    # Print startup info
+    print("\n" + "="*50)
+    print("✅ Flask server starting...")
+    port = int(get_cli_option("--port", 5050))
+    print(f"📍 API available at: http://localhost:{port}")
+    print("📍 Frontend connects from: http://localhost:3000")
+    print("\n🎥 Camera Mode: HEADLESS (no window)")
+    print("   ✓ Manual calibration via button")
+    print("   ✓ Check terminal for posture updates")
+    print("   ✓ Stats available at /api/stats/today")
+    print("\n💡 TIP: Run 'python main.py --demo' to see window")
+    print("💡 TIP: Run 'python main.py --replay video:clip.mp4' to benchmark")
+    print("="*50 + "\n")
\ No newline at end of file
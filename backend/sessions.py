@@ -0,0 +1,512 @@
+"""
+Posture Sessions
+
+A PostureSession is one person in front of one frame source. It owns its
+own PostureChecker calibration, MediaPipe pose graph, capture pipeline,
+inference scheduler, ROI / motion state and posture stream, so several
+sessions can run side by side in one process. SessionManager keeps them
+keyed by session ID. Frames run through a FramePipeline (pipeline.py)
+whose sinks the session builds from its options.
+"""
+
+import threading
+import time
+import uuid
+from collections import deque
+
+import cv2
+
+from calibration import CALIBRATION_FRAMES, build_profile
+from frame_sources import open_frame_source, DEFAULT_SOURCE
+from intervals import IntervalTracker
+from metrics import StageMetrics
+from model import pose_model
+from motion import MotionGate
+from pipeline import FramePipeline, IntervalLogSink, ReadingLogSink, RecorderSink, StateSink
+from posture import PostureChecker
+from recording import LandmarkRecorder, RECORDING_DTYPES, recording_path
+from roi import RoiCropper
+from scheduler import InferenceScheduler
+from startup import startup_timer
+from stream import PostureBroadcaster
+
+LOG_MODES = ("readings", "intervals")
+
+# While auto-tuning runs, every SAMPLE_EVERY-th inference frame is kept (SAMPLE_FRAMES of them) for re-tuning
+SAMPLE_EVERY = 15
+SAMPLE_FRAMES = 8
+
+# Per-session settings, overridable from the CLI or per session through the API
+DEFAULT_OPTIONS = {
+    "min_fps": 2.0,
+    "max_fps": 20.0,
+    "cpu_budget": 0.5,
+    "roi": False,
+    "roi_margin": 0.6,
+    "downscale": 1.0,
+    "motion_gate": False,
+    "motion_threshold": 3.0,
+    "max_skip": 10,
+    "log_mode": "readings",  # "readings" every log_interval, or run-length "intervals"
+    "log_interval": 3.0,  # Seconds between database readings
+    "debounce": 2.0,      # Seconds a new status must hold before an interval closes
+    "max_interval": 300.0,  # Longest interval before it is closed and a new one opened
+    "record": None,       # Directory to record raw landmarks into (recording.py)
+    "record_dtype": "float16",
+    "calibration_frames": CALIBRATION_FRAMES,  # Frames with a pose a calibration is the median of
+}
+
+
+def create_pose():
+    """Build a MediaPipe pose graph, one per session (loads mediapipe on first use)"""
+    return pose_model.create_pose()
+
+
+def open_source_or_report(source_spec, realtime=True):
+    """Open a frame source, printing why if it can't be opened"""
+    cap = open_frame_source(source_spec, realtime=realtime)
+    if cap.open():
+        return cap
+    cap.release()
+    if cap.live:
+        print("❌ No camera detected")
+    else:
+        print(f"❌ Could not open frame source: {cap.describe()}")
+    return None
+
+
+class PostureSession:
+    def __init__(self, session_id, user_id=None, source_spec=None, options=None, log_reading=None, pool=None,
+                 log_posture_interval=None, calibration_store=None):
+        """Set up a session without starting it
+
+        log_reading: callable(user_id, posture_score, status, seconds) used to store readings
+        log_posture_interval: callable(PostureInterval) used in the intervals log mode
+        calibration_store: optional CalibrationStore, the user's saved
+            calibration is applied on start and new ones are saved to it
+        pool: optional InferencePool, pose.process then runs in a worker
+            process instead of a pose graph owned by this session
+        Raises ValueError for an invalid source spec or unknown option.
+        """
+        unknown = set(options or {}) - set(DEFAULT_OPTIONS)
+        if unknown:
+            raise ValueError(f"Unknown session options: {', '.join(sorted(unknown))}")
+
+        self.session_id = session_id
+        self.user_id = user_id
+        self.source_spec = source_spec or DEFAULT_SOURCE
+        open_frame_source(self.source_spec)  # Validate the spec early
+        self.options = {**DEFAULT_OPTIONS, **(options or {})}
+        if self.options["record_dtype"] not in RECORDING_DTYPES:
+            raise ValueError(f"record_dtype must be one of {', '.join(RECORDING_DTYPES)}")
+        if self.options["log_mode"] not in LOG_MODES:
+            raise ValueError(f"log_mode must be one of {', '.join(LOG_MODES)}")
+        self.log_reading = log_reading
+        self.log_posture_interval = log_posture_interval
+        self.pool = pool
+        self.calibration_store = calibration_store
+
+        self.checker = PostureChecker()
+        self.calibration_user = None  # Whose baseline the checker holds
+        self._calibration_ratios = []
+        self.pose = None
+        self.pose_generation = None
+        self.profile = None
+        self.collect_samples = False
+        self._samples = deque(maxlen=SAMPLE_FRAMES)
+        self.scheduler = InferenceScheduler(
+            min_fps=float(self.options["min_fps"]),
+            max_fps=float(self.options["max_fps"]),
+            cpu_budget=float(self.options["cpu_budget"])
+        )
+        self.roi = RoiCropper(
+            enabled=bool(self.options["roi"]),
+            margin=float(self.options["roi_margin"]),
+            downscale=float(self.options["downscale"])
+        )
+        self.motion_gate = MotionGate(
+            enabled=bool(self.options["motion_gate"]),
+            threshold=float(self.options["motion_threshold"]),
+            max_skip=int(self.options["max_skip"])
+        )
+        self.broadcaster = PostureBroadcaster()
+        self.metrics = StageMetrics()
+
+        self.stop_event = threading.Event()
+        self.calibration_requested = threading.Event()
+        self.thread = None
+        self.connected = False
+        self.frame_buffer = None
+        self.recorder = None
+        self.pipeline = None
+        self.extra_sinks = []
+
+        self.state = {
+            "status": "CALIBRATE FIRST",
+            "distance": 0.0,
+            "calibrated": False,
+            "person_detected": False,
+            "timestamp": time.time()
+        }
+
+        # Resource accounting
+        self.created_at = time.time()
+        self.started_at = None
+        self.frames = 0
+        self.inference_frames = 0
+        self.inference_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.readings_logged = 0
+        self.intervals_logged = 0
+        self.interval_tracker = None
+        self.first_frame_scored = False
+        self.start_requested_at = None
+        self.first_score_ms = None
+
+    def ensure_pose(self):
+        """Build this session's pose graph if missing or stale, a no-op in pool mode
+
+        The pipeline calls this before it starts timing a frame, so a graph
+        build (and the first model load) is never counted as inference.
+        """
+        if self.pool is not None:
+            return
+        # Auto-tuning changed the model settings since this graph was built
+        if self.pose is None or self.pose_generation != pose_model.generation:
+            if self.pose is not None:
+                self.pose.close()
+            self.pose_generation = pose_model.generation
+            self.pose = create_pose()
+
+    def process_frame(self, frame):
+        """Run pose detection and posture scoring on one BGR frame.
+
+        Returns (results, status, distance), or None when the inference pool
+        had no free worker and the frame was dropped.
+        """
+        if self.collect_samples and self.inference_frames % SAMPLE_EVERY == 0:
+            self._samples.append(frame.copy())
+
+        # Crop/downscale first so cvtColor only converts the pixels we use
+        pose_input, transform = self.roi.prepare(frame)
+
+        if self.pool is not None:
+            # The worker does the cvtColor, so the pool round trip counts as pose_process
+            pose_start = time.perf_counter()
+            results = self.pool.process(pose_input, key=self.session_id)
+            if results is None:
+                return None
+            self.metrics.observe("pose_process", time.perf_counter() - pose_start)
+        else:
+            self.ensure_pose()
+            convert_start = time.perf_counter()
+            image_rgb = cv2.cvtColor(pose_input, cv2.COLOR_BGR2RGB)
+            pose_start = time.perf_counter()
+            results = self.pose.process(image_rgb)
+            self.metrics.observe("cvt_color", pose_start - convert_start)
+            self.metrics.observe("pose_process", time.perf_counter() - pose_start)
+
+        self.roi.restore(results, transform)
+        self.roi.update(results, frame.shape)
+
+        # A requested calibration collects frames until it has enough
+        if self.calibration_requested.is_set() and results.pose_landmarks:
+            self._collect_calibration(results.pose_landmarks.landmark)
+
+        # Get status from the check_posture
+        check_start = time.perf_counter()
+        status, distance = self.checker.check_posture(
+            results.pose_landmarks.landmark if results.pose_landmarks else None
+        )
+        self.metrics.observe("check_posture", time.perf_counter() - check_start)
+
+        if not self.first_frame_scored:
+            self.first_frame_scored = True
+            startup_timer.mark("first_scored_frame")
+        if self.first_score_ms is None and self.checker.calibrated:
+            # First frame scored against a baseline since start (or since the session was made)
+            self.first_score_ms = (time.time() - (self.start_requested_at or self.created_at)) * 1000
+            startup_timer.mark("first_calibrated_score")
+            print(f"⏱️ [{self.session_id}] First calibrated score {self.first_score_ms:.0f} ms after start")
+        return results, status, distance
+
+    def _collect_calibration(self, landmarks):
+        """Add one frame to a requested calibration, apply and save it once enough are in"""
+        self._calibration_ratios.append(self.checker._calculate_normalized_v_ratio(landmarks))
+        if len(self._calibration_ratios) < int(self.options["calibration_frames"]):
+            return
+
+        ratios, self._calibration_ratios = self._calibration_ratios, []
+        self.calibration_requested.clear()
+        try:
+            profile = build_profile(self.user_id, ratios, self.checker.deviation_threshold)
+        except ValueError as e:
+            print(f"⚠️ [{self.session_id}] Calibration failed: {e}")
+            return
+
+        self.checker.apply_calibration(profile.baseline_ratio, profile.deviation_threshold)
+        self.calibration_user = self.user_id
+        print(f"✅ [{self.session_id}] Calibrated! Baseline {profile.baseline_ratio:.3f} "
+              f"(median of {profile.frames} frames, spread {profile.spread:.3f})")
+
+        if self.calibration_store is not None and self.user_id:
+            try:
+                self.calibration_store.save(profile)
+            except Exception as e:
+                print(f"⚠️ [{self.session_id}] Could not save calibration: {e}")
+
+    def load_calibration(self):
+        """Apply the user's saved calibration, or drop one that belongs to another user"""
+        if self.calibration_store is None or not self.user_id:
+            return
+        try:
+            profile = self.calibration_store.get(self.user_id)
+        except Exception as e:
+            print(f"⚠️ [{self.session_id}] Could not load calibration: {e}")
+            return
+
+        if profile is not None:
+            self.checker.apply_calibration(profile.baseline_ratio, profile.deviation_threshold)
+            self.calibration_user = self.user_id
+            print(f"🎯 [{self.session_id}] Loaded calibration for user {self.user_id} (baseline {profile.baseline_ratio:.3f})")
+        elif self.calibration_user != self.user_id:
+            self.checker.reset_calibration()
+            self.calibration_user = None
+
+    def start(self, source_spec=None, user_id=None):
+        """Start the session thread, optionally switching source / user first.
+
+        Returns False if it is already running.
+        """
+        if self.connected:
+            return False
+
+        if source_spec:
+            open_frame_source(source_spec)
+            self.source_spec = source_spec
+        if user_id is not None:
+            self.user_id = user_id
+
+        self.start_requested_at = time.time()
+        self.first_score_ms = None
+        self.load_calibration()
+
+        self.stop_event.clear()
+        self.connected = True
+        self.thread = threading.Thread(target=self.run, daemon=True, name=f"session-{self.session_id}")
+        self.thread.start()
+        return True
+
+    def stop(self, timeout=2.0):
+        """Stop the session thread, returns False if it wasn't running"""
+        if not self.connected:
+            return False
+        self.stop_event.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+        self.connected = False
+        return True
+
+    def request_calibration(self):
+        """Calibrate on the next calibration_frames frames with a detected pose"""
+        if not self.connected:
+            return False
+        self._calibration_ratios = []
+        self.calibration_requested.set()
+        self.scheduler.boost("calibration requested")
+        return True
+
+    def add_sink(self, sink):
+        """Register an extra pipeline sink (e.g. the demo overlay) for the next start"""
+        self.extra_sinks.append(sink)
+
+    def build_sinks(self):
+        """API state, database logging for the log mode, optional recorder, then any extra sinks"""
+        sinks = [StateSink(self)]
+
+        if self.options["log_mode"] == "intervals":
+            self.interval_tracker = IntervalTracker(
+                self.user_id,
+                debounce=float(self.options["debounce"]),
+                max_length=float(self.options["max_interval"])
+            )
+            if self.log_posture_interval:
+                sinks.append(IntervalLogSink(self, self.interval_tracker, self.log_posture_interval))
+            print(f"📊 [{self.session_id}] Logging posture intervals (debounce {self.options['debounce']:g}s, max {self.options['max_interval']:g}s)")
+        else:
+            self.interval_tracker = None
+            if self.log_reading:
+                sinks.append(ReadingLogSink(self, self.log_reading, float(self.options["log_interval"])))
+            print(f"📊 [{self.session_id}] Logging to database every {self.options['log_interval']:g} seconds")
+
+        self.recorder = None
+        if self.options["record"]:
+            try:
+                self.recorder = LandmarkRecorder(
+                    recording_path(self.options["record"], self.session_id, time.time()),
+                    dtype=self.options["record_dtype"],
+                    metadata={"session_id": self.session_id, "user_id": self.user_id, "source": self.source_spec}
+                )
+                sinks.append(RecorderSink(self.recorder))
+                print(f"📼 [{self.session_id}] Recording landmarks to {self.recorder.path}")
+            except OSError as e:
+                print(f"⚠️ [{self.session_id}] Could not start recording: {e}")
+
+        return sinks + self.extra_sinks
+
+    def run(self):
+        """Session thread: open the source and run the frame pipeline until stopped"""
+        cap = open_source_or_report(self.source_spec)
+
+        if cap is None:
+            # Nothing will be offered, let main-thread sinks return
+            for sink in self.extra_sinks:
+                sink.finish()
+            self.connected = False
+            return
+
+        print(f"✅ [{self.session_id}] Frame source opened successfully ({cap.describe()})")
+        self.started_at = time.time()
+        self.pipeline = FramePipeline(self, self.build_sinks())
+        try:
+            self.pipeline.run(cap)
+        finally:
+            cap.release()
+            if self.pose is not None:
+                self.pose.close()
+                self.pose = None
+            self.connected = False
+            print(f"✅ [{self.session_id}] Camera stopped and released")
+
+    def apply_profile(self, profile):
+        """Use an auto-tuned profile's input scale (the model settings come through pose_model)"""
+        self.profile = profile
+        scale = float(self.options["downscale"]) * profile["input_scale"]
+        self.roi.downscale = min(1.0, max(0.1, scale))
+
+    def sample_frames(self):
+        """A few recent frames for profiling"""
+        return list(self._samples)
+
+    def resources(self):
+        """Per-session resource accounting"""
+        uptime = time.time() - self.started_at if self.started_at else 0.0
+        buffer_stats = self.frame_buffer.stats() if self.frame_buffer else {}
+        return {
+            "uptimeSeconds": round(uptime, 1),
+            "frames": self.frames,
+            "inferenceFrames": self.inference_frames,
+            "inferenceSeconds": round(self.inference_seconds, 3),
+            "avgInferenceMs": round(self.inference_seconds / self.inference_frames * 1000, 2) if self.inference_frames else 0.0,
+            # Share of wall time spent in pose.process
+            "busyPercent": round(self.inference_seconds / uptime * 100, 1) if uptime > 0 else 0.0,
+            # Session thread only, MediaPipe's own worker threads aren't included
+            "cpuSeconds": round(self.cpu_seconds, 3),
+            "capturedFrames": buffer_stats.get("captured_frames", 0),
+            "droppedFrames": buffer_stats.get("dropped_frames", 0),
+            "readingsLogged": self.readings_logged,
+            "intervalsLogged": self.intervals_logged,
+            "timeToFirstScoreMs": round(self.first_score_ms, 1) if self.first_score_ms is not None else None
+        }
+
+    def snapshot(self):
+        """Session summary for the API"""
+        return {
+            "sessionId": self.session_id,
+            "userId": self.user_id,
+            "source": self.source_spec,
+            "cameraConnected": self.connected,
+            "calibrated": self.checker.calibrated,
+            "createdAt": self.created_at,
+            "options": self.options,
+            "inferenceBackend": "pool" if self.pool is not None else "in-process",
+            "poseProfile": self.profile["name"] if self.profile else None,
+            "postureData": self.state,
+            "inferenceRate": self.scheduler.snapshot(),
+            "postureStream": self.broadcaster.stats(),
+            "resources": self.resources(),
+            "latency": self.metrics.summary(),
+            "recording": self.recorder.stats() if self.recorder else None,
+            "intervals": self.interval_tracker.stats() if self.interval_tracker else None,
+            "sinks": self.pipeline.stats() if self.pipeline else None
+        }
+
+
+class SessionManager:
+    """Runs many PostureSessions side by side, keyed by session ID"""
+
+    def __init__(self, log_reading=None, default_options=None, max_sessions=32, pool=None,
+                 log_posture_interval=None, calibration_store=None):
+        self.log_reading = log_reading
+        self.log_posture_interval = log_posture_interval
+        self.calibration_store = calibration_store
+        self.pool = pool
+        self.default_options = default_options or {}
+        self.max_sessions = max_sessions
+        self.profile = None  # Auto-tuned profile handed to new sessions
+        self.collect_samples = False  # Keep frames for re-tuning, set by the auto-tuner
+        self.sessions = {}
+        self._lock = threading.Lock()
+
+    def create(self, user_id=None, source_spec=None, options=None, session_id=None):
+        """Create (but don't start) a session. Raises ValueError on bad input or when full"""
+        session_id = session_id or uuid.uuid4().hex[:12]
+        session = PostureSession(
+            session_id,
+            user_id=user_id,
+            source_spec=source_spec,
+            options={**self.default_options, **(options or {})},
+            log_reading=self.log_reading,
+            pool=self.pool,
+            log_posture_interval=self.log_posture_interval,
+            calibration_store=self.calibration_store
+        )
+        if self.profile is not None:
+            session.apply_profile(self.profile)
+        session.collect_samples = self.collect_samples
+
+        with self._lock:
+            if session_id in self.sessions:
+                raise ValueError(f"Session {session_id} already exists")
+            if len(self.sessions) >= self.max_sessions:
+                raise ValueError(f"Session limit reached ({self.max_sessions})")
+            self.sessions[session_id] = session
+        return session
+
+    def keep_samples(self, enabled):
+        """Turn frame sampling for re-tuning on or off in every session, current and future"""
+        self.collect_samples = enabled
+        for session in self.list():
+            session.collect_samples = enabled
+            if not enabled:
+                session._samples.clear()
+
+    def get(self, session_id):
+        with self._lock:
+            return self.sessions.get(session_id)
+
+    def list(self):
+        with self._lock:
+            return list(self.sessions.values())
+
+    def remove(self, session_id):
+        """Stop and forget a session, returns False if it doesn't exist"""
+        with self._lock:
+            session = self.sessions.pop(session_id, None)
+        if session is None:
+            return False
+        session.stop()
+        return True
+
+    def stop_all(self):
+        for session in self.list():
+            session.stop()
+
+    def stats(self):
+        sessions = self.list()
+        return {
+            "sessions": len(sessions),
+            "running": sum(1 for session in sessions if session.connected),
+            "maxSessions": self.max_sessions,
+            "cpuSeconds": round(sum(session.cpu_seconds for session in sessions), 3)
+        }
@@ -0,0 +1,53 @@
+"""
+Startup Timing
+
+Records how long after process start the server reached each startup
+milestone (imports done, first request answered, model ready, first scored
+frame, first frame scored against a calibration) so cold-start time can be
+tracked. Times are measured from the
+process start reported by the OS where available, otherwise from the
+first import of this module.
+"""
+
+import os
+import threading
+import time
+
+
+def process_start_time():
+    """Wall-clock time the current process started, None if the OS doesn't say"""
+    try:
+        with open("/proc/self/stat") as f:
+            # Fields after the command name, starttime is field 22 of the full line
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        start_ticks = int(fields[19])
+        return time.time() - uptime + start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class StartupTimer:
+    def __init__(self):
+        self.origin = process_start_time() or time.time()
+        self.marks = {}
+        self._lock = threading.Lock()
+
+    def mark(self, name):
+        """Record a milestone the first time it is reached, later calls are ignored"""
+        with self._lock:
+            if name in self.marks:
+                return False
+            self.marks[name] = time.time()
+        print(f"⏱️ Startup: {name} after {(self.marks[name] - self.origin) * 1000:.0f} ms")
+        return True
+
+    def report(self):
+        """Milliseconds from process start to each milestone reached so far"""
+        with self._lock:
+            return {name: round((at - self.origin) * 1000, 1) for name, at in self.marks.items()}
+
+
+# Shared by server.py, the pose model and sessions
+startup_timer = StartupTimer()
@@ -0,0 +1,137 @@
+"""
+Running Stats for Today's Session
+
+Keeps today's totals for each user in memory so /api/stats/today can
+answer in constant time. Totals are seeded from the day rollup the first
+time a user is seen, updated on every logged reading or interval and reset
+when the local day rolls over. Scores and percentages are weighted by the
+time each reading (its session's log interval) or interval covers.
+"""
+
+import threading
+import time
+from datetime import datetime
+
+from database import READING_INTERVAL, classify_status, day_range
+
+
+class DailyAggregator:
+    """Today's running totals for one user"""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self._lock = threading.Lock()
+        self._start_day(time.time())
+
+    def _start_day(self, now):
+        self.day_start, self.day_end = day_range(datetime.fromtimestamp(now))
+        self.score_sum = 0.0
+        self.reading_count = 0
+        self.good_count = 0
+        self.bad_count = 0
+        self.good_seconds = 0.0
+        self.tracked_seconds = 0.0
+        self.score_seconds = 0.0
+
+    def _roll_over(self, now):
+        if now >= self.day_end or now < self.day_start:
+            self._start_day(now)
+
+    def seed(self, db):
+        """Load today's totals for this user from the day rollup"""
+        with self._lock:
+            self._start_day(time.time())
+            for _, score_sum, count, good, bad, streak_seconds, tracked_seconds, score_seconds in db.get_rollups(
+                    self.user_id, 'day', self.day_start, self.day_end):
+                self.score_sum += score_sum
+                self.reading_count += count
+                self.good_count += good
+                self.bad_count += bad
+                self.good_seconds += streak_seconds
+                self.tracked_seconds += tracked_seconds
+                self.score_seconds += score_seconds
+
+    def add(self, posture_score, status, timestamp=None, seconds=READING_INTERVAL):
+        """Count one logged reading that stands for `seconds` of posture"""
+        timestamp = timestamp or time.time()
+        is_good, is_bad = classify_status(status)
+
+        with self._lock:
+            self._roll_over(timestamp)
+            self.score_sum += posture_score
+            self.reading_count += 1
+            self.good_count += is_good
+            self.bad_count += is_bad
+            if is_good:
+                self.good_seconds += seconds
+            self.tracked_seconds += seconds
+            self.score_seconds += posture_score * seconds
+
+    def add_interval(self, interval):
+        """Count the part of a closed PostureInterval that falls on today"""
+        is_good, is_bad = classify_status(interval.status)
+
+        with self._lock:
+            self._roll_over(interval.end_time)
+            seconds = min(interval.end_time, self.day_end) - max(interval.start_time, self.day_start)
+            if seconds < 0:
+                return
+            # Counted on the day it started, like the day rollup
+            if interval.start_time >= self.day_start:
+                self.score_sum += interval.ratio_mean
+                self.reading_count += 1
+                self.good_count += is_good
+                self.bad_count += is_bad
+            if is_good:
+                self.good_seconds += seconds
+            self.tracked_seconds += seconds
+            self.score_seconds += interval.ratio_mean * seconds
+
+    def summary(self):
+        """Today's stats in the /api/stats/today response shape"""
+        with self._lock:
+            self._roll_over(time.time())
+            total = self.reading_count
+
+            avg_score = 0
+            if self.tracked_seconds > 0:
+                raw_avg = self.score_seconds / self.tracked_seconds
+                # Scores logged on a 0-1 scale are shown as 0-100
+                avg_score = round(raw_avg * 100, 1) if raw_avg <= 1.0 else round(raw_avg, 1)
+
+            return {
+                "average_score": avg_score,
+                "total_readings": total,
+                "good_posture_count": self.good_count,
+                "bad_posture_count": self.bad_count,
+                "good_posture_percentage": round(self.good_seconds / self.tracked_seconds * 100) if self.tracked_seconds > 0 else 0,
+                "good_posture_hours": round(self.good_seconds / 3600, 1) if total > 0 else 0,
+                "tracked_hours": round(self.tracked_seconds / 3600, 2)
+            }
+
+
+class TodayStats:
+    """DailyAggregator per user, seeded from the database on first use"""
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self.aggregators = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            aggregator = self.aggregators.get(user_id)
+            if aggregator is None:
+                aggregator = DailyAggregator(user_id)
+                with self.db_manager.reader() as db:
+                    aggregator.seed(db)
+                self.aggregators[user_id] = aggregator
+            return aggregator
+
+    def record(self, user_id, posture_score, status, timestamp=None, seconds=READING_INTERVAL):
+        """Count a reading that was just logged for user_id"""
+        self.get(user_id).add(posture_score, status, timestamp, seconds)
+
+    def record_interval(self, interval):
+        """Count a PostureInterval that was just logged"""
+        self.get(interval.user_id).add_interval(interval)
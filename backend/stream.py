@@ -0,0 +1,102 @@
+"""
+Posture Stream
+
+Pushes posture updates to dashboards as Server-Sent Events instead of
+having each one poll /api/posture/current. camera_loop publishes every
+frame, but a message only goes out when something the UI shows has
+changed, and each client can cap how many messages per second it gets.
+"""
+
+import json
+import threading
+import time
+
+# Fields that make an update worth sending (distance is compared rounded)
+CHANGE_KEYS = ("status", "calibrated", "person_detected")
+DISTANCE_PRECISION = 2
+
+HEARTBEAT_SECONDS = 15.0
+
+
+def change_key(data):
+    """The part of current_posture_data the dashboard cares about"""
+    return tuple(data.get(key) for key in CHANGE_KEYS) + (
+        round(float(data.get("distance", 0.0)), DISTANCE_PRECISION),
+    )
+
+
+class PostureBroadcaster:
+    def __init__(self):
+        self.version = 0
+        self.data = None
+        self.clients = 0
+        self.messages_sent = 0
+        self._last_key = None
+        self._cond = threading.Condition()
+
+    def publish(self, data):
+        """Offer the latest posture data, wakes clients only if it changed"""
+        key = change_key(data)
+        with self._cond:
+            if key == self._last_key:
+                return False
+            self._last_key = key
+            self.data = data
+            self.version += 1
+            self._cond.notify_all()
+            return True
+
+    def wait_for_update(self, seen_version, timeout):
+        """Block until there is a version newer than seen_version, returns (version, data)"""
+        with self._cond:
+            self._cond.wait_for(lambda: self.version > seen_version, timeout)
+            return self.version, self.data
+
+    def stream(self, max_rate=None):
+        """Generator of SSE messages for one client.
+
+        max_rate caps messages per second; updates arriving faster are
+        coalesced and only the newest one is sent.
+        """
+        min_interval = 1.0 / max_rate if max_rate else 0.0
+        seen_version = 0
+        last_sent = 0.0
+
+        with self._cond:
+            self.clients += 1
+        try:
+            # Reconnecting clients get the current state straight away
+            if self.data is not None:
+                seen_version, data = self.version, self.data
+                yield self._message(seen_version, data)
+                last_sent = time.monotonic()
+
+            while True:
+                wait = min_interval - (time.monotonic() - last_sent)
+                if wait > 0:
+                    time.sleep(wait)
+
+                version, data = self.wait_for_update(seen_version, HEARTBEAT_SECONDS)
+                if version == seen_version:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+
+                seen_version = version
+                yield self._message(version, data)
+                last_sent = time.monotonic()
+        finally:
+            with self._cond:
+                self.clients -= 1
+
+    def _message(self, version, data):
+        with self._cond:
+            self.messages_sent += 1
+        return f"id: {version}\nevent: posture\ndata: {json.dumps(data)}\n\n"
+
+    def stats(self):
+        return {
+            "clients": self.clients,
+            "version": self.version,
+            "messagesSent": self.messages_sent
+        }
@@ -0,0 +1,341 @@
+"""
+Latency-budget Auto-tuning
+
+Profiles pose model settings on a short sample of frames and picks the
+most accurate one whose pose.process p95 fits a per-frame latency budget:
+
+    model_complexity   2 (heavy) > 1 (full) > 0 (lite)
+    input_scale        1.0 > 0.75 > 0.5 of the captured frame
+
+Accuracy is this static ordering, not something measured: the sample
+frames carry no ground truth, and the detection rate reported for each
+candidate is mostly a measure of whether someone was in frame. It is
+shown for information only. Candidates are tried in that order and
+profiling stops at the first one that fits, so fast machines only
+profile a couple. Landmark smoothing is left on and not swept: it
+filters across consecutive frames, and the samples are spaced out.
+
+The chosen profile is applied through pose_model.configure(); input_scale
+becomes the downscale sessions apply before pose.process (the pose input
+resolution, not the camera mode, which sources can't all change).
+
+While running, AutoTuner watches the sessions' pose_process p95 and
+re-tunes when it stays over the budget (or far under it, with a more
+accurate profile left to try) for a few checks in a row.
+"""
+
+import threading
+import time
+from collections import deque
+
+import cv2
+
+from frame_sources import open_frame_source
+from model import POSE_OPTIONS, pose_model
+from replay import summarize_ms
+from sessions import SAMPLE_FRAMES
+
+MODEL_COMPLEXITIES = (2, 1, 0)
+INPUT_SCALES = (1.0, 0.75, 0.5)
+
+# Frames processed before timing starts on a new graph
+WARMUP_FRAMES = 2
+# Seconds to wait for running sessions to sample frames when they weren't already
+SESSION_SAMPLE_WAIT = 10.0
+
+
+def candidate_profiles():
+    """Every setting combination, most accurate first"""
+    return [
+        {"model_complexity": complexity, "input_scale": scale}
+        for complexity in MODEL_COMPLEXITIES
+        for scale in INPUT_SCALES
+    ]
+
+
+def profile_name(profile):
+    return f"complexity{profile['model_complexity']}-{profile['input_scale']:g}x"
+
+
+def sample_frames(source_spec, count=20, timeout=10.0):
+    """Read up to count frames from a source as fast as it delivers them
+
+    Gives up after timeout seconds with whatever was read, a live camera
+    whose reads keep failing is never exhausted.
+    """
+    source = open_frame_source(source_spec, realtime=False)
+    frames = []
+    try:
+        if not source.open():
+            return frames
+        deadline = time.monotonic() + timeout
+        while len(frames) < count and not source.exhausted:
+            if time.monotonic() >= deadline:
+                print(f"⚠️ Only {len(frames)} of {count} frames read from {source.describe()} in {timeout:g}s")
+                break
+            success, frame = source.read()
+            if success:
+                frames.append(frame)
+            elif source.live:
+                time.sleep(0.01)
+    finally:
+        source.release()
+    return frames
+
+
+def scaled(frame, scale):
+    if scale >= 1.0:
+        return frame
+    return cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+
+class AutoTuner(threading.Thread):
+    def __init__(self, session_manager, budget_ms=50.0, source_spec=None, sample_size=20,
+                 check_interval=10.0, drift_tolerance=0.2, drift_checks=3, min_retune_interval=300.0):
+        """Configure the tuner
+
+        budget_ms: per-frame pose.process budget, compared with the p95
+        source_spec: where tuning gets its frames when no session is
+            running (running sessions sample a few of theirs instead)
+        drift_tolerance: how far over the budget (fraction) counts as drift
+        drift_checks: consecutive drifting checks before re-tuning
+        min_retune_interval: seconds between drift-triggered re-tunes
+        """
+        super().__init__(daemon=True, name="pose-autotune")
+        self.session_manager = session_manager
+        self.budget_ms = budget_ms
+        self.source_spec = source_spec
+        self.sample_size = sample_size
+        self.check_interval = check_interval
+        self.drift_tolerance = drift_tolerance
+        self.drift_checks = drift_checks
+        self.min_retune_interval = min_retune_interval
+
+        self.profile = None
+        self.results = []
+        self.state = "idle"
+        self.reason = None
+        self.error = None
+        self.tuned_at = None
+        self.tune_count = 0
+        self.drift_count = 0
+        self.last_p95_ms = None
+        self.history = deque(maxlen=20)
+        self._stop_event = threading.Event()
+        self._tune_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+    def run(self):
+        """Tune once at startup, then watch for latency drift"""
+        # Sessions only keep frames for re-tuning while this thread runs
+        self.session_manager.keep_samples(True)
+        self.tune(reason="startup")
+        while not self._stop_event.wait(self.check_interval):
+            reason = self.check_drift()
+            if reason:
+                self.tune(reason=reason)
+
+    def tune(self, reason="on demand", budget_ms=None, frames=None):
+        """Profile the candidates and apply the best fit, returns the chosen profile (None on failure)"""
+        if not self._tune_lock.acquire(blocking=False):
+            return None  # A tune is already running
+        try:
+            if budget_ms is not None:
+                self.budget_ms = float(budget_ms)
+            self._set_state("sampling", reason)
+            frames = frames or self._collect_frames()
+            if not frames:
+                self._set_state("failed", reason, error="No frames to profile (no running session, --tune-source gave none in time)")
+                print("⚠️ Auto-tune skipped: no frames to profile")
+                return None
+
+            self._set_state("profiling", reason)
+            print(f"🎛️ Auto-tuning pose model for a {self.budget_ms:g} ms budget ({reason}, {len(frames)} frames)...")
+            results, chosen = self._profile(frames)
+            if chosen is None:
+                # Nothing fits, the fastest setting that ran is the best we can do
+                measured = [result for result in results if result.get("p95_ms") is not None]
+                if not measured:
+                    self._set_state("failed", reason, error="No candidate could be profiled", results=results)
+                    return None
+                chosen = min(measured, key=lambda result: result["p95_ms"])
+                print(f"⚠️ No pose setting fits {self.budget_ms:g} ms, using the fastest ({chosen['name']}, p95 {chosen['p95_ms']:.1f} ms)")
+
+            self._apply(chosen)
+            with self._stats_lock:
+                self.profile = chosen
+                self.results = results
+                self.tuned_at = time.time()
+                self.tune_count += 1
+                self.drift_count = 0
+                self.history.append({"at": self.tuned_at, "reason": reason, "profile": chosen["name"]})
+            self._set_state("tuned", reason)
+            print(f"✅ Pose profile: {chosen['name']} (p95 {chosen['p95_ms']:.1f} ms, budget {self.budget_ms:g} ms)")
+            return chosen
+        except Exception as e:
+            self._set_state("failed", reason, error=str(e))
+            print(f"❌ Auto-tune failed: {e}")
+            return None
+        finally:
+            self._tune_lock.release()
+
+    def tune_in_background(self, reason="on demand", budget_ms=None):
+        """Start tune() on its own thread, returns False if one is already running"""
+        if self._tune_lock.locked():
+            return False
+        threading.Thread(target=self.tune, args=(reason, budget_ms), daemon=True, name="pose-autotune-run").start()
+        return True
+
+    def _profile(self, frames):
+        """Time candidates in order of accuracy until one fits the budget"""
+        mp = pose_model.load()
+        results = []
+        graphs = {}
+        unavailable = {}
+        chosen = None
+        try:
+            for profile in candidate_profiles():
+                result = {**profile, "name": profile_name(profile)}
+                results.append(result)
+                complexity = profile["model_complexity"]
+                if complexity in unavailable:
+                    result["error"] = unavailable[complexity]
+                    continue
+                try:
+                    if complexity not in graphs:
+                        graphs[complexity] = mp.solutions.pose.Pose(
+                            model_complexity=complexity,
+                            **POSE_OPTIONS
+                        )
+                    pose = graphs[complexity]
+
+                    inputs = [cv2.cvtColor(scaled(frame, profile["input_scale"]), cv2.COLOR_BGR2RGB) for frame in frames]
+                    detected = 0
+                    timings = []
+                    for i, image in enumerate(inputs[:WARMUP_FRAMES] + inputs):
+                        start = time.perf_counter()
+                        output = pose.process(image)
+                        elapsed = time.perf_counter() - start
+                        if i >= WARMUP_FRAMES:
+                            timings.append(elapsed)
+                            detected += output.pose_landmarks is not None
+                except Exception as e:
+                    # e.g. the heavy model can't be downloaded, don't retry it for every scale
+                    result["error"] = str(e)
+                    if complexity not in graphs:
+                        unavailable[complexity] = result["error"]
+                    print(f"   {result['name']}: unavailable ({e})")
+                    continue
+
+                latency = summarize_ms(timings)
+                result.update({
+                    "p50_ms": latency["p50"],
+                    "p95_ms": latency["p95"],
+                    "detection_rate": round(detected / len(timings), 3),
+                    "fits": latency["p95"] <= self.budget_ms
+                })
+                print(f"   {result['name']}: p50 {latency['p50']:.1f} ms | p95 {latency['p95']:.1f} ms | "
+                      f"pose found in {result['detection_rate'] * 100:.0f}% of frames")
+                if result["fits"]:
+                    chosen = result
+                    break
+        finally:
+            for pose in graphs.values():
+                pose.close()
+        return results, chosen
+
+    def _apply(self, profile):
+        pose_model.configure({"model_complexity": profile["model_complexity"]})
+        self.session_manager.profile = profile
+        for session in self.session_manager.list():
+            session.apply_profile(profile)
+
+    def _collect_frames(self):
+        """Recent frames kept by running sessions, else a sample from source_spec
+
+        A running session holds its camera, so source_spec is only opened
+        when none is running. Sessions that weren't sampling (no drift
+        watching) sample until enough frames arrive or SESSION_SAMPLE_WAIT.
+        """
+        live = [session for session in self.session_manager.list() if session.connected]
+        if not live:
+            return sample_frames(self.source_spec, self.sample_size) if self.source_spec else []
+
+        was_sampling = self.session_manager.collect_samples
+        if not was_sampling:
+            self.session_manager.keep_samples(True)
+        try:
+            needed = min(self.sample_size // 2, SAMPLE_FRAMES * len(live))
+            deadline = time.monotonic() + SESSION_SAMPLE_WAIT
+            while True:
+                frames = [frame for session in live for frame in session.sample_frames()]
+                if len(frames) >= needed or time.monotonic() >= deadline or self._stop_event.is_set():
+                    return frames[-self.sample_size:]
+                time.sleep(0.1)
+        finally:
+            if not was_sampling:
+                self.session_manager.keep_samples(False)
+
+    def check_drift(self):
+        """Reason to re-tune if the live p95 has left the budget for drift_checks checks, else None"""
+        p95s = []
+        for session in self.session_manager.list():
+            histogram = session.metrics.stages["pose_process"]
+            if session.connected and session.pool is None and len(histogram.recent) >= 30:
+                p95s.append(histogram.quantiles()[0.95] * 1000)
+        if not p95s or self.profile is None:
+            return None
+
+        p95 = max(p95s)
+        too_slow = p95 > self.budget_ms * (1 + self.drift_tolerance)
+        # Plenty of headroom and a more accurate profile that ran (but didn't fit) last time
+        too_fast = p95 < self.budget_ms * 0.5 and bool(self._more_accurate())
+        with self._stats_lock:
+            self.last_p95_ms = round(p95, 2)
+            self.drift_count = self.drift_count + 1 if (too_slow or too_fast) else 0
+            due = self.drift_count >= self.drift_checks and (
+                self.tuned_at is None or time.time() - self.tuned_at >= self.min_retune_interval)
+        if not due:
+            return None
+        return f"p95 {p95:.1f} ms {'over' if too_slow else 'well under'} the {self.budget_ms:g} ms budget"
+
+    def _more_accurate(self):
+        """Profiled candidates ahead of the current profile in the last results
+
+        A later tune that failed may have replaced the results, so the
+        profile is looked up by name and can be missing from them.
+        """
+        with self._stats_lock:
+            names = [result["name"] for result in self.results]
+            if self.profile is None or self.profile["name"] not in names:
+                return []
+            ahead = self.results[:names.index(self.profile["name"])]
+        return [result for result in ahead if "error" not in result]
+
+    def _set_state(self, state, reason, error=None, results=None):
+        with self._stats_lock:
+            self.state = state
+            self.reason = reason
+            self.error = error
+            if results is not None:
+                self.results = results
+
+    def stop(self):
+        self._stop_event.set()
+        self.session_manager.keep_samples(False)
+
+    def status(self):
+        with self._stats_lock:
+            return {
+                "state": self.state,
+                "reason": self.reason,
+                "error": self.error,
+                "budgetMs": self.budget_ms,
+                "profile": self.profile,
+                "tunedAt": self.tuned_at,
+                "tunes": self.tune_count,
+                "livePoseP95Ms": self.last_p95_ms,
+                "driftChecks": self.drift_count,
+                "candidates": self.results,
+                "history": list(self.history)
+            }
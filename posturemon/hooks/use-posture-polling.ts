@@ -1,6 +1,6 @@
 /**
  * Real-Time Posture Polling Hook
- * Fetches posture data from Python backend and updates store
+ * Streams posture data from Python backend (SSE, polling while the stream is down) and updates store
  */
 
 'use client'
@@ -9,6 +9,10 @@ import { useEffect } from 'react'
 import { usePostureStore } from '@/stores/posture-store'
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:5050'
+const POLL_INTERVAL_MS = 500
+const STREAM_MAX_RATE = 10 // Max stream messages per second
+const STREAM_RETRY_MIN_MS = 1000 // First delay before reopening a closed stream
+const STREAM_RETRY_MAX_MS = 30000 // Longest delay between reopen attempts
 
 interface BackendPostureData {
   status: string
@@ -24,67 +28,141 @@ export function usePosturePolling(isConnected: boolean, demoMode: boolean) {
   const setCalibrated = usePostureStore((state) => state.setCalibrated)
   
   useEffect(() => {
-    // Only poll when camera is connected and NOT in demo mode
+    // Only listen when camera is connected and NOT in demo mode
     if (!isConnected || demoMode) {
       return
     }
     
-    console.log('🔄 Starting posture polling...')
+    let eventSource: EventSource | null = null
+    let interval: ReturnType<typeof setInterval> | null = null
+    let reopenTimer: ReturnType<typeof setTimeout> | null = null
+    let retryDelay = STREAM_RETRY_MIN_MS
+    let stopped = false
     
-    // Poll every 500ms (2 times per second)
-    const interval = setInterval(async () => {
-      try {
-        const response = await fetch(`${API_BASE_URL}/api/posture/current`)
-        
-        if (!response.ok) {
-          throw new Error('Failed to fetch posture data')
+    const handlePostureData = (data: BackendPostureData) => {
+      // If no person detected, don't update posture (keep previous state)
+      if (data.person_detected === false) {
+        console.log('⏸️ No person detected - pausing updates')
+        return
+      }
+      
+      // Convert Python status to our score system
+      const score = convertStatusToScore(data.status, data.distance)
+      const status = convertStatusToEnum(data.status)
+      
+      // Update calibration state
+      if (data.calibrated) {
+        setCalibrated(true)
+      }
+      
+      // Update posture in store
+      updatePosture({
+        timestamp: Date.now(),
+        landmarks: [], // We don't have landmarks in browser
+        score: {
+          overall: score,
+          status: status,
+          alignment: score,
+          distance: data.distance,
+        },
+        alerts: getAlerts(data.status),
+      })
+      
+      // Log for debugging
+      console.log('📊 Posture update:', {
+        status: data.status,
+        score,
+        distance: data.distance.toFixed(2),
+      })
+    }
+    
+    const startPolling = () => {
+      if (interval) {
+        return
+      }
+      
+      console.log('🔄 Starting posture polling...')
+      
+      // Poll every 500ms (2 times per second)
+      interval = setInterval(async () => {
+        try {
+          const response = await fetch(`${API_BASE_URL}/api/posture/current`)
+          
+          if (!response.ok) {
+            throw new Error('Failed to fetch posture data')
+          }
+          
+          handlePostureData(await response.json())
+        } catch (error) {
+          console.error('❌ Failed to fetch posture data:', error)
         }
-        
-        const data: BackendPostureData = await response.json()
-        
-        // If no person detected, don't update posture (keep previous state)
-        if (data.person_detected === false) {
-          console.log('⏸️ No person detected - pausing updates')
-          return
+      }, POLL_INTERVAL_MS)
+    }
+    
+    const stopPolling = () => {
+      if (interval) {
+        clearInterval(interval)
+        interval = null
+      }
+    }
+    
+    // Prefer the push stream: the backend only sends a message when the
+    // posture actually changes. Poll only while it is down.
+    const openStream = () => {
+      reopenTimer = null
+      if (stopped) {
+        return
+      }
+      
+      console.log('📡 Opening posture stream...')
+      const source = new EventSource(`${API_BASE_URL}/api/posture/stream?maxRate=${STREAM_MAX_RATE}`)
+      eventSource = source
+      
+      source.onopen = () => {
+        console.log('📡 Posture stream connected')
+        retryDelay = STREAM_RETRY_MIN_MS
+        stopPolling()
+      }
+      
+      source.addEventListener('posture', (event) => {
+        try {
+          handlePostureData(JSON.parse((event as MessageEvent).data))
+        } catch (error) {
+          console.error('❌ Failed to parse posture update:', error)
         }
-        
-        // Convert Python status to our score system
-        const score = convertStatusToScore(data.status, data.distance)
-        const status = convertStatusToEnum(data.status)
-        
-        // Update calibration state
-        if (data.calibrated) {
-          setCalibrated(true)
+      })
+      
+      source.onerror = () => {
+        startPolling()
+        if (source.readyState !== EventSource.CLOSED) {
+          // The browser is already reconnecting (e.g. the server restarted)
+          console.warn('⚠️ Posture stream interrupted - polling while it reconnects')
+          return
         }
         
-        // Update posture in store
-        updatePosture({
-          timestamp: Date.now(),
-          landmarks: [], // We don't have landmarks in browser
-          score: {
-            overall: score,
-            status: status,
-            alignment: score,
-            distance: data.distance,
-          },
-          alerts: getAlerts(data.status),
-        })
-        
-        // Log for debugging
-        console.log('📊 Posture update:', {
-          status: data.status,
-          score,
-          distance: data.distance.toFixed(2),
-        })
-        
-      } catch (error) {
-        console.error('❌ Failed to fetch posture data:', error)
+        // The browser gave up on this stream, open a new one with backoff
+        console.warn(`⚠️ Posture stream closed - retrying in ${retryDelay / 1000}s`)
+        source.close()
+        eventSource = null
+        reopenTimer = setTimeout(openStream, retryDelay)
+        retryDelay = Math.min(retryDelay * 2, STREAM_RETRY_MAX_MS)
       }
-    }, 500) // Poll every 500ms
+    }
+    
+    if (typeof EventSource !== 'undefined') {
+      openStream()
+    } else {
+      startPolling()
+    }
     
     return () => {
-      console.log('🛑 Stopping posture polling')
-      clearInterval(interval)
+      console.log('🛑 Stopping posture updates')
+      stopped = true
+      eventSource?.close()
+      if (reopenTimer) {
+        clearTimeout(reopenTimer)
+      }
+      stopPolling()
     }
   }, [isConnected, demoMode, updatePosture, setCalibrated])
 }